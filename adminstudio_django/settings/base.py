@@ -76,9 +76,30 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Take the write lock when a transaction starts so concurrent bookings queue up
+        # instead of failing with "database is locked" (SQLite has no row-level locks).
+        "OPTIONS": {"transaction_mode": "IMMEDIATE"},
     }
 }
 
+# Caches: process-local by default; idempotent responses and the mailing rate limits
+# must be visible to every worker process, so they live in database tables
+# (`manage.py createcachetable`).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "idempotency": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "idempotency_cache",
+        "OPTIONS": {"MAX_ENTRIES": 100_000},
+    },
+    "mailing_throttle": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "mailing_throttle_cache",
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -120,6 +141,79 @@ RESEND_API_KEY = os.getenv("RESEND_API_KEY")
 
 VERIFICATION_CODE_EXPIRATION_MINUTES = 5
 
+# Keyset pagination of the schedules list (?page_size= is capped at the maximum)
+SCHEDULES_PAGE_SIZE = 50
+SCHEDULES_MAX_PAGE_SIZE = 200
+
+# Idempotency-Key support for retried POSTs (apps.common.idempotency)
+IDEMPOTENCY_CACHE_ALIAS = "idempotency"
+IDEMPOTENCY_KEY_TTL_SECONDS = 24 * 60 * 60
+IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = 60
+
+# Notification outbox: a worker claims up to NOTIFICATIONS_CLAIM_BATCH_SIZE rows at a time
+# and holds them in "sending" for NOTIFICATIONS_LEASE_SECONDS; expired leases are reclaimed.
+NOTIFICATIONS_CLAIM_BATCH_SIZE = 100
+NOTIFICATIONS_LEASE_SECONDS = 5 * 60
+# Newly created notifications are handed to Celery as id lists of at most this size,
+# fanned out as a group when there are several chunks.
+NOTIFICATIONS_TASK_CHUNK_SIZE = 500
+# Streamed notifications (e.g. class reminders) are rendered, created and enqueued this
+# many at a time.
+NOTIFICATIONS_STREAM_BATCH_SIZE = 500
+
+# Class reminders: members are reminded of classes starting within the next
+# CLASS_REMINDER_LEAD_MINUTES; reservations are read CLASS_REMINDER_CHUNK_SIZE at a time.
+CLASS_REMINDER_LEAD_MINUTES = 120
+CLASS_REMINDER_CHUNK_SIZE = 2000
+# Failed notifications are retried with exponential backoff and jitter, starting at
+# NOTIFICATIONS_RETRY_BASE_SECONDS and capped at NOTIFICATIONS_RETRY_MAX_DELAY_SECONDS;
+# after NOTIFICATIONS_MAX_ATTEMPTS attempts they are moved to "dead".
+NOTIFICATIONS_MAX_ATTEMPTS = 5
+NOTIFICATIONS_RETRY_BASE_SECONDS = 60
+NOTIFICATIONS_RETRY_MAX_DELAY_SECONDS = 6 * 60 * 60
+# Digest mode: notifications rendered from a template listed in
+# NOTIFICATIONS_DIGEST_CATEGORIES are held instead of sent. Once a user's oldest held
+# notification is NOTIFICATIONS_DIGEST_WINDOW_SECONDS old, all of theirs are merged into
+# one email. Comma separated in the environment; empty disables digesting.
+NOTIFICATIONS_DIGEST_CATEGORIES = [
+    category.strip()
+    for category in os.getenv("NOTIFICATIONS_DIGEST_CATEGORIES", "").split(",")
+    if category.strip()
+]
+NOTIFICATIONS_DIGEST_WINDOW_SECONDS = 120
+
+# Mailing service client (apps.notifications.mailing): emails of a batch are posted
+# concurrently over a pooled keep-alive session, at most MAILING_MAX_CONCURRENCY at once.
+MAILING_MAX_CONCURRENCY = int(os.getenv("MAILING_MAX_CONCURRENCY", "8"))
+MAILING_REQUEST_TIMEOUT_SECONDS = 20
+# With MAILING_ASYNC, each batch is sent from an asyncio event loop instead of a thread
+# pool, with up to MAILING_ASYNC_MAX_CONCURRENCY requests in flight; batches are then
+# claimed that many at a time instead of NOTIFICATIONS_CLAIM_BATCH_SIZE. Requests are
+# spread over httpx clients of MAILING_ASYNC_CONNECTIONS_PER_CLIENT connections each,
+# since httpx spends CPU quadratic in the pool size to schedule requests on a large pool.
+MAILING_ASYNC = os.getenv("MAILING_ASYNC", "false").lower() == "true"
+MAILING_ASYNC_MAX_CONCURRENCY = int(os.getenv("MAILING_ASYNC_MAX_CONCURRENCY", "200"))
+MAILING_ASYNC_CONNECTIONS_PER_CLIENT = 10
+# With MAILING_BATCH_PERSONALIZATIONS, notifications sharing subject and message go out
+# as one provider request (one personalization per notification) with at most
+# MAILING_BATCH_MAX_RECIPIENTS recipients. Only enable it once the mailing service
+# supports personalizations: otherwise one email goes to every address of the batch.
+MAILING_BATCH_PERSONALIZATIONS = (
+    os.getenv("MAILING_BATCH_PERSONALIZATIONS", "false").lower() == "true"
+)
+MAILING_BATCH_MAX_RECIPIENTS = 100
+# Token buckets per provider (requests per second and burst), shared by every worker
+# through the MAILING_RATE_LIMIT_CACHE_ALIAS cache (None keeps a bucket per process).
+# A send waits at most MAILING_RATE_LIMIT_MAX_WAIT_SECONDS for a token; a 429 without
+# Retry-After pauses the provider for MAILING_RATE_LIMIT_DEFAULT_PAUSE_SECONDS.
+MAILING_RATE_LIMITS = {
+    "sendgrid": {"rate": 10, "burst": 20},
+    "resend": {"rate": 2, "burst": 2},
+}
+MAILING_RATE_LIMIT_CACHE_ALIAS = "mailing_throttle"
+MAILING_RATE_LIMIT_MAX_WAIT_SECONDS = 30
+MAILING_RATE_LIMIT_DEFAULT_PAUSE_SECONDS = 60
+
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 
 # Logging configuration
@@ -175,3 +269,27 @@ CELERY_RESULT_BACKEND = "rpc://"
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+
+# Periodic tasks (run with `celery -A celery_app beat`)
+CELERY_BEAT_SCHEDULE = {
+    "rebuild-reserved-counts": {
+        "task": "apps.members.tasks.async_rebuild_reserved_counts",
+        "schedule": 60 * 60,
+    },
+    "send-pending-notifications": {
+        "task": "apps.notifications.tasks.async_send_notifications",
+        "schedule": 60,
+    },
+    "send-class-reminders": {
+        "task": "apps.members.tasks.async_send_class_reminders",
+        "schedule": 5 * 60,
+    },
+    "retry-failed-notifications": {
+        "task": "apps.notifications.tasks.async_retry_notifications",
+        "schedule": 60,
+    },
+    "send-notification-digests": {
+        "task": "apps.notifications.tasks.async_send_notification_digests",
+        "schedule": 60,
+    },
+}
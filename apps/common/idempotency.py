@@ -0,0 +1,93 @@
+import functools
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def _fingerprint(request) -> str:
+    """Hash of the parsed request payload, used to detect a key reused for another request."""
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def idempotent(view_method):
+    """
+    Make a ViewSet action safe to retry by honoring the Idempotency-Key header.
+
+    The first response for a given key (and method and path) is stored in the
+    IDEMPOTENCY_CACHE_ALIAS cache for IDEMPOTENCY_KEY_TTL_SECONDS. Retries with the
+    same key replay that response without running the view again, so client retries
+    after a timeout neither repeat the booking nor send duplicate emails.
+
+    - Requests without the header run the view unchanged.
+    - A retry arriving while the first request is still running gets 409 Conflict.
+    - Reusing a key with a different payload gets 422 Unprocessable Entity.
+    - Server errors (5xx) are not stored, so the request can be retried.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        cache = caches[settings.IDEMPOTENCY_CACHE_ALIAS]
+        cache_key = f"idempotency:{request.method}:{request.path}:{key}"
+        lock_key = f"{cache_key}:lock"
+        fingerprint = _fingerprint(request)
+
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return _replay(stored, fingerprint, key)
+
+        if not cache.add(lock_key, fingerprint, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS):
+            return Response(
+                {"detail": "A request with this Idempotency-Key is already being processed."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        try:
+            # The first request may have stored its response and released the lock
+            # between the read above and taking the lock
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return _replay(stored, fingerprint, key)
+            response = view_method(self, request, *args, **kwargs)
+            if not status.is_server_error(response.status_code):
+                cache.set(
+                    cache_key,
+                    {
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "data": response.data,
+                    },
+                    timeout=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+                )
+        finally:
+            cache.delete(lock_key)
+        return response
+
+    return wrapper
+
+
+def _replay(stored: dict, fingerprint: str, key: str) -> Response:
+    if stored["fingerprint"] != fingerprint:
+        return Response(
+            {"detail": "Idempotency-Key was already used with a different request payload."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    logger.info("Replaying stored response for idempotency key", extra={"idempotency_key": key})
+    return Response(
+        stored["data"],
+        status=stored["status"],
+        headers={IDEMPOTENT_REPLAYED_HEADER: "true"},
+    )
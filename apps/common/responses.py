@@ -0,0 +1,31 @@
+from typing import Any
+
+from django.http import HttpResponse
+from rest_framework import status as http_status
+
+from apps.common.schemas import get_type_adapter
+
+
+class SchemaJSONResponse(HttpResponse):
+    """JSON response rendered straight from pydantic schemas to bytes.
+
+    The body is produced in one pass by pydantic-core (TypeAdapter.dump_json) instead of
+    model_dump() followed by DRF's JSONRenderer re-encoding the resulting dicts.
+
+    Args:
+        data: A pydantic model, or any value matching schema_type (e.g. a list of schemas).
+        schema_type: Type used to serialize data; defaults to type(data). Required for
+            containers such as list[ScheduleSchema].
+        status: HTTP status code.
+        **dump_kwargs: Passed to dump_json (e.g. exclude, by_alias).
+    """
+
+    def __init__(
+        self, data, schema_type: Any = None, *, status=http_status.HTTP_200_OK, **dump_kwargs
+    ):
+        adapter = get_type_adapter(schema_type if schema_type is not None else type(data))
+        super().__init__(
+            adapter.dump_json(data, **dump_kwargs),
+            status=status,
+            content_type="application/json",
+        )
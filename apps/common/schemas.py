@@ -0,0 +1,10 @@
+from functools import lru_cache
+from typing import Any
+
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(schema_type: Any) -> TypeAdapter:
+    """Return a cached TypeAdapter; building one compiles a validator and serializer, so reuse it."""
+    return TypeAdapter(schema_type)
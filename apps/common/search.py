@@ -0,0 +1,27 @@
+from django.db.models import CharField, Q, Value
+from django.db.models.expressions import Combinable
+from django.db.models.functions import Concat, Lower, Trim
+
+# Sorts after every other code point, so "<prefix><PREFIX_UPPER_BOUND>" bounds all strings
+# starting with <prefix> under binary comparison.
+PREFIX_UPPER_BOUND = "\U0010ffff"
+
+
+def normalized_search_expression(expression: Combinable | str) -> Lower:
+    """SQL form stored in *_normalized search columns: trimmed and lowercased.
+
+    Search terms go through the same expression, so stored and searched text always
+    fold the same way (SQLite's LOWER only folds ASCII letters).
+    """
+    return Lower(Trim(expression))
+
+
+def prefix_filter(field: str, value: str) -> Q:
+    """Case-insensitive prefix match on a normalized column, as an index-friendly range.
+
+    Unlike LIKE/istartswith (case-insensitive LIKE cannot use a plain B-tree index on
+    SQLite) the range lets the database seek straight to the matching rows.
+    """
+    prefix = normalized_search_expression(Value(value, output_field=CharField()))
+    upper_bound = Concat(prefix, Value(PREFIX_UPPER_BOUND), output_field=CharField())
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": upper_bound})
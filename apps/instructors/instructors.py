@@ -15,6 +15,10 @@ from apps.users.services import create_user
 
 User = get_user_model()
 
+# Columns read by InstructorSchema and its nested UserSchema
+INSTRUCTOR_ROW_FIELDS = ("id", "created", "modified")
+INSTRUCTOR_USER_ROW_FIELDS = ("first_name", "last_name", "email", "phone_number")
+
 
 def get_or_create_user(data: dict) -> User:
     """Get a user by email or create a new one from provided data.
@@ -61,11 +65,39 @@ def get_instructor_from_id(pk) -> Instructor:
         Instructor: The matching Instructor instance.
     """
     try:
-        return Instructor.objects.get(pk=pk)
+        return instructors_queryset().get(pk=pk)
     except Instructor.DoesNotExist as exc:
         raise ObjectDoesNotExist("Instructor not found.") from exc
 
 
+def get_instructor_row_from_id(pk) -> dict:
+    """Return an Instructor as a dict row shaped like InstructorSchema or raise ObjectDoesNotExist.
+
+    Reads only the columns the schema needs, in a single query.
+
+    Raises:
+        ObjectDoesNotExist: If the Instructor does not exist.
+    """
+    row = next(instructor_rows(instructors_queryset().filter(pk=pk)), None)
+    if row is None:
+        raise ObjectDoesNotExist("Instructor not found.")
+    return row
+
+
 def instructors_queryset():
-    """Return a queryset of all instructors."""
-    return Instructor.objects.all()
+    """Return a queryset of all instructors with their users joined in."""
+    return Instructor.objects.select_related("user")
+
+
+def instructor_rows(queryset=None):
+    """Yield instructors (all by default) as dict rows shaped like InstructorSchema.
+
+    Reads instructor and user columns in one joined values() query and nests the user
+    columns under "user", without building Instructor or User instances.
+    """
+    if queryset is None:
+        queryset = instructors_queryset()
+    user_fields = {f"user__{field}": field for field in INSTRUCTOR_USER_ROW_FIELDS}
+    for row in queryset.values(*INSTRUCTOR_ROW_FIELDS, *user_fields):
+        row["user"] = {field: row.pop(lookup) for lookup, field in user_fields.items()}
+        yield row
@@ -8,11 +8,12 @@ from typing import Tuple
 
 from django.core.exceptions import ObjectDoesNotExist
 
-from apps.instructors.instructors import get_instructor_from_id
+from apps.instructors.instructors import get_instructor_from_id, get_instructor_row_from_id
 from apps.instructors.instructors import (
     get_or_create_instructor_user as _get_or_create_instructor_user,
 )
-from apps.instructors.instructors import instructors_queryset
+from apps.common.schemas import get_type_adapter
+from apps.instructors.instructors import instructor_rows
 from apps.instructors.schemas import InstructorSchema
 from apps.users.schemas import UserSchema
 
@@ -35,15 +36,20 @@ def get_or_create_instructor_user(validated_data: dict) -> Tuple[dict, bool]:
 def get_instructor_by_id(pk) -> dict:
     """Return an InstructorSchema as dict by primary key or raise ObjectDoesNotExist with a friendly message."""
     try:
-        instructor = get_instructor_from_id(pk)
+        row = get_instructor_row_from_id(pk)
     except ObjectDoesNotExist as exc:
         raise ObjectDoesNotExist("Instructor not found.") from exc
-    return InstructorSchema.model_validate(instructor).model_dump()
+    return InstructorSchema.model_validate(row).model_dump()
+
+
+def get_instructor_schema_list() -> list[InstructorSchema]:
+    """Return a list of InstructorSchema for all instructors, read as plain rows."""
+    return get_type_adapter(list[InstructorSchema]).validate_python(list(instructor_rows()))
 
 
 def get_instructors_list() -> list[dict]:
     """Return a list of InstructorSchema dicts for all instructors."""
-    return [InstructorSchema.model_validate(obj).model_dump() for obj in instructors_queryset()]
+    return [schema.model_dump() for schema in get_instructor_schema_list()]
 
 
 def update_instructor(pk, validated_data: dict, *, partial: bool = False) -> dict:
@@ -6,8 +6,10 @@ import pytest
 from django.core.exceptions import ObjectDoesNotExist
 
 from apps.instructors.models import Instructor
+from apps.instructors.schemas import InstructorSchema
 from apps.instructors.services import (
     get_instructor_by_id,
+    get_instructor_schema_list,
     get_instructors_list,
     get_or_create_instructor_user,
     update_instructor,
@@ -90,6 +92,13 @@ class TestGetInstructorsList:
             assert "id" in item and "created" in item and "modified" in item
             assert ("user" in item) or ("user_id" in item)
 
+    def test_rows_match_model_based_schemas(self, two_instructors):
+        expected = {
+            instructor.id: InstructorSchema.model_validate(instructor)
+            for instructor in two_instructors
+        }
+        assert {schema.id: schema for schema in get_instructor_schema_list()} == expected
+
 
 @pytest.mark.django_db
 class TestUpdateInstructor:
@@ -4,6 +4,7 @@ import uuid
 
 import pytest
 from django.urls import reverse
+from model_bakery import baker
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -43,6 +44,25 @@ class TestInstructorViewSet:
         assert "id" in sample
         assert ("user" in sample) or ("user_id" in sample)
 
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("count", [1, 25])
+    def test_list_instructors_query_count_is_constant(self, count, django_assert_num_queries):
+        for i in range(count):
+            baker.make("instructors.Instructor", user__email=f"count{i}@example.com")
+        client = APIClient()
+        # Instructors and their users are read in one joined query, whatever the count
+        with django_assert_num_queries(1):
+            resp = client.get(reverse("instructor-list"))
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp.json()) == count
+
+    @pytest.mark.django_db
+    def test_retrieve_instructor_reads_one_query(self, instructor, django_assert_num_queries):
+        client = APIClient()
+        with django_assert_num_queries(1):
+            resp = client.get(reverse("instructor-detail", args=[instructor.id]))
+        assert resp.json()["user"]["email"] == instructor.user.email
+
     @pytest.mark.django_db
     def test_retrieve_instructor(self, instructor):
         client = APIClient()
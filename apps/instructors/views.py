@@ -3,10 +3,12 @@
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 
+from apps.common.responses import SchemaJSONResponse
+from apps.instructors.schemas import InstructorSchema
 from apps.instructors.serializers import InstructorSerializer
 from apps.instructors.services import (
     get_instructor_by_id,
-    get_instructors_list,
+    get_instructor_schema_list,
     get_or_create_instructor_user,
     update_instructor,
 )
@@ -27,8 +29,7 @@ class InstructorViewSet(viewsets.ViewSet):
         return Response(instructor, status=status.HTTP_200_OK)
 
     def list(self, request):
-        data = get_instructors_list()
-        return Response(data, status=status.HTTP_200_OK)
+        return SchemaJSONResponse(get_instructor_schema_list(), list[InstructorSchema])
 
     def update(self, request, pk=None):
         serializer = InstructorSerializer(data=request.data)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from apps.members.models import Member, Reservation
+from apps.members.models import Member, Reservation, Waitlist
 
 
 @admin.register(Member)
@@ -13,3 +13,9 @@ class MemberAdmin(admin.ModelAdmin):
 class ReservationAdmin(admin.ModelAdmin):
     list_display = ("member", "schedule", "status")
     list_filter = ("status",)
+
+
+@admin.register(Waitlist)
+class WaitlistAdmin(admin.ModelAdmin):
+    list_display = ("member", "schedule", "position", "created")
+    list_filter = ("schedule",)
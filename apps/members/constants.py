@@ -2,3 +2,15 @@ RESERVATION_STATUS_RESERVED = "RESERVED"
 RESERVATION_STATUS_CANCELLED = "CANCELLED"
 RESERVATION_STATUS_ATTENDED = "ATTENDED"
 RESERVATION_STATUS_MISSED = "MISSED"
+
+# Statuses that occupy a seat in the schedule (counted by Schedule.reserved_count)
+RESERVATION_SEAT_HOLDING_STATUSES = (
+    RESERVATION_STATUS_RESERVED,
+    RESERVATION_STATUS_ATTENDED,
+    RESERVATION_STATUS_MISSED,
+)
+
+# Per-item outcomes of a bulk reservation request
+BULK_RESERVATION_RESERVED = "reserved"
+BULK_RESERVATION_FULL = "full"
+BULK_RESERVATION_NOT_FOUND = "not_found"
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.members.members import rebuild_reserved_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute Schedule.reserved_count from the stored reservations."
+
+    def handle(self, *args, **options):
+        fixed = rebuild_reserved_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt seat counters for {fixed} schedule(s)."))
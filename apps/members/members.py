@@ -1,9 +1,28 @@
-from django.db.models import QuerySet
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from apps.members import constants
 from apps.members.exceptions import RoomFullException, ReservationInvalidStateException
-from apps.members.models import Member, Reservation
-from apps.schedules.schedules import get_schedule_by_id
+from apps.members.models import Member, Reservation, Waitlist
+from apps.notifications.services import (
+    create_notification_from_template,
+    create_notifications_from_template_stream,
+)
+from apps.schedules.constants import SCHEDULE_STATUS_CANCELED
+from apps.schedules.models import Schedule
+from apps.schedules.schedules import (
+    get_schedule_by_id,
+    lock_schedules,
+    release_seat,
+    reserve_seat,
+    reserve_seats,
+)
 from apps.users.services import get_or_create_user
 from apps.verifications.services import create_verification_code
 
@@ -31,6 +50,21 @@ def get_or_create_member_user(validated_data: dict) -> tuple[Member, bool]:
     return member, created
 
 
+def get_or_create_member_by_user_id(user_id) -> Member:
+    """Return the Member for an existing User, creating it (and its verification) if missing."""
+    # First, ensure the referenced user exists to avoid FK violations when creating Member
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    user = User.objects.get(id=user_id)  # may raise DoesNotExist
+
+    # Ensure member exists for the given user; create if missing and trigger verification
+    member, created = Member.objects.get_or_create(user=user)
+    if created:
+        create_verification_code(user=member.user)
+    return member
+
+
 def get_scheduled_reservations_by_member_id_and_schedule_id(
     member_id: str, schedule_id: str
 ) -> QuerySet[Reservation]:
@@ -44,34 +78,68 @@ def create_reservation(validated_data: dict) -> Reservation:
     """Domain logic: create a Reservation for a member and schedule.
 
     Expects keys: user_id (UUID), schedule_id (UUID), optional notes.
+
+    The seat is taken and the reservation inserted in one transaction: reserve_seat
+    locks the schedule row while checking its counter against the room capacity, so
+    parallel bookings for the same class cannot overbook it.
+
+    Raises Schedule.DoesNotExist if the schedule does not exist.
+    Raises RoomFullException if the schedule has no seats left.
     """
-    # First, ensure the referenced user exists to avoid FK violations when creating Member
-    from django.contrib.auth import get_user_model
+    member = get_or_create_member_by_user_id(validated_data["user_id"])
 
-    User = get_user_model()
-    user = User.objects.get(id=validated_data["user_id"])  # may raise DoesNotExist
+    schedule_id = validated_data["schedule_id"]
+    with transaction.atomic():
+        if not reserve_seat(schedule_id):
+            # Distinguish a missing schedule (raises DoesNotExist) from a full one
+            get_schedule_by_id(schedule_id)
+            raise RoomFullException("Room is full.")
 
-    # Ensure member exists for the given user; create if missing and trigger verification
-    member, created = Member.objects.get_or_create(user=user)
-    if created:
-        create_verification_code(user=member.user)
+        reservation = Reservation.objects.create(
+            member=member,
+            schedule_id=schedule_id,
+            notes=validated_data.get("notes") or "",
+        )
+    return reservation
 
-    # Fetch Schedule model instance via domain function
-    schedule = get_schedule_by_id(validated_data["schedule_id"])
 
-    members_in_schedule = get_scheduled_reservations_by_member_id_and_schedule_id(
-        member.id, schedule.id
-    )
+def create_reservations_bulk(
+    validated_data: dict,
+) -> list[tuple[UUID, str, Reservation | None]]:
+    """Domain logic: book one member into many schedules with a handful of queries.
 
-    if members_in_schedule.count() > schedule.room.capacity:
-        raise RoomFullException("Room is full.")
+    Expects keys: user_id (UUID), schedule_ids (list of UUID), optional notes.
+    Duplicate schedule ids are booked once.
 
-    reservation = Reservation.objects.create(
-        member=member,
-        schedule=schedule,
-        notes=validated_data.get("notes") or "",
-    )
-    return reservation
+    All schedules are fetched and row-locked with a single query, in primary key
+    order so concurrent bulk requests cannot deadlock. Reservations are inserted
+    with one bulk_create and the seat counters bumped with one UPDATE.
+
+    Returns one (schedule_id, outcome, reservation) tuple per requested schedule, in
+    request order; outcome is one of the BULK_RESERVATION_* constants.
+    """
+    member = get_or_create_member_by_user_id(validated_data["user_id"])
+    schedule_ids = list(dict.fromkeys(validated_data["schedule_ids"]))
+    notes = validated_data.get("notes") or ""
+
+    results = []
+    with transaction.atomic():
+        schedules = {schedule.id: schedule for schedule in lock_schedules(schedule_ids)}
+        for schedule_id in schedule_ids:
+            schedule = schedules.get(schedule_id)
+            if schedule is None:
+                results.append((schedule_id, constants.BULK_RESERVATION_NOT_FOUND, None))
+            elif schedule.reserved_count >= schedule.room.capacity:
+                results.append((schedule_id, constants.BULK_RESERVATION_FULL, None))
+            else:
+                reservation = Reservation(member=member, schedule=schedule, notes=notes)
+                results.append((schedule_id, constants.BULK_RESERVATION_RESERVED, reservation))
+
+        to_create = [reservation for _, _, reservation in results if reservation is not None]
+        if to_create:
+            Reservation.objects.bulk_create(to_create)
+            reserve_seats([reservation.schedule_id for reservation in to_create])
+    return results
 
 
 def get_reservation_by_id(reservation_id: str) -> Reservation:
@@ -82,12 +150,195 @@ def get_reservation_by_id(reservation_id: str) -> Reservation:
 def cancel_reservation(reservation_id: str) -> Reservation:
     """Cancel a reservation if it is currently in RESERVED status.
 
+    The status change and the release of the seat happen in the same transaction,
+    with the reservation row locked so a double cancel cannot release two seats.
+
     Raises Reservation.DoesNotExist if the reservation does not exist.
     Raises ReservationInvalidStateException if the reservation is not in RESERVED status.
     """
-    reservation = get_reservation_by_id(reservation_id)
-    if reservation.status != constants.RESERVATION_STATUS_RESERVED:
-        raise ReservationInvalidStateException("Only RESERVED reservations can be cancelled.")
-    reservation.status = constants.RESERVATION_STATUS_CANCELLED
-    reservation.save(update_fields=["status", "modified"])
+    with transaction.atomic():
+        reservation = Reservation.objects.select_for_update().get(id=reservation_id)
+        if reservation.status != constants.RESERVATION_STATUS_RESERVED:
+            raise ReservationInvalidStateException("Only RESERVED reservations can be cancelled.")
+        reservation.status = constants.RESERVATION_STATUS_CANCELLED
+        reservation.save(update_fields=["status", "modified"])
+        # The freed seat goes to the head of the waitlist, if anyone is waiting
+        if promote_from_waitlist(reservation.schedule_id) is None:
+            release_seat(reservation.schedule_id)
     return reservation
+
+
+def join_waitlist(validated_data: dict) -> Waitlist | Reservation:
+    """Domain logic: put a member at the tail of a schedule's waitlist.
+
+    Expects keys: user_id (UUID), schedule_id (UUID), optional notes. Joining twice
+    returns the existing entry instead of taking a second position.
+
+    Callers usually get here after create_reservation found the room full, in another
+    transaction. If a seat was freed in between, it is reserved for the member instead,
+    since nobody would promote them from the queue of a class that is not full.
+
+    Returns the Waitlist entry, or the Reservation when a seat was free.
+    Raises Schedule.DoesNotExist if the schedule does not exist.
+    """
+    member = get_or_create_member_by_user_id(validated_data["user_id"])
+    schedule_id = validated_data["schedule_id"]
+
+    with transaction.atomic():
+        # Serialize queue writes per schedule so positions cannot collide
+        schedules = lock_schedules([schedule_id])
+        if not schedules:
+            raise Schedule.DoesNotExist("Schedule matching query does not exist.")
+        if schedules[0].reserved_count < schedules[0].room.capacity:
+            Waitlist.objects.filter(schedule_id=schedule_id, member=member).delete()
+            reserve_seats([schedule_id])
+            return Reservation.objects.create(
+                member=member,
+                schedule_id=schedule_id,
+                notes=validated_data.get("notes") or "",
+            )
+
+        existing = Waitlist.objects.filter(schedule_id=schedule_id, member=member).first()
+        if existing is not None:
+            return existing
+
+        # Positions are never reused, so the tail is the highest one including removed rows
+        tail = (
+            Waitlist.all_objects.filter(schedule_id=schedule_id)
+            .order_by("-position")
+            .values_list("position", flat=True)
+            .first()
+        )
+        return Waitlist.objects.create(
+            member=member, schedule_id=schedule_id, position=(tail or 0) + 1
+        )
+
+
+def promote_from_waitlist(schedule_id) -> Reservation | None:
+    """Hand a freed seat to the member at the head of the schedule's waitlist.
+
+    Must run in the transaction that freed the seat. The head is a single seek on the
+    partial waitlist_head_idx index, which holds only waiting entries, so the cost
+    grows with neither the queue length nor the number of past promotions.
+    The seat moves straight to the promoted member, so reserved_count is unchanged.
+
+    Returns the new Reservation, or None when nobody is waiting.
+    """
+    lock_schedules([schedule_id])
+    entry = Waitlist.objects.filter(schedule_id=schedule_id).order_by("position").first()
+    if entry is None:
+        return None
+
+    entry.delete()
+    reservation = Reservation.objects.create(member_id=entry.member_id, schedule_id=schedule_id)
+
+    from apps.members.tasks import async_notify_waitlist_promotion
+
+    transaction.on_commit(lambda: async_notify_waitlist_promotion.delay(str(reservation.id)))
+    return reservation
+
+
+def rebuild_reserved_counts() -> int:
+    """Recompute Schedule.reserved_count from Reservation rows.
+
+    Only schedules whose counter drifted from their seat-holding reservations are
+    rewritten, so a run over a consistent table is a single read query. The drifted
+    schedules are locked before the rewrite, so a booking still in flight commits (or
+    rolls back) before its reservation is counted.
+
+    Returns the number of schedules that were corrected.
+    """
+    seat_holding = Q(
+        reservations__status__in=constants.RESERVATION_SEAT_HOLDING_STATUSES,
+        reservations__is_removed=False,
+    )
+    drifted_ids = list(
+        Schedule.objects.annotate(held=Count("reservations", filter=seat_holding))
+        .exclude(reserved_count=F("held"))
+        .values_list("id", flat=True)
+    )
+    if not drifted_ids:
+        return 0
+
+    held = (
+        Reservation.objects.filter(
+            schedule_id=OuterRef("pk"),
+            status__in=constants.RESERVATION_SEAT_HOLDING_STATUSES,
+            is_removed=False,
+        )
+        .order_by()
+        .values("schedule_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    with transaction.atomic():
+        lock_schedules(drifted_ids)
+        return Schedule.objects.filter(id__in=drifted_ids).update(
+            reserved_count=Coalesce(Subquery(held), Value(0))
+        )
+
+
+def notify_waitlist_promotion(reservation_id: str) -> None:
+    """Tell a member that a freed seat was booked for them from the waitlist."""
+    reservation = Reservation.objects.select_related("member__user", "schedule").get(
+        id=reservation_id
+    )
+    create_notification_from_template(
+        "waitlist_promotion",
+        recipient_list=[reservation.member.user],
+        context={"start_time": reservation.schedule.start_time},
+        dedup_key=f"waitlist_promotion:{reservation.id}",
+    )
+
+
+def get_class_reminder_recipients(window_start: datetime, window_end: datetime):
+    """
+    Yields (user id, dedup key, context) for every RESERVED seat of a class in the window.
+
+    Schedules are found with one range query on the indexed Schedule.start_time; their
+    reservations are then streamed with iterator(), CLASS_REMINDER_CHUNK_SIZE rows at a
+    time, as plain rows rather than model instances.
+    """
+    schedule_ids = list(
+        Schedule.objects.filter(start_time__gt=window_start, start_time__lte=window_end)
+        .exclude(status=SCHEDULE_STATUS_CANCELED)
+        .values_list("id", flat=True)
+    )
+    if not schedule_ids:
+        return
+    reservations = (
+        Reservation.objects.filter(
+            schedule_id__in=schedule_ids, status=constants.RESERVATION_STATUS_RESERVED
+        )
+        .order_by()
+        .values_list(
+            "id",
+            "member__user_id",
+            "member__user__first_name",
+            "schedule__start_time",
+            "schedule__room__name",
+        )
+    )
+    for reservation_id, user_id, first_name, start_time, room_name in reservations.iterator(
+        chunk_size=settings.CLASS_REMINDER_CHUNK_SIZE
+    ):
+        context = {"first_name": first_name, "start_time": start_time, "room_name": room_name}
+        yield user_id, f"class_reminder:{reservation_id}", context
+
+
+def send_class_reminders(now: datetime | None = None) -> int:
+    """
+    Reminds members of their classes starting within the next CLASS_REMINDER_LEAD_MINUTES.
+
+    Every run covers the whole window, so a missed run is caught up by the next one; the
+    dedup key of each reservation keeps members from being reminded twice. Memory stays
+    bounded by the chunk and batch sizes however many reservations there are.
+
+    Returns:
+        int: The number of reminders created.
+    """
+    now = now or timezone.now()
+    window_end = now + timedelta(minutes=settings.CLASS_REMINDER_LEAD_MINUTES)
+    return create_notifications_from_template_stream(
+        "class_reminder", get_class_reminder_recipients(now, window_end)
+    )
@@ -0,0 +1,72 @@
+# Generated by Django 6.0a1 on 2026-10-18 07:40
+
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("members", "0002_reservation"),
+        ("schedules", "0002_schedule_reserved_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Waitlist",
+            fields=[
+                (
+                    "created",
+                    model_utils.fields.AutoCreatedField(
+                        default=django.utils.timezone.now, editable=False, verbose_name="created"
+                    ),
+                ),
+                (
+                    "modified",
+                    model_utils.fields.AutoLastModifiedField(
+                        default=django.utils.timezone.now, editable=False, verbose_name="modified"
+                    ),
+                ),
+                ("is_removed", models.BooleanField(default=False)),
+                (
+                    "id",
+                    model_utils.fields.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("position", models.PositiveIntegerField()),
+                (
+                    "member",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to="members.member",
+                    ),
+                ),
+                (
+                    "schedule",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="waitlist_entries",
+                        to="schedules.schedule",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["schedule", "position"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("schedule", "position"), name="members_waitlist_schedule_position"
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("is_removed", False)),
+                        fields=("schedule", "member"),
+                        name="members_waitlist_unique_member",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0a1 on 2026-10-18 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("members", "0003_waitlist"),
+        ("schedules", "0002_schedule_reserved_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                condition=models.Q(("is_removed", False)),
+                fields=["schedule", "member", "status"],
+                name="reservation_sched_member_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0a1 on 2026-10-19 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("members", "0004_reservation_sched_member_idx"),
+        ("schedules", "0003_schedule_start_id_live_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="waitlist",
+            index=models.Index(
+                condition=models.Q(("is_removed", False)),
+                fields=["schedule", "position"],
+                name="waitlist_head_idx",
+            ),
+        ),
+    ]
@@ -42,5 +42,60 @@ class Reservation(SoftDeletableModel, UUIDModel, TimeStampedModel):
         ),
     )
 
+    class Meta:
+        indexes = [
+            # Lookups of a member's reservations for a schedule by status
+            models.Index(
+                fields=["schedule", "member", "status"],
+                condition=models.Q(is_removed=False),
+                name="reservation_sched_member_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.member} → {self.schedule} ({self.status})"
+
+
+class Waitlist(SoftDeletableModel, UUIDModel, TimeStampedModel):
+    """FIFO queue of members waiting for a seat on a full schedule.
+
+    Positions only ever grow per schedule; promoted entries are soft deleted, so the
+    head of the queue is the lowest position among the non-removed rows.
+    """
+
+    member = models.ForeignKey(
+        Member,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+    )
+    schedule = models.ForeignKey(
+        Schedule,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+    )
+    position = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["schedule", "position"]
+        indexes = [
+            # Head of the queue: only waiting entries, so promoted ones are never walked
+            models.Index(
+                fields=["schedule", "position"],
+                condition=models.Q(is_removed=False),
+                name="waitlist_head_idx",
+            ),
+        ]
+        constraints = [
+            # Also the index used to find the tail of a schedule's queue
+            models.UniqueConstraint(
+                fields=["schedule", "position"], name="members_waitlist_schedule_position"
+            ),
+            models.UniqueConstraint(
+                fields=["schedule", "member"],
+                condition=models.Q(is_removed=False),
+                name="members_waitlist_unique_member",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.member} → {self.schedule} (#{self.position})"
@@ -25,3 +25,20 @@ class ReservationSchema(BaseModel):
     notes: str | None = None
 
     model_config = {"from_attributes": True}
+
+
+class BulkReservationResultSchema(BaseModel):
+    schedule_id: uuid.UUID
+    status: str
+    reservation: ReservationSchema | None = None
+
+
+class WaitlistSchema(BaseModel):
+    id: uuid.UUID
+    created: datetime
+    modified: datetime
+    member_id: uuid.UUID
+    schedule_id: uuid.UUID
+    position: int
+
+    model_config = {"from_attributes": True}
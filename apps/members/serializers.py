@@ -14,3 +14,16 @@ class ReservationSerializer(serializers.Serializer):
     user_id = serializers.UUIDField()
     schedule_id = serializers.UUIDField()
     notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    waitlist = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Join the schedule's waitlist instead of failing when the room is full.",
+    )
+
+
+class BulkReservationSerializer(serializers.Serializer):
+    user_id = serializers.UUIDField()
+    schedule_ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=100
+    )
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
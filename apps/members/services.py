@@ -1,7 +1,13 @@
 from uuid import UUID
 
 from apps.members import members
-from apps.members.schemas import MemberSchema, ReservationSchema
+from apps.members.models import Reservation
+from apps.members.schemas import (
+    BulkReservationResultSchema,
+    MemberSchema,
+    ReservationSchema,
+    WaitlistSchema,
+)
 from apps.users.services import get_or_create_user as _get_or_create_user
 
 
@@ -30,7 +36,31 @@ def create_reservation(validated_data: dict) -> ReservationSchema:
     return ReservationSchema.model_validate(reservation)
 
 
+def create_reservations_bulk(validated_data: dict) -> list[BulkReservationResultSchema]:
+    """Application service: book many schedules at once and return per-item results."""
+    return [
+        BulkReservationResultSchema(
+            schedule_id=schedule_id,
+            status=outcome,
+            reservation=ReservationSchema.model_validate(reservation) if reservation else None,
+        )
+        for schedule_id, outcome, reservation in members.create_reservations_bulk(validated_data)
+    ]
+
+
 def cancel_reservation(reservation_id: str) -> ReservationSchema:
     """Application service: cancel reservation and return ReservationSchema."""
     reservation = members.cancel_reservation(reservation_id)
     return ReservationSchema.model_validate(reservation)
+
+
+def join_waitlist(validated_data: dict) -> WaitlistSchema | ReservationSchema:
+    """
+    Application service: add member to a schedule's waitlist and return WaitlistSchema.
+
+    Returns a ReservationSchema instead if a seat was free by the time the member joined.
+    """
+    entry = members.join_waitlist(validated_data)
+    if isinstance(entry, Reservation):
+        return ReservationSchema.model_validate(entry)
+    return WaitlistSchema.model_validate(entry)
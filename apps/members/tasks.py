@@ -0,0 +1,48 @@
+import logging
+
+from celery import shared_task
+
+from apps.members.members import (
+    notify_waitlist_promotion,
+    rebuild_reserved_counts,
+    send_class_reminders,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def async_rebuild_reserved_counts():
+    """
+    Periodic task that reconciles Schedule.reserved_count with Reservation rows.
+
+    The counter is maintained on every booking and cancellation; this task only
+    repairs drift caused by writes that bypass the booking path (admin edits,
+    manual SQL, restored backups).
+    """
+    fixed = rebuild_reserved_counts()
+    if fixed:
+        logger.warning("Rebuilt drifted schedule seat counters", extra={"count": fixed})
+    return fixed
+
+
+@shared_task
+def async_notify_waitlist_promotion(reservation_id):
+    """
+    Asynchronous task that notifies a member promoted from a waitlist.
+
+    Enqueued once the cancellation that freed the seat has been committed.
+    """
+    notify_waitlist_promotion(reservation_id)
+
+
+@shared_task
+def async_send_class_reminders():
+    """
+    Periodic task that reminds members of their upcoming classes.
+
+    Runs every few minutes; reminders already created are skipped by their dedup key.
+    """
+    created = send_class_reminders()
+    logger.info("Created class reminders", extra={"count": created})
+    return created
@@ -2,34 +2,52 @@ import uuid
 import datetime
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.utils import timezone
 
 from apps.members import constants
-from apps.members.models import Member, Reservation
-from apps.members.members import get_reservation_by_id, cancel_reservation
-from apps.members.exceptions import ReservationInvalidStateException
+from apps.members.models import Member, Reservation, Waitlist
+from apps.members.members import (
+    cancel_reservation,
+    create_reservation,
+    create_reservations_bulk,
+    get_reservation_by_id,
+    get_scheduled_reservations_by_member_id_and_schedule_id,
+    join_waitlist,
+    notify_waitlist_promotion,
+    rebuild_reserved_counts,
+    send_class_reminders,
+)
+from apps.members.exceptions import ReservationInvalidStateException, RoomFullException
+from apps.notifications.models import Notification
 from apps.studios.models import Studio, Room
 from apps.instructors.models import Instructor
 from apps.schedules.models import Schedule
+from apps.schedules.schedules import lock_schedules
 
 
 @pytest.mark.django_db
 class TestMembersDomain:
-    def _build_graph(self):
-        # Create user and related member and instructor
+    def _make_member(self):
         User = get_user_model()
         user_member = User.objects.create_user(
             username=f"member_{uuid.uuid4()}", email=f"m_{uuid.uuid4()}@ex.com", password="pass"
         )
+        return Member.objects.create(user=user_member)
+
+    def _build_graph(self, capacity=10):
+        # Create user and related member and instructor
+        User = get_user_model()
+        member = self._make_member()
         user_instructor = User.objects.create_user(
             username=f"instr_{uuid.uuid4()}", email=f"i_{uuid.uuid4()}@ex.com", password="pass"
         )
-        member = Member.objects.create(user=user_member)
         instructor = Instructor.objects.create(user=user_instructor)
 
         # Create studio, room, and schedule
         studio = Studio.objects.create(name="S1", address="Addr", is_active=True)
-        room = Room.objects.create(studio=studio, name="R1", capacity=10, is_active=True)
+        room = Room.objects.create(studio=studio, name="R1", capacity=capacity, is_active=True)
         schedule = Schedule.objects.create(
             instructor=instructor,
             start_time=timezone.now() + datetime.timedelta(days=1),
@@ -74,3 +92,271 @@ class TestMembersDomain:
     def test_cancel_reservation_not_found(self):
         with pytest.raises(Reservation.DoesNotExist):
             cancel_reservation(str(uuid.uuid4()))
+
+    def test_create_reservation_takes_a_seat(self):
+        member, schedule = self._build_graph()
+
+        reservation = create_reservation(
+            {"user_id": member.user_id, "schedule_id": schedule.id, "notes": "Front row"}
+        )
+
+        assert reservation.member_id == member.id
+        assert reservation.schedule_id == schedule.id
+        assert reservation.notes == "Front row"
+        schedule.refresh_from_db()
+        assert schedule.reserved_count == 1
+
+    def test_create_reservation_raises_when_room_full(self):
+        member, schedule = self._build_graph(capacity=1)
+        other = self._make_member()
+        create_reservation({"user_id": member.user_id, "schedule_id": schedule.id})
+
+        with pytest.raises(RoomFullException):
+            create_reservation({"user_id": other.user_id, "schedule_id": schedule.id})
+
+        schedule.refresh_from_db()
+        assert schedule.reserved_count == 1
+        assert Reservation.objects.filter(schedule=schedule).count() == 1
+
+    def test_create_reservation_unknown_schedule_raises_does_not_exist(self):
+        member, _schedule = self._build_graph()
+        with pytest.raises(Schedule.DoesNotExist):
+            create_reservation({"user_id": member.user_id, "schedule_id": uuid.uuid4()})
+
+    def test_cancel_reservation_releases_seat(self):
+        member, schedule = self._build_graph(capacity=1)
+        reservation = create_reservation({"user_id": member.user_id, "schedule_id": schedule.id})
+
+        cancel_reservation(str(reservation.id))
+
+        schedule.refresh_from_db()
+        assert schedule.reserved_count == 0
+        # The freed seat can be booked again
+        create_reservation({"user_id": self._make_member().user_id, "schedule_id": schedule.id})
+
+    def test_rebuild_reserved_counts_fixes_drifted_counters(self):
+        member, schedule = self._build_graph()
+        Reservation.objects.create(member=member, schedule=schedule)
+        Reservation.objects.create(
+            member=self._make_member(),
+            schedule=schedule,
+            status=constants.RESERVATION_STATUS_ATTENDED,
+        )
+        Reservation.objects.create(
+            member=self._make_member(),
+            schedule=schedule,
+            status=constants.RESERVATION_STATUS_CANCELLED,
+        )
+        # Rows written outside create_reservation leave the counter at zero
+        assert Schedule.objects.get(id=schedule.id).reserved_count == 0
+
+        assert rebuild_reserved_counts() == 1
+
+        schedule.refresh_from_db()
+        assert schedule.reserved_count == 2
+        # Nothing left to fix on a second run
+        assert rebuild_reserved_counts() == 0
+
+    def test_rebuild_reserved_counts_locks_drifted_schedules_and_skips_removed_rows(self, mocker):
+        member, schedule = self._build_graph()
+        Reservation.objects.create(member=member, schedule=schedule)
+        Reservation.objects.create(member=self._make_member(), schedule=schedule).delete()
+        assert Reservation.all_objects.filter(schedule=schedule).count() == 2
+
+        lock = mocker.patch("apps.members.members.lock_schedules", wraps=lock_schedules)
+
+        assert rebuild_reserved_counts() == 1
+
+        lock.assert_called_once_with([schedule.id])
+        schedule.refresh_from_db()
+        assert schedule.reserved_count == 1
+
+    def test_rebuild_reserved_counts_command(self, capsys):
+        member, schedule = self._build_graph()
+        Reservation.objects.create(member=member, schedule=schedule)
+
+        call_command("rebuild_reserved_counts")
+
+        schedule.refresh_from_db()
+        assert schedule.reserved_count == 1
+        assert "1 schedule(s)" in capsys.readouterr().out
+
+    def test_join_waitlist_assigns_fifo_positions(self):
+        member, schedule = self._build_graph(capacity=1)
+        Schedule.objects.filter(id=schedule.id).update(reserved_count=1)
+        other = self._make_member()
+
+        first = join_waitlist({"user_id": member.user_id, "schedule_id": schedule.id})
+        second = join_waitlist({"user_id": other.user_id, "schedule_id": schedule.id})
+        again = join_waitlist({"user_id": member.user_id, "schedule_id": schedule.id})
+
+        assert (first.position, second.position) == (1, 2)
+        # Joining twice keeps the original place in the queue
+        assert again.id == first.id
+        assert Waitlist.objects.filter(schedule=schedule).count() == 2
+
+    def test_join_waitlist_reserves_a_seat_freed_before_joining(self):
+        member, schedule = self._build_graph(capacity=1)
+
+        # create_reservation saw the room full, then the seat was released
+        result = join_waitlist({"user_id": member.user_id, "schedule_id": schedule.id})
+
+        assert isinstance(result, Reservation)
+        assert result.status == constants.RESERVATION_STATUS_RESERVED
+        assert not Waitlist.objects.filter(schedule=schedule).exists()
+        schedule.refresh_from_db()
+        assert schedule.reserved_count == 1
+
+    def test_join_waitlist_unknown_schedule_raises_does_not_exist(self):
+        member, _schedule = self._build_graph()
+        with pytest.raises(Schedule.DoesNotExist):
+            join_waitlist({"user_id": member.user_id, "schedule_id": uuid.uuid4()})
+
+    def test_cancel_reservation_promotes_waitlist_head(
+        self, mocker, django_capture_on_commit_callbacks
+    ):
+        member, schedule = self._build_graph(capacity=1)
+        head, tail = self._make_member(), self._make_member()
+        reservation = create_reservation({"user_id": member.user_id, "schedule_id": schedule.id})
+        join_waitlist({"user_id": head.user_id, "schedule_id": schedule.id})
+        join_waitlist({"user_id": tail.user_id, "schedule_id": schedule.id})
+        notify_mock = mocker.patch("apps.members.tasks.async_notify_waitlist_promotion.delay")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            cancel_reservation(str(reservation.id))
+
+        promoted = Reservation.objects.get(
+            schedule=schedule, member=head, status=constants.RESERVATION_STATUS_RESERVED
+        )
+        notify_mock.assert_called_once_with(str(promoted.id))
+        # The seat moved to the promoted member, so the counter is unchanged
+        schedule.refresh_from_db()
+        assert schedule.reserved_count == 1
+        remaining = list(Waitlist.objects.filter(schedule=schedule))
+        assert [(entry.member_id, entry.position) for entry in remaining] == [(tail.id, 2)]
+
+    def test_waitlist_head_seek_skips_past_promotions(self, mocker):
+        mocker.patch("apps.members.tasks.async_notify_waitlist_promotion.delay")
+        member, schedule = self._build_graph(capacity=1)
+        reservation = create_reservation({"user_id": member.user_id, "schedule_id": schedule.id})
+        waiting = [self._make_member() for _ in range(4)]
+        for entry in waiting:
+            join_waitlist({"user_id": entry.user_id, "schedule_id": schedule.id})
+
+        for expected in waiting[:3]:
+            cancel_reservation(str(reservation.id))
+            reservation = Reservation.objects.get(
+                schedule=schedule, status=constants.RESERVATION_STATUS_RESERVED
+            )
+            assert reservation.member_id == expected.id
+
+        # Promoted entries are soft deleted; the head query only sees the waiting one
+        assert Waitlist.all_objects.filter(schedule=schedule).count() == 4
+        head = Waitlist.objects.filter(schedule_id=schedule.id).order_by("position")
+        assert list(head.values_list("member_id", flat=True)) == [waiting[3].id]
+        if connection.vendor == "sqlite":
+            assert "waitlist_head_idx" in head.explain()
+
+    def test_notify_waitlist_promotion_is_idempotent(self, mocker):
+        mocker.patch("apps.notifications.tasks.async_send_notifications.delay")
+        member, schedule = self._build_graph()
+        reservation = Reservation.objects.create(member=member, schedule=schedule)
+
+        # A retried task must not notify the member twice
+        notify_waitlist_promotion(str(reservation.id))
+        notify_waitlist_promotion(str(reservation.id))
+
+        notification = Notification.objects.get(user=member.user)
+        assert notification.dedup_key == f"waitlist_promotion:{reservation.id}"
+
+    def test_create_reservations_bulk_reports_per_item_results(self, django_assert_max_num_queries):
+        member, open_schedule = self._build_graph(capacity=1)
+        full_schedule = Schedule.objects.create(
+            instructor=open_schedule.instructor,
+            start_time=open_schedule.start_time + datetime.timedelta(days=1),
+            room=open_schedule.room,
+            reserved_count=1,
+        )
+        missing_id = uuid.uuid4()
+
+        # Member lookup + lock + insert + counter update, whatever the batch size
+        with django_assert_max_num_queries(7):
+            results = create_reservations_bulk(
+                {
+                    "user_id": member.user_id,
+                    "schedule_ids": [
+                        open_schedule.id,
+                        full_schedule.id,
+                        missing_id,
+                        open_schedule.id,
+                    ],
+                }
+            )
+
+        outcomes = [(schedule_id, outcome) for schedule_id, outcome, _ in results]
+        assert outcomes == [
+            (open_schedule.id, constants.BULK_RESERVATION_RESERVED),
+            (full_schedule.id, constants.BULK_RESERVATION_FULL),
+            (missing_id, constants.BULK_RESERVATION_NOT_FOUND),
+        ]
+        reservation = results[0][2]
+        assert Reservation.objects.get(id=reservation.id).member_id == member.id
+        open_schedule.refresh_from_db()
+        full_schedule.refresh_from_db()
+        assert open_schedule.reserved_count == 1
+        assert full_schedule.reserved_count == 1
+
+    @pytest.mark.skipif(connection.vendor != "sqlite", reason="Checks the SQLite query plan")
+    def test_scheduled_reservations_lookup_uses_composite_index(self):
+        member, schedule = self._build_graph()
+
+        plan = get_scheduled_reservations_by_member_id_and_schedule_id(
+            member_id=member.id, schedule_id=schedule.id
+        ).explain()
+
+        assert "reservation_sched_member_idx" in plan
+
+    def test_send_class_reminders_notifies_reserved_seats_in_window_once(
+        self, mocker, settings, django_capture_on_commit_callbacks
+    ):
+        settings.CLASS_REMINDER_LEAD_MINUTES = 120
+        settings.NOTIFICATIONS_STREAM_BATCH_SIZE = 2
+        delay_mock = mocker.patch("apps.notifications.tasks.async_send_notifications.delay")
+        member, soon = self._build_graph()
+        now = timezone.now()
+        Schedule.objects.filter(id=soon.id).update(start_time=now + datetime.timedelta(hours=1))
+        later = Schedule.objects.create(
+            instructor=soon.instructor, room=soon.room, start_time=now + datetime.timedelta(hours=3)
+        )
+        reserved = [
+            Reservation.objects.create(member=m, schedule=soon)
+            for m in [member, self._make_member(), self._make_member()]
+        ]
+        Reservation.objects.create(
+            member=self._make_member(),
+            schedule=soon,
+            status=constants.RESERVATION_STATUS_CANCELLED,
+        )
+        Reservation.objects.create(member=self._make_member(), schedule=later)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert send_class_reminders(now) == 3
+            # A later run in the same window does not remind anyone twice
+            assert send_class_reminders(now + datetime.timedelta(minutes=5)) == 0
+
+        reminders = Notification.objects.filter(dedup_key__startswith="class_reminder:")
+        assert {n.user_id for n in reminders} == {r.member.user_id for r in reserved}
+        assert {n.dedup_key for n in reminders} == {f"class_reminder:{r.id}" for r in reserved}
+        assert all("R1" in n.message and n.html_message for n in reminders)
+        # Enqueued batch by batch
+        assert [len(c.kwargs["notification_ids"]) for c in delay_mock.call_args_list] == [2, 1]
+
+    def test_send_class_reminders_skips_canceled_classes(self, mocker):
+        mocker.patch("apps.notifications.tasks.async_send_notifications.delay")
+        member, schedule = self._build_graph()
+        Schedule.objects.filter(id=schedule.id).update(
+            start_time=timezone.now() + datetime.timedelta(minutes=30), status="canceled"
+        )
+        Reservation.objects.create(member=member, schedule=schedule)
+
+        assert send_class_reminders() == 0
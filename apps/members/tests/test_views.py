@@ -2,11 +2,14 @@ import datetime
 import uuid
 
 import pytest
+from django.core.cache import caches
 from django.urls import reverse
 from rest_framework.test import APIClient
 
+from apps.members import constants
 from apps.members.models import Reservation
-from apps.members.exceptions import ReservationInvalidStateException
+from apps.members.schemas import BulkReservationResultSchema, ReservationSchema, WaitlistSchema
+from apps.members.exceptions import ReservationInvalidStateException, RoomFullException
 
 
 @pytest.mark.django_db
@@ -251,6 +254,109 @@ class TestMemberViewSet:
         assert resp.data["email"] == payload["email"]
 
 
+@pytest.mark.django_db
+class TestReservationWaitlistViewSet:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def payload(self):
+        return {"user_id": str(uuid.uuid4()), "schedule_id": str(uuid.uuid4())}
+
+    def test_create_returns_400_when_full_without_waitlist(self, mocker, api_client, payload):
+        mocker.patch(
+            "apps.members.views.create_reservation", side_effect=RoomFullException("Room is full.")
+        )
+        join_mock = mocker.patch("apps.members.views.join_waitlist")
+
+        resp = api_client.post(reverse("reservation-create"), data=payload, format="json")
+
+        assert resp.status_code == 400
+        assert resp.data["detail"] == "Room is full."
+        join_mock.assert_not_called()
+
+    def test_create_returns_202_and_joins_waitlist_when_full(self, mocker, api_client, payload):
+        mocker.patch(
+            "apps.members.views.create_reservation", side_effect=RoomFullException("Room is full.")
+        )
+        entry = mocker.Mock(spec=WaitlistSchema)
+        entry.model_dump.return_value = {"schedule_id": payload["schedule_id"], "position": 3}
+        join_mock = mocker.patch("apps.members.views.join_waitlist", return_value=entry)
+
+        resp = api_client.post(
+            reverse("reservation-create"), data={**payload, "waitlist": True}, format="json"
+        )
+
+        assert resp.status_code == 202
+        assert resp.data["position"] == 3
+        called_args, _ = join_mock.call_args
+        assert str(called_args[0]["schedule_id"]) == payload["schedule_id"]
+
+    def test_create_returns_201_when_a_seat_freed_before_joining(self, mocker, api_client, payload):
+        mocker.patch(
+            "apps.members.views.create_reservation", side_effect=RoomFullException("Room is full.")
+        )
+        reservation = mocker.Mock(spec=ReservationSchema)
+        reservation.model_dump.return_value = {"schedule_id": payload["schedule_id"]}
+        mocker.patch("apps.members.views.join_waitlist", return_value=reservation)
+
+        resp = api_client.post(
+            reverse("reservation-create"), data={**payload, "waitlist": True}, format="json"
+        )
+
+        assert resp.status_code == 201
+
+
+@pytest.mark.django_db
+class TestReservationBulkViewSet:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    def _make_result(self, schedule_id: uuid.UUID, status: str):
+        return BulkReservationResultSchema(schedule_id=schedule_id, status=status)
+
+    def test_bulk_create_returns_201_when_all_reserved(self, mocker, api_client):
+        schedule_ids = [uuid.uuid4(), uuid.uuid4()]
+        bulk_mock = mocker.patch(
+            "apps.members.views.create_reservations_bulk",
+            return_value=[
+                self._make_result(schedule_id, constants.BULK_RESERVATION_RESERVED)
+                for schedule_id in schedule_ids
+            ],
+        )
+        payload = {"user_id": str(uuid.uuid4()), "schedule_ids": [str(s) for s in schedule_ids]}
+
+        resp = api_client.post(reverse("reservation-bulk-create"), data=payload, format="json")
+
+        assert resp.status_code == 201
+        called_args, _ = bulk_mock.call_args
+        assert called_args[0]["schedule_ids"] == schedule_ids
+        assert [item["status"] for item in resp.data] == ["reserved", "reserved"]
+
+    def test_bulk_create_returns_207_when_some_items_fail(self, mocker, api_client):
+        reserved_id, full_id = uuid.uuid4(), uuid.uuid4()
+        mocker.patch(
+            "apps.members.views.create_reservations_bulk",
+            return_value=[
+                self._make_result(reserved_id, constants.BULK_RESERVATION_RESERVED),
+                self._make_result(full_id, constants.BULK_RESERVATION_FULL),
+            ],
+        )
+        payload = {"user_id": str(uuid.uuid4()), "schedule_ids": [str(reserved_id), str(full_id)]}
+
+        resp = api_client.post(reverse("reservation-bulk-create"), data=payload, format="json")
+
+        assert resp.status_code == 207
+        assert resp.data[1]["status"] == "full"
+
+    def test_bulk_create_rejects_empty_schedule_list(self, api_client):
+        payload = {"user_id": str(uuid.uuid4()), "schedule_ids": []}
+        resp = api_client.post(reverse("reservation-bulk-create"), data=payload, format="json")
+        assert resp.status_code == 400
+
+
 @pytest.mark.django_db
 class TestReservationCancelViewSet:
     @pytest.fixture
@@ -321,3 +427,113 @@ class TestReservationCancelViewSet:
 
         assert resp.status_code == 400
         assert resp.data["detail"] == "Only RESERVED reservations can be cancelled."
+
+
+@pytest.mark.django_db
+class TestIdempotencyKey:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def payload(self):
+        return {"user_id": str(uuid.uuid4()), "schedule_id": str(uuid.uuid4())}
+
+    def _mock_create_reservation(self, mocker, payload):
+        reservation = mocker.Mock()
+        reservation.model_dump.return_value = {
+            "id": str(uuid.uuid4()),
+            "schedule_id": payload["schedule_id"],
+            "status": "RESERVED",
+        }
+        return mocker.patch("apps.members.views.create_reservation", return_value=reservation)
+
+    def test_retry_with_same_key_replays_first_response(self, mocker, api_client, payload):
+        create_res_mock = self._mock_create_reservation(mocker, payload)
+        url = reverse("reservation-create")
+
+        first = api_client.post(url, data=payload, format="json", HTTP_IDEMPOTENCY_KEY="abc-123")
+        retry = api_client.post(url, data=payload, format="json", HTTP_IDEMPOTENCY_KEY="abc-123")
+
+        create_res_mock.assert_called_once()
+        assert retry.status_code == first.status_code == 201
+        assert retry.data == first.data
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first.headers
+
+    def test_requests_without_key_are_not_deduplicated(self, mocker, api_client, payload):
+        create_res_mock = self._mock_create_reservation(mocker, payload)
+        url = reverse("reservation-create")
+
+        api_client.post(url, data=payload, format="json")
+        api_client.post(url, data=payload, format="json")
+
+        assert create_res_mock.call_count == 2
+
+    def test_key_reused_with_different_payload_returns_422(self, mocker, api_client, payload):
+        create_res_mock = self._mock_create_reservation(mocker, payload)
+        url = reverse("reservation-create")
+
+        api_client.post(url, data=payload, format="json", HTTP_IDEMPOTENCY_KEY="abc-123")
+        resp = api_client.post(
+            url,
+            data={**payload, "notes": "changed"},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="abc-123",
+        )
+
+        assert resp.status_code == 422
+        create_res_mock.assert_called_once()
+
+    def test_retry_while_first_request_in_flight_returns_409(self, mocker, api_client, payload):
+        create_res_mock = self._mock_create_reservation(mocker, payload)
+        url = reverse("reservation-create")
+        caches["idempotency"].add(f"idempotency:POST:{url}:abc-123:lock", "in-flight")
+
+        resp = api_client.post(url, data=payload, format="json", HTTP_IDEMPOTENCY_KEY="abc-123")
+
+        assert resp.status_code == 409
+        create_res_mock.assert_not_called()
+
+    def test_retry_taking_lock_after_first_request_finished_replays(
+        self, mocker, api_client, payload
+    ):
+        create_res_mock = self._mock_create_reservation(mocker, payload)
+        url = reverse("reservation-create")
+        first = api_client.post(url, data=payload, format="json", HTTP_IDEMPOTENCY_KEY="abc-123")
+
+        # The retry read the cache before the first response was stored, then took the
+        # lock after the first request released it
+        cache = caches["idempotency"]
+        real_get = cache.get
+        reads = iter([None])
+        mocker.patch.object(
+            cache, "get", side_effect=lambda *args, **kwargs: next(reads, real_get(*args, **kwargs))
+        )
+        retry = api_client.post(url, data=payload, format="json", HTTP_IDEMPOTENCY_KEY="abc-123")
+
+        create_res_mock.assert_called_once()
+        assert retry.status_code == first.status_code == 201
+        assert retry.data == first.data
+        assert retry.headers["Idempotent-Replayed"] == "true"
+
+    def test_member_registration_retry_does_not_register_twice(self, mocker, api_client):
+        member_schema = mocker.Mock()
+        member_schema.user.model_dump.return_value = {"email": "new.member@example.com"}
+        get_or_create_mock = mocker.patch(
+            "apps.members.views.get_or_create_member_user", return_value=(member_schema, True)
+        )
+        payload = {
+            "email": "new.member@example.com",
+            "password": "S3cretPass!",
+            "first_name": "New",
+            "last_name": "Member",
+            "phone_number": "+1234567890",
+        }
+        url = reverse("member-register")
+
+        first = api_client.post(url, data=payload, format="json", HTTP_IDEMPOTENCY_KEY="reg-1")
+        retry = api_client.post(url, data=payload, format="json", HTTP_IDEMPOTENCY_KEY="reg-1")
+
+        get_or_create_mock.assert_called_once()
+        assert first.status_code == retry.status_code == 201
@@ -5,6 +5,11 @@ from apps.members.views import MemberView, ReservationView
 urlpatterns = [
     path("register/", MemberView.as_view({"post": "create"}), name="member-register"),
     path("reservations/", ReservationView.as_view({"post": "create"}), name="reservation-create"),
+    path(
+        "reservations/bulk/",
+        ReservationView.as_view({"post": "bulk_create"}),
+        name="reservation-bulk-create",
+    ),
     path(
         "reservations/<uuid:pk>/cancel/",
         ReservationView.as_view({"post": "cancel"}),
@@ -2,13 +2,27 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from apps.common.idempotency import idempotent
+from apps.members import constants
 from apps.members.exceptions import RoomFullException, ReservationInvalidStateException
-from apps.members.serializers import MemberSerializer, ReservationSerializer
-from apps.members.services import get_or_create_member_user, create_reservation, cancel_reservation
+from apps.members.serializers import (
+    BulkReservationSerializer,
+    MemberSerializer,
+    ReservationSerializer,
+)
+from apps.members.services import (
+    cancel_reservation,
+    create_reservation,
+    create_reservations_bulk,
+    get_or_create_member_user,
+    join_waitlist,
+)
 from apps.members.models import Reservation
+from apps.members.schemas import WaitlistSchema
 
 
 class MemberView(ViewSet):
+    @idempotent
     def create(self, request, *args, **kwargs):
         member_serializer = MemberSerializer(data=request.data)
         member_serializer.is_valid(raise_exception=True)
@@ -20,15 +34,30 @@ class MemberView(ViewSet):
 
 
 class ReservationView(ViewSet):
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = ReservationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         try:
             reservation = create_reservation(serializer.validated_data)
         except RoomFullException as exc:
-            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+            if not serializer.validated_data["waitlist"]:
+                return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+            reservation = join_waitlist(serializer.validated_data)
+            if isinstance(reservation, WaitlistSchema):
+                return Response(reservation.model_dump(), status=status.HTTP_202_ACCEPTED)
         return Response(reservation.model_dump(), status=status.HTTP_201_CREATED)
 
+    @idempotent
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = BulkReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = create_reservations_bulk(serializer.validated_data)
+        data = [result.model_dump() for result in results]
+        if all(result.status == constants.BULK_RESERVATION_RESERVED for result in results):
+            return Response(data, status=status.HTTP_201_CREATED)
+        return Response(data, status=status.HTTP_207_MULTI_STATUS)
+
     def cancel(self, request, pk=None, *args, **kwargs):
         try:
             reservation = cancel_reservation(pk)
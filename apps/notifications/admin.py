@@ -0,0 +1,23 @@
+from django.contrib import admin, messages
+
+from apps.notifications import services
+from apps.notifications.models import Notification, NotificationTemplate
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("subject", "user", "status", "attempts", "last_error", "next_attempt_at")
+    list_filter = ("status", "transport", "category", "last_error")
+    search_fields = ("user__email", "subject")
+    actions = ("requeue",)
+
+    @admin.action(description="Requeue selected failed or dead notifications")
+    def requeue(self, request, queryset):
+        requeued = services.requeue_notifications(list(queryset.values_list("id", flat=True)))
+        self.message_user(request, f"{requeued} notification(s) requeued.", messages.SUCCESS)
+
+
+@admin.register(NotificationTemplate)
+class NotificationTemplateAdmin(admin.ModelAdmin):
+    list_display = ("name", "subject", "modified")
+    search_fields = ("name", "subject")
@@ -3,3 +3,16 @@ MAIL_CLIENT_RESEND = "resend"
 MAIL_CLIENT_DEFAULT = "default"
 
 PYTHON_MAILING_URL = "https://python-mailing.onrender.com/emails"
+
+# Notification.last_error codes recorded when a send fails
+SEND_ERROR_NO_RECIPIENT = "no_recipient"
+SEND_ERROR_TIMEOUT = "timeout"
+SEND_ERROR_CONNECTION = "connection_error"
+SEND_ERROR_HTTP = "http_{status_code}"
+SEND_ERROR_RATE_LIMITED = "rate_limited"
+
+# Errors that a retry cannot fix: notifications failing with them go straight to "dead"
+PERMANENT_SEND_ERRORS = frozenset({SEND_ERROR_NO_RECIPIENT})
+
+# Template that held notifications of a user are merged with (see NOTIFICATIONS_DIGEST_*)
+DIGEST_TEMPLATE = "digest"
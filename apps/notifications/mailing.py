@@ -1,17 +1,61 @@
+import asyncio
+import contextlib
 import logging
-from typing import Any
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http import HTTPStatus
+from typing import Any, Iterable
+from uuid import UUID
 
+import httpx
 import requests
 from django.conf import settings
-from django.shortcuts import get_object_or_404
+from django.db import close_old_connections
+from requests.adapters import HTTPAdapter
 
 from apps.notifications import constants
 from apps.notifications.models import Notification
+from apps.notifications.notifications import (
+    claim_notifications,
+    defer_notifications,
+    mark_notifications_as_failed,
+    mark_notifications_as_sent,
+)
+from apps.notifications.notifications import (
+    mark_notification_as_sent as _mark_notification_as_sent,
+)
 from apps.notifications.schemas import Notification as NotificationSchema
-from apps.users.services import get_user_from_id
+from apps.notifications.throttling import get_rate_limiter, parse_retry_after
+from apps.users.schemas import UserSchema
 
 logger = logging.getLogger(__name__)
 
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Returns this process's pooled keep-alive session for the mailing service.
+
+    The session is created lazily and re-created after a fork, so every Celery worker
+    process owns one connection pool (sized for MAILING_MAX_CONCURRENCY concurrent
+    requests) and reuses its TCP/TLS connections across emails.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.MAILING_MAX_CONCURRENCY)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session, _session_pid = session, pid
+        return _session
+
 
 class Email:
     def __init__(
@@ -25,11 +69,15 @@ class Email:
         **kwargs: Any,
     ):
         self.notification_id = notification_id
+        self.notification_ids = [notification_id]
         self.subject = subject
         self.message = message
         self.from_email = from_email or settings.DEFAULT_FROM_EMAIL
         self.recipient_list = recipient_list
         self.html_content = html_content
+        self.error = ""
+        # Set when the rate limiter held the email back: seconds until a token is expected
+        self.retry_after: float | None = None
 
     def get_mailing_client(self) -> str:
         """
@@ -55,17 +103,11 @@ class Email:
             return settings.RESEND_API_KEY
         return None
 
-    def send_mail(self):
-        """
-        Send email by proxying to external mailing service API via HTTP POST.
-
-        As required, this issues a POST to constants.PYTHON_MAILING_URL
-        with a JSON body containing: provider, subject, message, recipient_list,
-        from_email, api_key, and optionally html_content.
-        """
+    def get_request_payload(self) -> dict[str, Any]:
+        """Build the JSON body posted to the mailing service."""
         mailing_client = self.get_mailing_client()
         # HTTP request payload (includes 'message' key as required by the API)
-        request_payload = {
+        return {
             "provider": mailing_client,
             "subject": self.subject,
             "message": self.message,
@@ -74,46 +116,361 @@ class Email:
             "api_key": self._get_api_key_for_provider(mailing_client),
             "html_content": self.html_content if self.html_content else None,
         }
-        # Logging payload must not contain reserved LogRecord attribute names like 'message'
-        log_base = {
-            "notification_id": str(self.notification_id),
-            "payload": request_payload,
-        }
+
+    def send_mail(self) -> bool:
+        """
+        Send email by proxying to external mailing service API via HTTP POST.
+
+        As required, this issues a POST to constants.PYTHON_MAILING_URL
+        with a JSON body containing: provider, subject, message, recipient_list,
+        from_email, api_key, and optionally html_content. The request goes through the
+        process's pooled session (see get_http_session).
+
+        Requests are throttled by the provider's rate limiter (see get_rate_limiter): a
+        send that cannot get a token within MAILING_RATE_LIMIT_MAX_WAIT_SECONDS is not
+        posted; it returns False with error "rate_limited" and self.retry_after set to
+        the bucket's wait. A 429 response pauses the provider for its Retry-After and
+        is reported the same way, with self.retry_after set to that pause.
+
+        Returns:
+            bool: Whether the mailing service accepted the request. Errors are logged,
+            not raised; the error code of a failure is kept in self.error.
+        """
+        request_payload = self.get_request_payload()
+        log_base = self._get_log_base(request_payload)
+
+        rate_limiter = get_rate_limiter(request_payload["provider"])
+        if rate_limiter and not rate_limiter.acquire(
+            timeout=settings.MAILING_RATE_LIMIT_MAX_WAIT_SECONDS
+        ):
+            return self._rate_limited(rate_limiter.get_wait(), log_base)
 
         try:
-            resp = requests.post(
+            resp = get_http_session().post(
                 constants.PYTHON_MAILING_URL,
                 json=request_payload,
-                timeout=20,
+                timeout=settings.MAILING_REQUEST_TIMEOUT_SECONDS,
             )
+            pause = _get_rate_limit_pause(resp)
+            if pause:
+                if rate_limiter:
+                    rate_limiter.pause(pause)
+                return self._rate_limited(pause, log_base)
             resp.raise_for_status()
         except Exception as e:
-            logger.exception(
-                "Failed to send email via external service",
-                extra={**log_base, "error": str(e)},
+            return self._failed(e, log_base)
+        return self._sent(resp, log_base)
+
+    async def send_mail_async(self, client: httpx.AsyncClient) -> bool:
+        """
+        Async variant of send_mail, posting through an httpx.AsyncClient.
+
+        The request is bounded by MAILING_REQUEST_TIMEOUT_SECONDS with asyncio.timeout,
+        so a stalled connection is cancelled instead of holding its slot. Cancelling the
+        task itself is not treated as a failed send: CancelledError propagates.
+
+        Returns:
+            bool: Whether the mailing service accepted the request (see send_mail).
+        """
+        request_payload = self.get_request_payload()
+        log_base = self._get_log_base(request_payload)
+
+        rate_limiter = get_rate_limiter(request_payload["provider"])
+        if rate_limiter and not await rate_limiter.acquire_async(
+            timeout=settings.MAILING_RATE_LIMIT_MAX_WAIT_SECONDS
+        ):
+            return self._rate_limited(await rate_limiter.get_wait_async(), log_base)
+
+        try:
+            async with asyncio.timeout(settings.MAILING_REQUEST_TIMEOUT_SECONDS):
+                resp = await client.post(constants.PYTHON_MAILING_URL, json=request_payload)
+            pause = _get_rate_limit_pause(resp)
+            if pause:
+                if rate_limiter:
+                    await rate_limiter.pause_async(pause)
+                return self._rate_limited(pause, log_base)
+            resp.raise_for_status()
+        except Exception as e:
+            return self._failed(e, log_base)
+        return self._sent(resp, log_base)
+
+    def _get_log_base(self, request_payload: dict[str, Any]) -> dict[str, Any]:
+        # Logging payload must not contain reserved LogRecord attribute names like 'message'
+        return {
+            "notification_id": str(self.notification_id),
+            "payload": request_payload,
+        }
+
+    def _rate_limited(self, wait: float, log_base: dict[str, Any]) -> bool:
+        self.error = constants.SEND_ERROR_RATE_LIMITED
+        self.retry_after = wait
+        logger.warning("Email not sent: provider rate limit reached", extra=log_base)
+        return False
+
+    def _failed(self, exc: Exception, log_base: dict[str, Any]) -> bool:
+        self.error = _get_error_code(exc)
+        logger.exception(
+            "Failed to send email via external service",
+            extra={**log_base, "error": str(exc), "error_code": self.error},
+        )
+        return False
+
+    def _sent(self, resp, log_base: dict[str, Any]) -> bool:
+        logger.info(
+            "Email request sent successfully via external service",
+            extra={
+                **log_base,
+                "status_code": resp.status_code,
+                "response_text": resp.text[:500],
+            },
+        )
+        return True
+
+
+def _get_rate_limit_pause(resp) -> float | None:
+    """Seconds to pause the provider for after a 429 response, else None."""
+    if resp.status_code != HTTPStatus.TOO_MANY_REQUESTS:
+        return None
+    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+    return retry_after or settings.MAILING_RATE_LIMIT_DEFAULT_PAUSE_SECONDS
+
+
+def _get_error_code(exc: Exception) -> str:
+    """Map a send failure to the short code stored in Notification.last_error."""
+    if isinstance(exc, (requests.Timeout, httpx.TimeoutException, TimeoutError)):
+        return constants.SEND_ERROR_TIMEOUT
+    if isinstance(exc, (requests.ConnectionError, httpx.TransportError)):
+        return constants.SEND_ERROR_CONNECTION
+    response = getattr(exc, "response", None)
+    if response is not None:
+        return constants.SEND_ERROR_HTTP.format(status_code=response.status_code)
+    return type(exc).__name__
+
+
+class BatchEmail(Email):
+    """
+    One mailing service request delivering the same email for several notifications.
+
+    recipient_list holds every address of the batch, and personalizations holds one
+    entry per notification (its id and recipients) so the provider delivers a separate
+    copy to each notification's recipients, who never see each other's addresses.
+
+    A service that ignores personalizations would send one email to the whole batch,
+    disclosing every address to the others: only used with MAILING_BATCH_PERSONALIZATIONS.
+    """
+
+    def __init__(
+        self,
+        notifications: list[tuple[str, list[str]]],
+        subject: str,
+        message: str,
+        **kwargs: Any,
+    ):
+        notification_ids = [notification_id for notification_id, _ in notifications]
+        super().__init__(
+            notification_id=",".join(notification_ids),
+            subject=subject,
+            message=message,
+            recipient_list=[email for _, recipients in notifications for email in recipients],
+            **kwargs,
+        )
+        self.notification_ids = notification_ids
+        self.personalizations = [
+            {"notification_id": notification_id, "recipient_list": recipients}
+            for notification_id, recipients in notifications
+        ]
+
+    def get_request_payload(self) -> dict[str, Any]:
+        payload = super().get_request_payload()
+        payload["personalizations"] = self.personalizations
+        return payload
+
+
+def build_emails(notifications: list[NotificationSchema]) -> list[Email]:
+    """
+    Groups notifications with the same subject, message and HTML into provider batches.
+
+    Each group is split into BatchEmail requests of at most MAILING_BATCH_MAX_RECIPIENTS
+    recipients; a notification alone in its batch is sent as a plain Email. Unless
+    MAILING_BATCH_PERSONALIZATIONS is on, every notification is sent as a plain Email.
+    """
+    if not settings.MAILING_BATCH_PERSONALIZATIONS:
+        return [
+            Email(
+                notification_id=str(notification.id),
+                subject=notification.subject,
+                message=notification.message,
+                recipient_list=notification.get_recipient_mail_list(),
+                html_content=notification.html_message or None,
             )
-        else:
-            logger.info(
-                "Email request sent successfully via external service",
-                extra={
-                    **log_base,
-                    "status_code": resp.status_code,
-                    "response_text": resp.text[:500],
-                },
+            for notification in notifications
+        ]
+
+    groups: dict[tuple[str, str, str], list[NotificationSchema]] = {}
+    for notification in notifications:
+        key = (notification.subject, notification.message, notification.html_message)
+        groups.setdefault(key, []).append(notification)
+
+    emails: list[Email] = []
+    for (subject, message, html_message), group in groups.items():
+        html_content = html_message or None
+        batches: list[list[tuple[str, list[str]]]] = [[]]
+        size = 0
+        for notification in group:
+            recipients = notification.get_recipient_mail_list()
+            if batches[-1] and size + len(recipients) > settings.MAILING_BATCH_MAX_RECIPIENTS:
+                batches.append([])
+                size = 0
+            batches[-1].append((str(notification.id), recipients))
+            size += len(recipients)
+        for batch in batches:
+            if len(batch) == 1:
+                notification_id, recipients = batch[0]
+                emails.append(
+                    Email(
+                        notification_id=notification_id,
+                        subject=subject,
+                        message=message,
+                        recipient_list=recipients,
+                        html_content=html_content,
+                    )
+                )
+            else:
+                emails.append(
+                    BatchEmail(batch, subject=subject, message=message, html_content=html_content)
+                )
+    return emails
+
+
+def _send_mail_in_worker(email: Email) -> bool:
+    try:
+        return email.send_mail()
+    finally:
+        # The thread's connection (opened by the rate limiter) must not outlive the pool
+        close_old_connections()
+
+
+def dispatch_emails(emails: list[Email]) -> list[bool]:
+    """
+    Sends emails concurrently, at most MAILING_MAX_CONCURRENCY requests at a time.
+
+    Besides the HTTP request, each send takes a token from its provider's rate limiter,
+    which lives in the mailing_throttle database cache: worker threads therefore open
+    their own database connections, closed again after every send. Outcomes are
+    recorded afterwards by the caller, on its own thread.
+
+    Returns:
+        list[bool]: The send_mail result of each email, in input order.
+    """
+    concurrency = min(settings.MAILING_MAX_CONCURRENCY, len(emails))
+    if concurrency <= 1:
+        return [email.send_mail() for email in emails]
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="mailing") as pool:
+        return list(pool.map(_send_mail_in_worker, emails))
+
+
+async def dispatch_emails_async(emails: list[Email]) -> list[bool]:
+    """
+    Sends emails from one event loop, at most MAILING_ASYNC_MAX_CONCURRENCY at a time.
+
+    The requests share a few pooled httpx.AsyncClients (see
+    MAILING_ASYNC_CONNECTIONS_PER_CLIENT), only as many as the emails can keep busy, so a
+    single worker process keeps many sends in flight without a thread per request.
+    Like dispatch_emails it does not touch the database (the shared rate limiters aside).
+
+    Returns:
+        list[bool]: The send_mail_async result of each email, in input order.
+    """
+    concurrency = min(settings.MAILING_ASYNC_MAX_CONCURRENCY, len(emails))
+    per_client = settings.MAILING_ASYNC_CONNECTIONS_PER_CLIENT
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    limits = httpx.Limits(max_connections=per_client, max_keepalive_connections=per_client)
+
+    async with contextlib.AsyncExitStack() as stack:
+        clients = [
+            await stack.enter_async_context(
+                httpx.AsyncClient(limits=limits, timeout=settings.MAILING_REQUEST_TIMEOUT_SECONDS)
             )
+            for _ in range(-(-concurrency // per_client))
+        ]
+
+        async def send(index: int, email: Email) -> bool:
+            async with semaphore:
+                return await email.send_mail_async(clients[index % len(clients)])
+
+        return await asyncio.gather(*(send(i, email) for i, email in enumerate(emails)))
+
+
+def send_notifications(
+    notification_ids: Iterable[UUID | str] | None = None, *, retry: bool = False
+) -> int:
+    """
+    Claims notifications from the outbox and emails them.
+
+    With notification_ids only those notifications are claimed (the ones a request just
+    created), one NOTIFICATIONS_CLAIM_BATCH_SIZE batch at a time; rows of a batch are
+    loaded in one query. Without them every claimable notification is swept likewise:
+    enqueued ones that were never dispatched and ones whose sending lease expired.
+    With retry the sweep covers failed notifications that are due for a retry instead.
+    Notifications already claimed by another worker are skipped.
+
+    With MAILING_ASYNC each batch holds MAILING_ASYNC_MAX_CONCURRENCY notifications
+    instead, since a batch's sends are all that can be in flight at once.
+
+    Returns:
+        int: The number of notifications claimed.
+    """
+    if notification_ids is not None:
+        notification_ids = list(notification_ids)
+    limit = settings.MAILING_ASYNC_MAX_CONCURRENCY if settings.MAILING_ASYNC else None
+    total = 0
+    while True:
+        claimed = claim_notifications(notification_ids, limit=limit, retry=retry)
+        if not claimed:
+            return total
+        send_pending_emails([notification_payload(n) for n in claimed])
+        total += len(claimed)
+
+
+def notification_payload(notification: Notification) -> dict[str, Any]:
+    """Build the send_pending_emails payload of a notification loaded with its user."""
+    user = notification.user
+    recipient_list = [UserSchema.model_validate(user).model_dump()] if user.email else []
+    return {
+        "id": notification.id,
+        "subject": notification.subject,
+        "message": notification.message,
+        "html_message": notification.html_message,
+        "user_id": notification.user_id,
+        "recipient_list": recipient_list,
+    }
 
 
 def send_pending_emails(notifications: list[dict[str, str]]):
     """
     Sends all pending email notifications to their respective recipients.
 
-    For each provided notification payload (id, subject, message, user_id):
-    - fetch the recipient email via get_user_from_id
-    - if email is present, send the email and mark the notification as sent
+    For each provided notification payload (id, subject, message, html_message, user_id,
+    recipient_list):
+    - read the recipient emails from recipient_list (resolved when the batch was loaded,
+      so no user queries happen here)
+    - if an email is present, send the email, otherwise record a "no_recipient" failure
+
+    With MAILING_BATCH_PERSONALIZATIONS, notifications sharing subject and message are
+    sent as one provider request (see build_emails). The resulting requests are sent concurrently: from a thread pool
+    (see dispatch_emails) or, with MAILING_ASYNC, from an event loop run for this batch
+    (see dispatch_emails_async).
+    Outcomes are recorded per notification but written in bulk (see
+    mark_notifications_as_sent and mark_notifications_as_failed); failed notifications
+    are scheduled for a retry or dead-lettered there. Emails the rate limiter held back
+    were never posted, so they go back to the queue without counting an attempt (see
+    defer_notifications).
     """
     logger.info(
         "Starting to process pending email notifications", extra={"count": len(notifications)}
     )
+    sendable = []
+    errors: dict[str, str] = {}
     for notification_data in notifications:
         notification = NotificationSchema(**notification_data)
         logger.debug(
@@ -121,8 +478,8 @@ def send_pending_emails(notifications: list[dict[str, str]]):
             extra={"notification_id": str(notification.id), "user_id": str(notification.user_id)},
         )
 
-        user = get_user_from_id(notification.user_id)
-        if not user.get("email"):
+        recipient_list = notification.get_recipient_mail_list()
+        if not recipient_list:
             logger.error(
                 "Skipping notification because user has no email",
                 extra={
@@ -130,27 +487,39 @@ def send_pending_emails(notifications: list[dict[str, str]]):
                     "user_id": str(notification.user_id),
                 },
             )
+            errors[str(notification.id)] = constants.SEND_ERROR_NO_RECIPIENT
             continue
+        sendable.append(notification)
 
-        recipient_list = notification.get_recipient_mail_list()
-        email = Email(
-            notification_id=str(notification.id),
-            subject=notification.subject,
-            message=notification.message,
-            recipient_list=recipient_list,
+    emails = build_emails(sendable)
+    if settings.MAILING_ASYNC:
+        results = asyncio.run(dispatch_emails_async(emails)) if emails else []
+    else:
+        results = dispatch_emails(emails)
+    sent_ids, deferred_ids = [], []
+    retry_after = 0.0
+    for email, sent in zip(emails, results):
+        if sent:
+            sent_ids.extend(email.notification_ids)
+        elif email.retry_after is not None:
+            deferred_ids.extend(email.notification_ids)
+            retry_after = max(retry_after, email.retry_after)
+        else:
+            errors.update(dict.fromkeys(email.notification_ids, email.error))
+    mark_notifications_as_sent(sent_ids)
+    mark_notifications_as_failed(errors)
+    if deferred_ids:
+        defer_notifications(
+            deferred_ids, timedelta(seconds=retry_after), constants.SEND_ERROR_RATE_LIMITED
         )
-        email.send_mail()
-        mark_notification_as_sent(str(notification.id))
 
 
 def mark_notification_as_sent(notification_uuid: str) -> None:
     """
     Marks a notification as sent by updating its status in the database.
     """
-    notification = get_object_or_404(Notification, id=notification_uuid)
-    notification.status = Notification.STATUS.sent
-    notification.save(update_fields=["status"])
+    _mark_notification_as_sent(notification_uuid)
     logger.debug(
         "Notification marked as sent",
-        extra={"notification_id": str(notification.id)},
+        extra={"notification_id": str(notification_uuid)},
     )
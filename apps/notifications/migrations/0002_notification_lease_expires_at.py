@@ -0,0 +1,39 @@
+# Generated by Django 6.0a1 on 2026-10-18 07:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="lease_expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="While sending, when the worker's claim lapses and the row can be reclaimed.",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="status",
+            field=models.CharField(
+                choices=[("sent", "Sent"), ("enqueued", "Enqueued"), ("sending", "Sending")],
+                default="enqueued",
+                max_length=10,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["status", "lease_expires_at"], name="notification_claim_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 6.0a1 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0002_notification_lease_expires_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="attempts",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Delivery attempts made so far."
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="last_error",
+            field=models.CharField(
+                blank=True, help_text="Error code of the last failed attempt.", max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="sent_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("sent", "Sent"),
+                    ("enqueued", "Enqueued"),
+                    ("sending", "Sending"),
+                    ("failed", "Failed"),
+                ],
+                default="enqueued",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0a1 on 2026-10-18 16:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0003_notification_delivery_tracking"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="next_attempt_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When a failed notification becomes due for a retry.",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("sent", "Sent"),
+                    ("enqueued", "Enqueued"),
+                    ("sending", "Sending"),
+                    ("failed", "Failed"),
+                    ("dead", "Dead"),
+                ],
+                default="enqueued",
+                max_length=10,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(fields=["status", "next_attempt_at"], name="notification_retry_idx"),
+        ),
+    ]
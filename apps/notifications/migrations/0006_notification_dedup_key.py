@@ -0,0 +1,32 @@
+# Generated by Django 6.0a1 on 2026-10-18 17:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0005_notificationtemplate_notification_html_message"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="dedup_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Identifies the event notified, so repeated runs never notify it twice.",
+                max_length=100,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("dedup_key", ""), _negated=True),
+                fields=["dedup_key"],
+                name="notification_dedup_idx",
+            ),
+        ),
+    ]
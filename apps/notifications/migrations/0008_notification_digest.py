@@ -0,0 +1,52 @@
+# Generated by Django 6.0a1 on 2026-10-18 18:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0007_notification_user_dedup_key_uniq"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="category",
+            field=models.CharField(
+                blank=True,
+                help_text="Template the notification was rendered from; decides whether it is digested.",
+                max_length=100,
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="digest",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Digest notification this one was merged into.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="digested_notifications",
+                to="notifications.notification",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("sent", "Sent"),
+                    ("enqueued", "Enqueued"),
+                    ("sending", "Sending"),
+                    ("failed", "Failed"),
+                    ("dead", "Dead"),
+                    ("held", "Held"),
+                    ("digested", "Digested"),
+                ],
+                default="enqueued",
+                max_length=10,
+            ),
+        ),
+    ]
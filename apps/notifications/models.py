@@ -10,9 +10,15 @@ class Notification(SoftDeletableModel, UUIDModel, TimeStampedModel):
     )
     subject = models.CharField(max_length=255)
     message = models.TextField()
+    html_message = models.TextField(blank=True)
     STATUS = Choices(
         ("sent", "Sent"),
         ("enqueued", "Enqueued"),
+        ("sending", "Sending"),
+        ("failed", "Failed"),
+        ("dead", "Dead"),
+        ("held", "Held"),
+        ("digested", "Digested"),
     )
     TRANSPORT = Choices(
         ("mail", "Mail"),
@@ -21,3 +27,64 @@ class Notification(SoftDeletableModel, UUIDModel, TimeStampedModel):
     )
     status = models.CharField(max_length=10, choices=STATUS, default=STATUS.enqueued)
     transport = models.CharField(max_length=10, choices=TRANSPORT, default=TRANSPORT.mail)
+    lease_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="While sending, when the worker's claim lapses and the row can be reclaimed.",
+    )
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0, help_text="Delivery attempts made so far.")
+    last_error = models.CharField(
+        max_length=255, blank=True, help_text="Error code of the last failed attempt."
+    )
+    next_attempt_at = models.DateTimeField(
+        null=True, blank=True, help_text="When a failed notification becomes due for a retry."
+    )
+    category = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Template the notification was rendered from; decides whether it is digested.",
+    )
+    digest = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="digested_notifications",
+        help_text="Digest notification this one was merged into.",
+    )
+    dedup_key = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Identifies the event notified, so repeated runs never notify it twice.",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "lease_expires_at"], name="notification_claim_idx"),
+            models.Index(fields=["status", "next_attempt_at"], name="notification_retry_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "dedup_key"],
+                condition=~models.Q(dedup_key=""),
+                name="notification_user_dedup_key_uniq",
+            ),
+        ]
+
+
+class NotificationTemplate(UUIDModel, TimeStampedModel):
+    """
+    Editable notification template, rendered with the Django template language.
+
+    A row overrides the on-disk template of the same name
+    (templates/notifications/<name>/{subject.txt,body.txt,body.html}).
+    """
+
+    name = models.SlugField(max_length=100, unique=True)
+    subject = models.CharField(max_length=255)
+    text_body = models.TextField()
+    html_body = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.name
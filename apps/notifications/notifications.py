@@ -1,67 +1,426 @@
-from typing import Any
+import random
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import attrgetter
+from typing import Iterable
+from uuid import UUID
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import QuerySet
-from django.shortcuts import get_object_or_404
-from model_utils.models import SoftDeletableModel
+from django.db import transaction
+from django.db.models import F, Q
+from django.http import Http404
+from django.utils import timezone
 
+from apps.notifications import constants
 from apps.notifications.models import Notification
+from apps.notifications.rendering import RenderedNotification, render_notifications
 
 User = get_user_model()
 
 
-def create_notification(subject: str, message: str, recipient_list: list[User]) -> None:
+def _bulk_create_deduplicated(notifications: list[Notification]) -> list[Notification]:
+    # Rows whose (user, dedup_key) is taken are skipped by the unique constraint in the
+    # INSERT itself, so concurrent or retried fan-outs cannot race each other. Ids are
+    # generated client side; reading them back tells which rows were actually inserted.
+    Notification.objects.bulk_create(notifications, ignore_conflicts=True)
+    inserted = set(
+        Notification.all_objects.filter(
+            id__in=[notification.id for notification in notifications]
+        ).values_list("id", flat=True)
+    )
+    return [notification for notification in notifications if notification.id in inserted]
+
+
+def create_notification(
+    subject: str,
+    message: str,
+    recipient_list: list[User],
+    html_message: str = "",
+    dedup_key: str = "",
+) -> list[Notification]:
     """
-    Creates and sends notifications to a list of recipients.
+    Creates notifications for a list of recipients.
 
-    This function generates notifications for each user in the recipient list,
-    saves them to the database in bulk, and triggers asynchronous sending
-    of those notifications.
+    This function generates notifications for each user in the recipient list and
+    saves them to the database in bulk, in the "enqueued" state.
 
     Arguments:
         subject: The subject of the notification.
         message: The message content of the notification.
         recipient_list: A list of User objects representing the recipients
                         of the notification.
+        html_message: Optional HTML version of the message.
+        dedup_key: Optional key of the event notified. Recipients who already have a
+                   notification with this key (even soft deleted) are skipped.
 
     Returns:
-        None
+        list[Notification]: The created notifications.
     """
     notifications = [
-        Notification(user=recipient, subject=subject, message=message)
+        Notification(
+            user=recipient,
+            subject=subject,
+            message=message,
+            html_message=html_message,
+            dedup_key=dedup_key,
+        )
         for recipient in recipient_list
     ]
-    Notification.objects.bulk_create(notifications)
+    if dedup_key:
+        return _bulk_create_deduplicated(notifications)
+    return Notification.objects.bulk_create(notifications)
 
 
-def get_pending_notifications() -> QuerySet[SoftDeletableModel, dict[str, Any]]:
+def _get_initial_status(category: str) -> str:
+    if category and category in settings.NOTIFICATIONS_DIGEST_CATEGORIES:
+        return Notification.STATUS.held
+    return Notification.STATUS.enqueued
+
+
+def create_rendered_notifications(
+    rendered: list[tuple[User, RenderedNotification]], dedup_key: str = "", category: str = ""
+) -> list[Notification]:
     """
-    Fetches pending notifications.
+    Creates one notification per recipient from its rendered template, in bulk.
 
-    This function retrieves all notifications that have a status of "enqueued" from the
-    Notification model and returns them as a queryset of dictionary objects.
+    Notifications of a category listed in NOTIFICATIONS_DIGEST_CATEGORIES are created
+    "held" rather than "enqueued"; digest_held_notifications releases them later.
+
+    Arguments:
+        rendered: Each recipient with the notification rendered for them.
+        dedup_key: Optional key of the event notified; see create_notification.
+        category: Optional category (template name) of the notifications.
 
     Returns:
-        QuerySet[SoftDeletableModel, dict[str, Any]]: A queryset containing the pending
-        notifications with their details as dictionary objects.
+        list[Notification]: The created notifications.
     """
-    return Notification.objects.filter(status=Notification.STATUS.enqueued).values()
+    status = _get_initial_status(category)
+    notifications = [
+        Notification(
+            user=recipient,
+            subject=content.subject,
+            message=content.message,
+            html_message=content.html_message,
+            dedup_key=dedup_key,
+            category=category,
+            status=status,
+        )
+        for recipient, content in rendered
+    ]
+    if dedup_key:
+        return _bulk_create_deduplicated(notifications)
+    return Notification.objects.bulk_create(notifications)
+
+
+def create_deduplicated_notifications(
+    rendered: list[tuple[UUID | str, str, RenderedNotification]], category: str = ""
+) -> list[Notification]:
+    """
+    Creates rendered notifications, each tagged with its dedup key, in bulk.
+
+    Notifications whose user already has one with the same dedup key (even soft
+    deleted), or that repeat an earlier entry, are skipped. Digestible categories are
+    held as in create_rendered_notifications.
+
+    Arguments:
+        rendered: (user id, dedup key, rendered notification) of each notification.
+        category: Optional category (template name) of the notifications.
+
+    Returns:
+        list[Notification]: The created notifications.
+    """
+    status = _get_initial_status(category)
+    notifications = [
+        Notification(
+            user_id=user_id,
+            dedup_key=dedup_key,
+            subject=content.subject,
+            message=content.message,
+            html_message=content.html_message,
+            category=category,
+            status=status,
+        )
+        for user_id, dedup_key, content in rendered
+    ]
+    return _bulk_create_deduplicated(notifications)
+
+
+def digest_held_notifications(now: datetime | None = None) -> list[Notification]:
+    """
+    Releases the held notifications of users whose oldest one has waited long enough.
+
+    For every user with a notification held for NOTIFICATIONS_DIGEST_WINDOW_SECONDS,
+    all of that user's held notifications are merged into a single "enqueued" digest
+    rendered from the DIGEST_TEMPLATE template, and move to "digested" pointing at it.
+    A notification held alone is simply enqueued as it is. The held rows are locked
+    (skipping ones locked by a concurrent run) and written back in bulk.
+
+    Returns:
+        list[Notification]: The notifications to send: digests and lone held ones.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=settings.NOTIFICATIONS_DIGEST_WINDOW_SECONDS)
+    due_users = Notification.objects.filter(
+        status=Notification.STATUS.held, created__lte=cutoff
+    ).values("user_id")
+
+    with transaction.atomic():
+        held = list(
+            Notification.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("user")
+            .filter(status=Notification.STATUS.held, user_id__in=due_users)
+            .order_by("user_id", "created")
+        )
+        if not held:
+            return []
+        groups = [list(group) for _, group in groupby(held, key=attrgetter("user_id"))]
+        alone = [group[0] for group in groups if len(group) == 1]
+        merged = [group for group in groups if len(group) > 1]
+
+        rendered = render_notifications(
+            constants.DIGEST_TEMPLATE,
+            [{"user": group[0].user, "notifications": group} for group in merged],
+        )
+        digests = Notification.objects.bulk_create(
+            Notification(
+                user=group[0].user,
+                subject=content.subject,
+                message=content.message,
+                html_message=content.html_message,
+                category=constants.DIGEST_TEMPLATE,
+            )
+            for group, content in zip(merged, rendered)
+        )
+        digested = []
+        for digest, group in zip(digests, merged):
+            for notification in group:
+                notification.status = Notification.STATUS.digested
+                notification.digest = digest
+                digested.append(notification)
+        Notification.objects.bulk_update(digested, ["status", "digest"])
+        Notification.objects.filter(id__in=[notification.id for notification in alone]).update(
+            status=Notification.STATUS.enqueued
+        )
+    return digests + alone
+
+
+def claim_notifications(
+    notification_ids: Iterable[UUID | str] | None = None,
+    *,
+    limit: int | None = None,
+    retry: bool = False,
+) -> list[Notification]:
+    """
+    Claims notifications for sending and returns them with their users loaded.
+
+    A notification can be claimed while it is "enqueued" (once its next_attempt_at, if
+    deferred, has passed), or while it is "sending" but its lease has expired (the
+    worker that held it died). Claimed rows move to
+    "sending" with a fresh lease, so concurrent workers never send the same row twice.
+    The select and the update run in one transaction: on PostgreSQL the rows are
+    locked with SKIP LOCKED so workers skip each other's claims; on SQLite the
+    IMMEDIATE transaction mode serializes claimers.
+
+    With retry, "failed" notifications whose next_attempt_at has passed are claimed
+    instead.
+
+    Arguments:
+        notification_ids: Only claim among these notifications; by default any
+                          claimable notification (oldest first).
+        limit: Maximum number of notifications to claim; defaults to
+               NOTIFICATIONS_CLAIM_BATCH_SIZE.
+        retry: Claim failed notifications that are due for a retry.
+
+    Returns:
+        list[Notification]: The notifications claimed by this call.
+    """
+    now = timezone.now()
+    if retry:
+        claimable = Notification.objects.filter(
+            status=Notification.STATUS.failed, next_attempt_at__lte=now
+        )
+    else:
+        claimable = Notification.objects.filter(
+            Q(status=Notification.STATUS.enqueued)
+            & (Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+            | Q(status=Notification.STATUS.sending, lease_expires_at__lt=now)
+        )
+    if notification_ids is not None:
+        claimable = claimable.filter(id__in=list(notification_ids))
+    limit = limit or settings.NOTIFICATIONS_CLAIM_BATCH_SIZE
+
+    with transaction.atomic():
+        claimed_ids = list(
+            claimable.select_for_update(skip_locked=True)
+            .order_by("created")
+            .values_list("id", flat=True)[:limit]
+        )
+        if not claimed_ids:
+            return []
+        Notification.objects.filter(id__in=claimed_ids).update(
+            status=Notification.STATUS.sending,
+            lease_expires_at=now + timedelta(seconds=settings.NOTIFICATIONS_LEASE_SECONDS),
+        )
+    return list(
+        Notification.objects.select_related("user").filter(id__in=claimed_ids).order_by("created")
+    )
 
 
 def mark_notification_as_sent(notification_uuid: str) -> None:
     """
     Marks a notification as sent by updating its status.
 
-    This function retrieves a `Notification` object, identified by its UUID, and updates
-    its `status` to "sent" in the database. It ensures that only the relevant fields are
-    saved to the database.
+    This function updates the `Notification` identified by its UUID to "sent" with a
+    single UPDATE (see mark_notifications_as_sent).
 
     Args:
         notification_uuid: The unique identifier of the notification to be marked as sent.
 
+    Raises:
+        Http404: If the notification does not exist.
+
     Returns:
         None
     """
-    notification = get_object_or_404(Notification, id=notification_uuid)
-    notification.status = Notification.STATUS.sent
-    notification.save(update_fields=["status"])
+    if not mark_notifications_as_sent([notification_uuid]):
+        raise Http404("No Notification matches the given query.")
+
+
+def mark_notifications_as_sent(notification_ids: Iterable[UUID | str]) -> int:
+    """
+    Marks notifications as sent with a single UPDATE.
+
+    Sets status "sent" and sent_at, counts the attempt and clears the lease and the last
+    error.
+
+    Args:
+        notification_ids: The notifications to mark as sent.
+
+    Returns:
+        int: The number of notifications updated.
+    """
+    notification_ids = list(notification_ids)
+    if not notification_ids:
+        return 0
+    return Notification.objects.filter(id__in=notification_ids).update(
+        status=Notification.STATUS.sent,
+        sent_at=timezone.now(),
+        attempts=F("attempts") + 1,
+        last_error="",
+        lease_expires_at=None,
+        next_attempt_at=None,
+    )
+
+
+def defer_notifications(
+    notification_ids: Iterable[UUID | str], delay: timedelta, error: str = ""
+) -> int:
+    """
+    Returns claimed notifications to the queue without counting a delivery attempt.
+
+    For notifications the sender held back itself, e.g. because the provider's rate
+    limiter had no token: they were never posted, so retrying them must not use up
+    NOTIFICATIONS_MAX_ATTEMPTS. They move back to "enqueued" with the lease cleared and
+    are not claimed again before next_attempt_at (now + delay). Single UPDATE.
+
+    Args:
+        notification_ids: The notifications to defer.
+        delay: How long to wait before claiming them again.
+        error: Error code kept in last_error, for visibility.
+
+    Returns:
+        int: The number of notifications updated.
+    """
+    notification_ids = list(notification_ids)
+    if not notification_ids:
+        return 0
+    return Notification.objects.filter(id__in=notification_ids).update(
+        status=Notification.STATUS.enqueued,
+        last_error=error,
+        lease_expires_at=None,
+        next_attempt_at=timezone.now() + delay,
+    )
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    """
+    Returns how long to wait before retrying a notification that failed `attempts` times.
+
+    The delay doubles with every attempt from NOTIFICATIONS_RETRY_BASE_SECONDS up to
+    NOTIFICATIONS_RETRY_MAX_DELAY_SECONDS. Half of it is random jitter, so notifications
+    that failed together (e.g. during a provider outage) do not all retry at once.
+    """
+    delay = min(
+        settings.NOTIFICATIONS_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0),
+        settings.NOTIFICATIONS_RETRY_MAX_DELAY_SECONDS,
+    )
+    return timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
+
+
+def mark_notifications_as_failed(errors: dict[UUID | str, str]) -> int:
+    """
+    Records failed delivery attempts in bulk.
+
+    Counts the attempt, stores the error code and clears the lease. Notifications that
+    can still be retried move to "failed" with a next_attempt_at from get_retry_delay;
+    those that reached NOTIFICATIONS_MAX_ATTEMPTS, or failed with a permanent error,
+    move to "dead". The rows are read once and written with a single bulk UPDATE.
+
+    Args:
+        errors: Error code of each failed notification, keyed by notification id.
+
+    Returns:
+        int: The number of notifications updated.
+    """
+    errors = {str(notification_id): error for notification_id, error in errors.items()}
+    if not errors:
+        return 0
+    now = timezone.now()
+    failed = list(Notification.objects.filter(id__in=list(errors)).only("id", "attempts"))
+    for notification in failed:
+        error = errors[str(notification.id)]
+        notification.attempts += 1
+        notification.last_error = error[:255]
+        notification.lease_expires_at = None
+        if (
+            error in constants.PERMANENT_SEND_ERRORS
+            or notification.attempts >= settings.NOTIFICATIONS_MAX_ATTEMPTS
+        ):
+            notification.status = Notification.STATUS.dead
+            notification.next_attempt_at = None
+        else:
+            notification.status = Notification.STATUS.failed
+            notification.next_attempt_at = now + get_retry_delay(notification.attempts)
+    return Notification.objects.bulk_update(
+        failed, ["status", "attempts", "last_error", "lease_expires_at", "next_attempt_at"]
+    )
+
+
+def requeue_notifications(notification_ids: Iterable[UUID | str]) -> list[UUID]:
+    """
+    Moves failed or dead notifications back to "enqueued" with a fresh retry budget.
+
+    Arguments:
+        notification_ids: The notifications to requeue; ones in any other status are
+                          left untouched.
+
+    Returns:
+        list[UUID]: The ids of the notifications requeued.
+    """
+    with transaction.atomic():
+        requeued = list(
+            Notification.objects.select_for_update()
+            .filter(
+                id__in=list(notification_ids),
+                status__in=[Notification.STATUS.failed, Notification.STATUS.dead],
+            )
+            .values_list("id", flat=True)
+        )
+        Notification.objects.filter(id__in=requeued).update(
+            status=Notification.STATUS.enqueued,
+            attempts=0,
+            last_error="",
+            next_attempt_at=None,
+        )
+    return requeued
@@ -0,0 +1,109 @@
+import functools
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable
+
+from django.template import Context, Engine, Template, TemplateDoesNotExist
+
+from apps.notifications.models import NotificationTemplate
+
+# Compiled database templates kept per process; least recently used ones are evicted
+TEMPLATE_CACHE_SIZE = 128
+
+DISK_TEMPLATE_PATH = "notifications/{name}/{part}"
+
+
+@dataclass(frozen=True)
+class RenderedNotification:
+    subject: str
+    message: str
+    html_message: str = ""
+
+
+@dataclass(frozen=True)
+class CompiledNotificationTemplate:
+    subject: Template
+    text_body: Template
+    html_body: Template | None
+
+    def render_many(self, contexts: Iterable[dict[str, Any]]) -> list[RenderedNotification]:
+        """Render every context with one template Context, pushing each on in turn."""
+        text_context, html_context = Context(autoescape=False), Context()
+        rendered = []
+        for values in contexts:
+            with text_context.push(values), html_context.push(values):
+                rendered.append(
+                    RenderedNotification(
+                        # Subjects are a single line even if the template wraps
+                        subject=" ".join(self.subject.render(text_context).split()),
+                        message=self.text_body.render(text_context).strip(),
+                        html_message=(
+                            self.html_body.render(html_context).strip() if self.html_body else ""
+                        ),
+                    )
+                )
+        return rendered
+
+
+@functools.cache
+def _get_engine() -> Engine:
+    """Template engine reading app templates; escaping is decided by the render Context."""
+    return Engine(app_dirs=True)
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_database_template(
+    template_id: Any, modified: datetime
+) -> CompiledNotificationTemplate:
+    # The modified timestamp is part of the cache key: editing a template changes it,
+    # so every process compiles the new version on its next render
+    template = NotificationTemplate.objects.get(id=template_id)
+    engine = _get_engine()
+    return CompiledNotificationTemplate(
+        subject=engine.from_string(template.subject),
+        text_body=engine.from_string(template.text_body),
+        html_body=engine.from_string(template.html_body) if template.html_body else None,
+    )
+
+
+def _load_disk_template(name: str) -> CompiledNotificationTemplate:
+    # The engine keeps loaded files in its cached loader, so this compiles once per process
+    engine = _get_engine()
+    try:
+        html_body = engine.get_template(DISK_TEMPLATE_PATH.format(name=name, part="body.html"))
+    except TemplateDoesNotExist:
+        html_body = None
+    return CompiledNotificationTemplate(
+        subject=engine.get_template(DISK_TEMPLATE_PATH.format(name=name, part="subject.txt")),
+        text_body=engine.get_template(DISK_TEMPLATE_PATH.format(name=name, part="body.txt")),
+        html_body=html_body,
+    )
+
+
+def get_notification_template(name: str) -> CompiledNotificationTemplate:
+    """
+    Returns the compiled notification template with the given name.
+
+    A NotificationTemplate row of that name takes precedence over the files in
+    templates/notifications/<name>/. Either way compiling happens once per process;
+    looking a database template up costs one query for its id and modified time.
+
+    Raises:
+        TemplateDoesNotExist: If there is no template with that name.
+    """
+    version = NotificationTemplate.objects.filter(name=name).values_list("id", "modified").first()
+    if version:
+        return _compile_database_template(*version)
+    return _load_disk_template(name)
+
+
+def render_notifications(name: str, contexts: list[dict[str, Any]]) -> list[RenderedNotification]:
+    """
+    Renders the subject, plain text and HTML of a notification template for each context.
+
+    The template is looked up and compiled once for the whole batch.
+
+    Raises:
+        TemplateDoesNotExist: If there is no template with that name.
+    """
+    return get_notification_template(name).render_many(contexts)
@@ -9,6 +9,7 @@ class Notification(BaseModel):
     id: uuid.UUID
     subject: str
     message: str
+    html_message: str = ""
     user_id: uuid.UUID
     recipient_list: list[UserSchema]
 
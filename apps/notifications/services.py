@@ -1,21 +1,28 @@
+from itertools import islice
+from typing import Any, Iterable
+from uuid import UUID
+
+from celery import group
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
 from apps.notifications import notifications
-from apps.notifications.schemas import Notification as NotificationSchema
+from apps.notifications.rendering import get_notification_template, render_notifications
 from apps.notifications.tasks import async_send_notifications
-from apps.users.schemas import UserSchema
-from apps.users.services import get_user_from_id
 
 User = get_user_model()
 
 
-def create_notification(subject: str, message: str, recipient_list: list[User]) -> None:
+def create_notification(
+    subject: str, message: str, recipient_list: list[User], dedup_key: str = ""
+) -> None:
     """
     Creates and sends a notification to a list of recipients asynchronously.
 
     This function creates a notification with the given subject and message for
-    a list of recipients. After creating the notification, it triggers an
-    asynchronous task to send the notifications.
+    a list of recipients. Once the transaction commits, it triggers asynchronous
+    tasks that send only the notifications created here (see enqueue_notifications).
 
     Parameters:
     subject: str
@@ -25,32 +32,143 @@ def create_notification(subject: str, message: str, recipient_list: list[User])
     recipient_list: list[User]
         A list of User objects representing the recipients of the
         notification.
+    dedup_key: str
+        Optional key of the event notified. Recipients already notified with this key
+        are skipped, so retried or concurrent calls never send it twice.
 
     Returns:
     None
     """
-    notifications.create_notification(subject, message, recipient_list)
-    pending_notifications = get_pending_notifications()
-    _notifications = [notification.model_dump() for notification in pending_notifications]
-    async_send_notifications.delay(notifications=_notifications)
+    created = notifications.create_notification(
+        subject, message, recipient_list, dedup_key=dedup_key
+    )
+    enqueue_notifications([str(notification.id) for notification in created])
+
+
+def create_notification_from_template(
+    template_name: str,
+    recipient_list: list[User],
+    context: dict[str, Any] | None = None,
+    recipient_contexts: list[dict[str, Any]] | None = None,
+    dedup_key: str = "",
+) -> None:
+    """
+    Renders a notification template for each recipient and sends the results asynchronously.
+
+    Each recipient is rendered with `context`, the recipient as `user`, and its entry of
+    `recipient_contexts` (if given, one per recipient). The template is compiled once and
+    the whole batch rendered in one pass (see apps.notifications.rendering). Recipients
+    already notified with `dedup_key` are skipped (see create_notification). Templates
+    listed in NOTIFICATIONS_DIGEST_CATEGORIES are held for send_notification_digests.
+
+    Raises:
+        TemplateDoesNotExist: If there is no template with that name.
+    """
+    contexts = [
+        {
+            **(context or {}),
+            "user": recipient,
+            **(recipient_contexts[i] if recipient_contexts else {}),
+        }
+        for i, recipient in enumerate(recipient_list)
+    ]
+    rendered = render_notifications(template_name, contexts)
+    created = notifications.create_rendered_notifications(
+        list(zip(recipient_list, rendered)), dedup_key=dedup_key, category=template_name
+    )
+    enqueue_notifications(_get_sendable_ids(created))
+
+
+def create_notifications_from_template_stream(
+    template_name: str,
+    recipients: Iterable[tuple[UUID | str, str, dict[str, Any]]],
+    *,
+    batch_size: int | None = None,
+) -> int:
+    """
+    Renders, creates and enqueues notifications for a stream of recipients, batch by batch.
+
+    `recipients` yields (user id, dedup key, context) and is consumed batch_size
+    (default NOTIFICATIONS_STREAM_BATCH_SIZE) items at a time: each batch is rendered
+    in one pass, bulk created in one INSERT that skips (user, dedup key) pairs already
+    notified, and enqueued. Only one batch is held in memory, so callers can pass a
+    queryset iterator() of any size, and re-running a finished fan-out sends nothing.
+
+    Returns:
+        int: The number of notifications created.
+
+    Raises:
+        TemplateDoesNotExist: If there is no template with that name.
+    """
+    template = get_notification_template(template_name)
+    batch_size = batch_size or settings.NOTIFICATIONS_STREAM_BATCH_SIZE
+    recipients = iter(recipients)
+    created = 0
+    while True:
+        batch = list(islice(recipients, batch_size))
+        if not batch:
+            return created
+        rendered = template.render_many(context for _, _, context in batch)
+        new = notifications.create_deduplicated_notifications(
+            [(user_id, key, content) for (user_id, key, _), content in zip(batch, rendered)],
+            category=template_name,
+        )
+        enqueue_notifications(_get_sendable_ids(new))
+        created += len(new)
+
+
+def send_notification_digests() -> int:
+    """
+    Merges the held notifications of each user whose digest window has elapsed into one
+    email, and sends the results asynchronously (see digest_held_notifications).
+
+    Returns:
+        int: The number of notifications enqueued, digests included.
+    """
+    released = notifications.digest_held_notifications()
+    enqueue_notifications([str(notification.id) for notification in released])
+    return len(released)
 
 
-def get_pending_notifications() -> list[NotificationSchema]:
+def _get_sendable_ids(created: list) -> list[str]:
+    # Held notifications wait for their digest instead of being sent now
+    return [
+        str(notification.id)
+        for notification in created
+        if notification.status == notification.STATUS.enqueued
+    ]
+
+
+def enqueue_notifications(notification_ids: list[str]) -> None:
+    """
+    Schedules the given notifications for sending once the transaction commits.
+
+    Task messages carry only notification ids, split into chunks of
+    NOTIFICATIONS_TASK_CHUNK_SIZE: a single chunk is sent as one task, several as a
+    Celery group so workers send them in parallel. Workers load each chunk's rows in
+    bulk, so broker messages stay small however large the notifications are.
     """
-    Fetch and transform pending notifications.
+    if not notification_ids:
+        return
+    size = settings.NOTIFICATIONS_TASK_CHUNK_SIZE
+    chunks = [notification_ids[i : i + size] for i in range(0, len(notification_ids), size)]
+    if len(chunks) == 1:
+        transaction.on_commit(lambda: async_send_notifications.delay(notification_ids=chunks[0]))
+    else:
+        tasks = group(async_send_notifications.s(notification_ids=chunk) for chunk in chunks)
+        transaction.on_commit(tasks.apply_async)
 
-    Returns a list of notifications in the form of NotificationSchema objects that
-    are currently pending. The function fetches pending notifications from the
-    data storage and returns them after transforming them into the defined schema.
+
+def requeue_notifications(notification_ids: list[str]) -> int:
+    """
+    Requeues failed or dead notifications and sends them again asynchronously.
 
     Returns:
-        list[NotificationSchema]: A list of NotificationSchema objects representing
-        the pending notifications.
-    """
-    pending_notifications = notifications.get_pending_notifications()
-    notifications_list = []
-    for notification in pending_notifications:
-        user = get_user_from_id(notification["user_id"])
-        notification["recipient_list"] = [UserSchema(**user).model_dump()]
-        notifications_list.append(NotificationSchema(**notification))
-    return notifications_list
+        int: The number of notifications requeued.
+    """
+    requeued = [
+        str(notification_id)
+        for notification_id in notifications.requeue_notifications(notification_ids)
+    ]
+    enqueue_notifications(requeued)
+    return len(requeued)
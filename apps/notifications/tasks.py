@@ -1,17 +1,43 @@
 from celery import shared_task
 
-from apps.notifications.mailing import send_pending_emails
+from apps.notifications.mailing import send_notifications
 
 
 @shared_task
-def async_send_notifications(notifications):
+def async_send_notifications(notification_ids=None):
     """
     Asynchronous task for sending notifications.
 
-    This function triggers the sending of pending email notifications
-    as a background task.
+    Claims and emails the given notifications. Without notification_ids (the periodic
+    run) it sweeps every claimable notification, including ones left in "sending" by a
+    worker whose lease expired.
 
     Raises:
         None: This function does not explicitly raise errors.
     """
-    send_pending_emails(notifications)
+    send_notifications(notification_ids)
+
+
+@shared_task
+def async_retry_notifications():
+    """
+    Periodic task that retries failed notifications whose backoff has elapsed.
+
+    Raises:
+        None: This function does not explicitly raise errors.
+    """
+    send_notifications(retry=True)
+
+
+@shared_task
+def async_send_notification_digests():
+    """
+    Periodic task that merges and sends the notifications held for digesting.
+
+    Raises:
+        None: This function does not explicitly raise errors.
+    """
+    # Imported here: services dispatches the tasks defined in this module
+    from apps.notifications.services import send_notification_digests
+
+    send_notification_digests()
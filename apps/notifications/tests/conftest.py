@@ -3,6 +3,17 @@ import uuid
 import pytest
 from model_bakery import baker
 
+from apps.notifications.throttling import get_rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def local_rate_limiters(settings):
+    """Use in-memory rate limiters, rebuilt for every test."""
+    settings.MAILING_RATE_LIMIT_CACHE_ALIAS = None
+    get_rate_limiter.cache_clear()
+    yield
+    get_rate_limiter.cache_clear()
+
 
 @pytest.fixture
 @pytest.mark.django_db
@@ -1,66 +1,232 @@
 """Tests for the mailing module (sending emails from notifications)."""
 
+import asyncio
+import json
+import threading
+import time
 import uuid
+from datetime import timedelta
 
+import httpx
 import pytest
+import requests
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from model_bakery import baker
 
-from apps.notifications.mailing import mark_notification_as_sent, send_pending_emails, Email
+from apps.notifications.mailing import (
+    BatchEmail,
+    build_emails,
+    dispatch_emails,
+    dispatch_emails_async,
+    get_http_session,
+    mark_notification_as_sent,
+    send_notifications,
+    send_pending_emails,
+    Email,
+)
 from apps.notifications import constants
+from apps.notifications.models import Notification
+from apps.notifications.schemas import Notification as NotificationSchema
+from apps.notifications.throttling import get_rate_limiter
 
 
 class TestSendPendingEmails:
     def test_sends_email_and_marks_sent(self, mocker, mocked_pending):
         # Arrange: mock dependencies used inside send_pending_emails
-        emails = ["user1@example.com", "user2@example.com"]
-        get_user_from_id = mocker.patch(
-            "apps.notifications.mailing.get_user_from_id",
-            side_effect=[{"email": emails[0]}, {"email": emails[1]}],
-        )
+        email_init = mocker.spy(Email, "__init__")
         email_send = mocker.patch("apps.notifications.mailing.Email.send_mail")
-        mark_sent = mocker.patch("apps.notifications.mailing.mark_notification_as_sent")
+        mark_sent = mocker.patch("apps.notifications.mailing.mark_notifications_as_sent")
+        mark_failed = mocker.patch("apps.notifications.mailing.mark_notifications_as_failed")
 
         # Act
         send_pending_emails(mocked_pending)
 
-        # Assert: get_user called for each, email client called, and marked sent
-        assert get_user_from_id.call_count == len(mocked_pending)
+        # Assert: recipients come from the payload, email client called, and marked sent at once
+        recipients = [call.kwargs["recipient_list"] for call in email_init.call_args_list]
+        assert recipients == [["user1@example.com"], ["user2@example.com"]]
         assert email_send.call_count == len(mocked_pending)
-        for notification in mocked_pending:
-            mark_sent.assert_any_call(str(notification["id"]))
-        assert mark_sent.call_count == len(mocked_pending)
+        mark_sent.assert_called_once_with([str(n["id"]) for n in mocked_pending])
+        mark_failed.assert_called_once_with({})
+
+    def test_sends_one_request_per_batch_and_marks_each_notification(self, mocker, settings):
+        settings.MAILING_BATCH_PERSONALIZATIONS = True
+        notifications = [_notification(emails=[f"m{i}@example.com"]) for i in range(3)]
+        email_send = mocker.patch("apps.notifications.mailing.Email.send_mail")
+        mark_sent = mocker.patch("apps.notifications.mailing.mark_notifications_as_sent")
+        mocker.patch("apps.notifications.mailing.mark_notifications_as_failed")
+
+        send_pending_emails([n.model_dump() for n in notifications])
+
+        email_send.assert_called_once()
+        mark_sent.assert_called_once_with([str(n.id) for n in notifications])
+
+    def test_records_error_code_of_failed_sends(self, mocker):
+        notification = _notification()
+        response = mocker.Mock(status_code=503)
+        mocker.patch(
+            "apps.notifications.mailing.get_http_session"
+        ).return_value.post.side_effect = requests.HTTPError(response=response)
+        mark_sent = mocker.patch("apps.notifications.mailing.mark_notifications_as_sent")
+        mark_failed = mocker.patch("apps.notifications.mailing.mark_notifications_as_failed")
+
+        send_pending_emails([notification.model_dump()])
+
+        mark_sent.assert_called_once_with([])
+        mark_failed.assert_called_once_with({str(notification.id): "http_503"})
 
     def test_skips_when_no_email(self, mocker):
-        # Arrange: a single pending notification and user without email
+        # Arrange: a single pending notification whose user has no email
         notification = {
             "id": uuid.uuid4(),
             "subject": "Hi",
             "message": "There",
             "user_id": uuid.uuid4(),
-            # Provide a valid recipient_list to satisfy Notification schema
-            "recipient_list": [
-                {
-                    "first_name": "User",
-                    "last_name": "Zero",
-                    "email": "valid@example.com",
-                    "phone_number": "",
-                }
-            ],
+            "recipient_list": [],
         }
-        mocker.patch(
-            "apps.notifications.mailing.get_user_from_id",
-            return_value={"email": ""},
-        )
         email_send = mocker.patch("apps.notifications.mailing.Email.send_mail")
-        mark_sent = mocker.patch("apps.notifications.mailing.mark_notification_as_sent")
+        mark_sent = mocker.patch("apps.notifications.mailing.mark_notifications_as_sent")
+        mark_failed = mocker.patch("apps.notifications.mailing.mark_notifications_as_failed")
 
         # Act
         send_pending_emails([notification])
 
-        # Assert: no email sent and not marked as sent
+        # Assert: no email sent and the notification is recorded as failed
         email_send.assert_not_called()
-        mark_sent.assert_not_called()
+        mark_sent.assert_called_once_with([])
+        mark_failed.assert_called_once_with(
+            {str(notification["id"]): constants.SEND_ERROR_NO_RECIPIENT}
+        )
+
+
+def _notification(subject="Cancelled", message="Class cancelled", emails=("a@example.com",)):
+    return NotificationSchema(
+        id=uuid.uuid4(),
+        subject=subject,
+        message=message,
+        user_id=uuid.uuid4(),
+        recipient_list=[
+            {"first_name": "", "last_name": "", "email": email, "phone_number": ""}
+            for email in emails
+        ],
+    )
+
+
+class TestBuildEmails:
+    @pytest.fixture(autouse=True)
+    def personalizations(self, settings):
+        settings.MAILING_BATCH_PERSONALIZATIONS = True
+
+    def test_groups_same_content_into_batches_up_to_limit(self, settings):
+        settings.MAILING_BATCH_MAX_RECIPIENTS = 2
+        same = [_notification(emails=[f"m{i}@example.com"]) for i in range(5)]
+        other = _notification(subject="Welcome")
+
+        emails = build_emails([*same, other])
+
+        batches = [e for e in emails if isinstance(e, BatchEmail)]
+        singles = [e for e in emails if not isinstance(e, BatchEmail)]
+        assert [len(e.recipient_list) for e in batches] == [2, 2]
+        # The odd one out of the group and the different subject go out alone
+        assert [e.notification_ids for e in singles] == [[str(same[4].id)], [str(other.id)]]
+        assert [nid for e in emails for nid in e.notification_ids] == [
+            str(n.id) for n in [*same, other]
+        ]
+
+    def test_html_message_is_sent_and_splits_groups(self):
+        plain, html = _notification(), _notification()
+        html.html_message = "<p>Class cancelled</p>"
+
+        emails = build_emails([plain, html])
+
+        assert [e.get_request_payload()["html_content"] for e in emails] == [
+            None,
+            "<p>Class cancelled</p>",
+        ]
+
+    def test_batch_payload_has_one_personalization_per_notification(self, settings):
+        settings.MAILING_BATCH_MAX_RECIPIENTS = 100
+        first, second = _notification(), _notification(emails=["b@example.com"])
+
+        (email,) = build_emails([first, second])
+        payload = email.get_request_payload()
+
+        assert payload["subject"] == "Cancelled"
+        assert payload["recipient_list"] == ["a@example.com", "b@example.com"]
+        assert payload["personalizations"] == [
+            {"notification_id": str(first.id), "recipient_list": ["a@example.com"]},
+            {"notification_id": str(second.id), "recipient_list": ["b@example.com"]},
+        ]
+
+    def test_sends_one_plain_email_per_notification_by_default(self, settings):
+        settings.MAILING_BATCH_PERSONALIZATIONS = False
+        first, second = _notification(), _notification(emails=["b@example.com"])
+
+        emails = build_emails([first, second])
+
+        assert not any(isinstance(email, BatchEmail) for email in emails)
+        assert [email.get_request_payload() for email in emails] == [
+            {
+                "provider": constants.MAIL_CLIENT_DEFAULT,
+                "subject": "Cancelled",
+                "message": "Class cancelled",
+                "recipient_list": recipients,
+                "from_email": settings.DEFAULT_FROM_EMAIL,
+                "api_key": None,
+                "html_content": None,
+            }
+            for recipients in (["a@example.com"], ["b@example.com"])
+        ]
+
+
+class TestSendNotifications:
+    @pytest.mark.django_db
+    def test_sends_claimed_notifications_once(self, mocker):
+        notifications = baker.make(
+            "notifications.Notification", _quantity=3, user__email="to@example.com"
+        )
+        email_send = mocker.patch("apps.notifications.mailing.Email.send_mail")
+
+        assert send_notifications([notifications[0].id]) == 1
+        assert send_notifications() == 2
+        assert send_notifications() == 0
+
+        assert email_send.call_count == 3
+        assert set(Notification.objects.values_list("status", flat=True)) == {"sent"}
+
+    @pytest.mark.django_db
+    def test_claims_every_given_id_in_batches(self, mocker, settings):
+        settings.NOTIFICATIONS_CLAIM_BATCH_SIZE = 2
+        notifications = baker.make(
+            "notifications.Notification", _quantity=5, user__email="to@example.com"
+        )
+        mocker.patch("apps.notifications.mailing.Email.send_mail")
+
+        assert send_notifications(str(n.id) for n in notifications) == 5
+        assert set(Notification.objects.values_list("status", flat=True)) == {"sent"}
+
+    def test_async_sends_claim_batches_of_the_async_concurrency(self, mocker, settings):
+        settings.MAILING_ASYNC = True
+        settings.MAILING_ASYNC_MAX_CONCURRENCY = 200
+        claim = mocker.patch("apps.notifications.mailing.claim_notifications", return_value=[])
+
+        send_notifications()
+
+        claim.assert_called_once_with(None, limit=200, retry=False)
+
+    @pytest.mark.django_db
+    def test_reads_recipients_with_the_claim_only(self, mocker):
+        baker.make("notifications.Notification", _quantity=5, user__email="to@example.com")
+        mocker.patch("apps.notifications.mailing.Email.send_mail")
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert send_notifications() == 5
+
+        # Users are joined into the claimed batch; no per-email user lookups
+        user_queries = [q["sql"] for q in ctx.captured_queries if '"users_user"' in q["sql"]]
+        assert len(user_queries) == 1
 
 
 class TestMarkNotificationAsSent:
@@ -134,10 +300,11 @@ class TestEmailSendMail:
         resp.status_code = 200
         resp.text = "ok"
         resp.raise_for_status.return_value = None
-        post_mock = mocker.patch("apps.notifications.mailing.requests.post", return_value=resp)
+        post_mock = mocker.patch("apps.notifications.mailing.get_http_session").return_value.post
+        post_mock.return_value = resp
 
         # Act
-        email.send_mail()
+        assert email.send_mail() is True
 
         # Assert: called with expected payload and URL
         expected_json = {
@@ -173,10 +340,11 @@ class TestEmailSendMail:
         resp = mocker.Mock()
         resp.text = "bad"
         resp.raise_for_status.side_effect = Exception("HTTP 500")
-        post_mock = mocker.patch("apps.notifications.mailing.requests.post", return_value=resp)
+        post_mock = mocker.patch("apps.notifications.mailing.get_http_session").return_value.post
+        post_mock.return_value = resp
 
         # Act - should not raise
-        email.send_mail()
+        assert email.send_mail() is False
 
         # Assert: post called and error handled (no exception raised)
         assert post_mock.called
@@ -197,10 +365,241 @@ class TestEmailSendMail:
         resp = mocker.Mock()
         resp.text = "bad"
         resp.raise_for_status.side_effect = Exception("HTTP 500")
-        post_mock = mocker.patch("apps.notifications.mailing.requests.post", return_value=resp)
+        post_mock = mocker.patch("apps.notifications.mailing.get_http_session").return_value.post
+        post_mock.return_value = resp
 
         # Act - should not raise
-        email.send_mail()
+        assert email.send_mail() is False
 
         # Assert: post called and error handled (no exception raised)
         assert post_mock.called
+
+    def test_too_many_requests_pauses_provider_for_retry_after(self, mocker, settings):
+        settings.MAILING_RATE_LIMITS = {"sendgrid": {"rate": 100}}
+        mocker.patch.object(
+            Email, "get_mailing_client", return_value=constants.MAIL_CLIENT_SENDGRID
+        )
+        resp = mocker.Mock(status_code=429, headers={"Retry-After": "42"})
+        resp.raise_for_status.side_effect = requests.HTTPError(response=resp)
+        mocker.patch(
+            "apps.notifications.mailing.get_http_session"
+        ).return_value.post.return_value = resp
+        email = Email(notification_id="123", subject="Hi", message="There", recipient_list=["a"])
+
+        assert email.send_mail() is False
+
+        assert email.error == constants.SEND_ERROR_RATE_LIMITED
+        assert email.retry_after == 42
+        assert get_rate_limiter("sendgrid").try_acquire() == pytest.approx(42, abs=1)
+
+    @pytest.mark.django_db
+    def test_too_many_requests_defers_without_using_attempts(self, mocker):
+        resp = mocker.Mock(status_code=429, headers={"Retry-After": "120"})
+        mocker.patch(
+            "apps.notifications.mailing.get_http_session"
+        ).return_value.post.return_value = resp
+        notification = baker.make("notifications.Notification", user__email="a@example.com")
+
+        assert send_notifications([notification.id]) == 1
+
+        notification.refresh_from_db()
+        assert notification.status == Notification.STATUS.enqueued
+        assert notification.attempts == 0
+        assert notification.last_error == constants.SEND_ERROR_RATE_LIMITED
+        assert notification.next_attempt_at > timezone.now() + timedelta(seconds=110)
+
+    def test_fails_without_posting_when_no_token_in_time(self, mocker, settings):
+        settings.MAILING_RATE_LIMITS = {"sendgrid": {"rate": 1}}
+        settings.MAILING_RATE_LIMIT_MAX_WAIT_SECONDS = 0
+        mocker.patch.object(
+            Email, "get_mailing_client", return_value=constants.MAIL_CLIENT_SENDGRID
+        )
+        post_mock = mocker.patch("apps.notifications.mailing.get_http_session").return_value.post
+        get_rate_limiter("sendgrid").pause(60)
+        email = Email(notification_id="123", subject="Hi", message="There", recipient_list=["a"])
+
+        assert email.send_mail() is False
+
+        assert email.error == constants.SEND_ERROR_RATE_LIMITED
+        assert email.retry_after == pytest.approx(60, abs=1)
+        post_mock.assert_not_called()
+
+    @pytest.mark.django_db
+    def test_throttled_notifications_stay_pending_without_using_attempts(self, mocker, settings):
+        settings.NOTIFICATIONS_MAX_ATTEMPTS = 2
+        settings.MAILING_RATE_LIMITS = {constants.MAIL_CLIENT_DEFAULT: {"rate": 1}}
+        settings.MAILING_RATE_LIMIT_MAX_WAIT_SECONDS = 0
+        post_mock = mocker.patch("apps.notifications.mailing.get_http_session").return_value.post
+        notification = baker.make("notifications.Notification", user__email="a@example.com")
+        get_rate_limiter(constants.MAIL_CLIENT_DEFAULT).pause(60)
+
+        for _ in range(settings.NOTIFICATIONS_MAX_ATTEMPTS + 1):
+            # Claimed once: the deferred row is not reclaimed by the same drain loop
+            assert send_notifications([notification.id]) == 1
+            notification.refresh_from_db()
+            assert notification.status == Notification.STATUS.enqueued
+            assert notification.attempts == 0
+            assert notification.lease_expires_at is None
+            assert notification.next_attempt_at > timezone.now() + timedelta(seconds=50)
+            Notification.objects.filter(id=notification.id).update(next_attempt_at=timezone.now())
+
+        post_mock.assert_not_called()
+
+
+class TestGetHttpSession:
+    def test_reuses_one_session_per_process(self, mocker):
+        mocker.patch("apps.notifications.mailing._session", None)
+        session = get_http_session()
+        assert get_http_session() is session
+
+        # A forked worker process gets its own pool
+        mocker.patch("apps.notifications.mailing.os.getpid", return_value=-1)
+        assert get_http_session() is not session
+
+
+class TestDispatchEmails:
+    def test_sends_concurrently_within_limit_and_keeps_order(self, mocker, settings):
+        settings.MAILING_MAX_CONCURRENCY = 3
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def fake_send(email):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            return email.notification_id != "2"
+
+        mocker.patch.object(Email, "send_mail", autospec=True, side_effect=fake_send)
+        emails = [
+            Email(notification_id=str(i), subject="s", message="m", recipient_list=["a@b.com"])
+            for i in range(9)
+        ]
+
+        results = dispatch_emails(emails)
+
+        assert results == [i != 2 for i in range(9)]
+        assert 1 < state["peak"] <= 3
+
+    def test_worker_threads_close_their_database_connections(self, mocker, settings):
+        settings.MAILING_MAX_CONCURRENCY = 2
+        mocker.patch.object(Email, "send_mail", return_value=True)
+        close_connections = mocker.patch("apps.notifications.mailing.close_old_connections")
+        emails = [
+            Email(notification_id=str(i), subject="s", message="m", recipient_list=["a@b.com"])
+            for i in range(3)
+        ]
+
+        dispatch_emails(emails)
+
+        assert close_connections.call_count == 3
+
+
+class TestDispatchEmailsAsync:
+    def test_sends_concurrently_within_limit_and_keeps_order(self, mocker, settings):
+        settings.MAILING_ASYNC_MAX_CONCURRENCY = 3
+        state = {"running": 0, "peak": 0}
+
+        async def fake_send(email, client):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.01)
+            state["running"] -= 1
+            return email.notification_id != "2"
+
+        mocker.patch.object(Email, "send_mail_async", autospec=True, side_effect=fake_send)
+        emails = [
+            Email(notification_id=str(i), subject="s", message="m", recipient_list=["a@b.com"])
+            for i in range(9)
+        ]
+
+        results = asyncio.run(dispatch_emails_async(emails))
+
+        assert results == [i != 2 for i in range(9)]
+        assert state["peak"] == 3
+
+    @pytest.mark.parametrize("count, clients", [(1, 1), (25, 3), (500, 20)])
+    def test_opens_clients_for_the_emails_at_hand_with_request_timeout(
+        self, mocker, settings, count, clients
+    ):
+        settings.MAILING_ASYNC_MAX_CONCURRENCY = 200
+        settings.MAILING_ASYNC_CONNECTIONS_PER_CLIENT = 10
+        mocker.patch.object(Email, "send_mail_async", return_value=True)
+        client_class = mocker.patch(
+            "apps.notifications.mailing.httpx.AsyncClient", wraps=httpx.AsyncClient
+        )
+        emails = [
+            Email(notification_id=str(i), subject="s", message="m", recipient_list=["a@b.com"])
+            for i in range(count)
+        ]
+
+        asyncio.run(dispatch_emails_async(emails))
+
+        assert client_class.call_count == clients
+        assert client_class.call_args.kwargs["timeout"] == settings.MAILING_REQUEST_TIMEOUT_SECONDS
+
+    def test_send_pending_emails_uses_event_loop_when_enabled(self, mocker, settings):
+        settings.MAILING_ASYNC = True
+        send_async = mocker.patch.object(Email, "send_mail_async", return_value=True)
+        send_sync = mocker.patch.object(Email, "send_mail")
+        mark_sent = mocker.patch("apps.notifications.mailing.mark_notifications_as_sent")
+        mocker.patch("apps.notifications.mailing.mark_notifications_as_failed")
+        notifications = [_notification(subject=f"s{i}") for i in range(2)]
+
+        send_pending_emails([n.model_dump() for n in notifications])
+
+        assert send_async.await_count == 2
+        send_sync.assert_not_called()
+        mark_sent.assert_called_once_with([str(n.id) for n in notifications])
+
+
+class TestEmailSendMailAsync:
+    def _send(self, handler):
+        email = Email(notification_id="1", subject="s", message="m", recipient_list=["a@b.com"])
+
+        async def send():
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await email.send_mail_async(client)
+
+        return email, asyncio.run(send())
+
+    def test_posts_payload(self):
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(202, text="queued")
+
+        email, sent = self._send(handler)
+
+        assert sent is True
+        assert str(requests_seen[0].url) == constants.PYTHON_MAILING_URL
+        assert json.loads(requests_seen[0].content) == email.get_request_payload()
+
+    def test_timeout_is_recorded_as_failed_send(self, settings):
+        settings.MAILING_REQUEST_TIMEOUT_SECONDS = 0.01
+
+        async def handler(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200)
+
+        email, sent = self._send(handler)
+
+        assert sent is False
+        assert email.error == constants.SEND_ERROR_TIMEOUT
+
+    def test_too_many_requests_pauses_provider(self, mocker, settings):
+        settings.MAILING_RATE_LIMITS = {"sendgrid": {"rate": 100}}
+        mocker.patch.object(
+            Email, "get_mailing_client", return_value=constants.MAIL_CLIENT_SENDGRID
+        )
+
+        email, sent = self._send(lambda request: httpx.Response(429, headers={"Retry-After": "7"}))
+
+        assert sent is False
+        assert email.error == constants.SEND_ERROR_RATE_LIMITED
+        assert email.retry_after == 7
+        assert get_rate_limiter("sendgrid").try_acquire() == pytest.approx(7, abs=1)
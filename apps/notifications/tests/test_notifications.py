@@ -1,6 +1,9 @@
 """Tests for the low-level notifications module functions."""
 
+from datetime import timedelta
+
 import pytest
+from django.utils import timezone
 from model_bakery import baker
 
 from apps.notifications import notifications as notif_module
@@ -29,25 +32,72 @@ class TestCreateNotification:
             notification.transport == Notification.TRANSPORT.mail for notification in created
         )
 
+    @pytest.mark.django_db
+    def test_skips_recipients_already_notified_with_the_dedup_key(self, recipients):
+        notified = baker.make(
+            "notifications.Notification", user=recipients[0], dedup_key="event:1", is_removed=True
+        )
+        baker.make("notifications.Notification", user=recipients[1], dedup_key="event:2")
+
+        created = notif_module.create_notification(
+            "Subject", "Message", recipients, dedup_key="event:1"
+        )
+
+        # Soft deleted notifications still count; other keys and users do not
+        assert {notification.user_id for notification in created} == {
+            recipient.id for recipient in recipients[1:]
+        }
+        assert Notification.all_objects.filter(dedup_key="event:1").count() == len(recipients)
+        assert notified.id not in {notification.id for notification in created}
 
-class TestGetPendingNotifications:
     @pytest.mark.django_db
+    def test_notifications_without_dedup_key_are_never_skipped(self, recipients):
+        notif_module.create_notification("Subject", "Message", recipients)
+        created = notif_module.create_notification("Subject", "Message", recipients)
+
+        assert len(created) == len(recipients)
+        assert Notification.objects.filter(subject="Subject").count() == 2 * len(recipients)
+
+
+@pytest.mark.django_db
+class TestClaimNotifications:
+    def test_deferred_notifications_wait_for_next_attempt_at(self, enqueued_notifications):
+        deferred, due = enqueued_notifications
+        notif_module.defer_notifications([deferred.id], timedelta(minutes=1), "rate_limited")
+
+        assert [n.id for n in notif_module.claim_notifications()] == [due.id]
+        deferred.refresh_from_db()
+        assert (deferred.status, deferred.attempts) == (Notification.STATUS.enqueued, 0)
+
+    def test_claims_enqueued_and_moves_them_to_sending(self, enqueued_notifications):
+        claimed = notif_module.claim_notifications()
+
+        assert {n.id for n in claimed} == {n.id for n in enqueued_notifications}
+        for notification in Notification.objects.all():
+            assert notification.status == Notification.STATUS.sending
+            assert notification.lease_expires_at > timezone.now()
+
+    def test_claimed_rows_are_not_claimed_again(self, enqueued_notifications):
+        assert len(notif_module.claim_notifications()) == 2
+        assert notif_module.claim_notifications() == []
+
     @pytest.mark.usefixtures("sent_notifications")
-    def test_returns_only_enqueued_notifications_as_values(self, enqueued_notifications):
-        # Arrange: fixtures provide enqueued and sent notifications
-        expected_ids = {notification.id for notification in enqueued_notifications}
+    def test_reclaims_expired_leases_only(self):
+        expired, live = baker.make(
+            "notifications.Notification", _quantity=2, status=Notification.STATUS.sending
+        )
+        now = timezone.now()
+        Notification.objects.filter(id=expired.id).update(lease_expires_at=now - timedelta(1))
+        Notification.objects.filter(id=live.id).update(lease_expires_at=now + timedelta(1))
 
-        # Act
-        pending_values_qs = notif_module.get_pending_notifications()
-        pending_list = list(pending_values_qs)
+        assert [n.id for n in notif_module.claim_notifications()] == [expired.id]
+
+    def test_limits_to_given_ids_and_batch_size(self, enqueued_notifications):
+        first, second = enqueued_notifications
 
-        # Assert: only enqueued returned and as dicts
-        returned_ids = {item["id"] for item in pending_list}
-        assert returned_ids == expected_ids
-        assert all(item["status"] == Notification.STATUS.enqueued for item in pending_list)
-        # ensure dict-like structure with expected keys
-        sample = pending_list[0] if pending_list else None
-        assert sample is None or {"id", "subject", "message", "user_id"}.issubset(sample.keys())
+        assert [n.id for n in notif_module.claim_notifications([first.id])] == [first.id]
+        assert len(notif_module.claim_notifications(limit=1)) == 1
+        assert Notification.objects.get(id=second.id).status == Notification.STATUS.sending
 
 
 class TestMarkNotificationAsSent:
@@ -62,3 +112,128 @@ class TestMarkNotificationAsSent:
         # Assert
         notification.refresh_from_db()
         assert notification.status == Notification.STATUS.sent
+
+
+@pytest.mark.django_db
+class TestMarkNotificationsInBulk:
+    def test_marks_sent_in_one_query(self, django_assert_num_queries):
+        notifications = baker.make(
+            "notifications.Notification",
+            _quantity=3,
+            status=Notification.STATUS.sending,
+            lease_expires_at=timezone.now(),
+        )
+
+        with django_assert_num_queries(1):
+            assert notif_module.mark_notifications_as_sent([n.id for n in notifications]) == 3
+
+        for notification in Notification.objects.all():
+            assert notification.status == Notification.STATUS.sent
+            assert notification.sent_at is not None
+            assert notification.attempts == 1
+            assert notification.lease_expires_at is None
+
+    def test_marks_failed_with_one_read_and_one_write(self, django_assert_num_queries):
+        timeout, refused, other = baker.make("notifications.Notification", _quantity=3)
+        errors = {timeout.id: "timeout", refused.id: "http_503", other.id: "timeout"}
+
+        with django_assert_num_queries(2):
+            assert notif_module.mark_notifications_as_failed(errors) == 3
+
+        for notification in Notification.objects.all():
+            assert notification.status == Notification.STATUS.failed
+            assert notification.attempts == 1
+            assert notification.last_error == errors[notification.id]
+            assert notification.next_attempt_at > timezone.now()
+
+    def test_dead_letters_after_max_attempts_or_permanent_error(self, settings):
+        settings.NOTIFICATIONS_MAX_ATTEMPTS = 3
+        retried, exhausted, no_recipient = baker.make("notifications.Notification", _quantity=3)
+        Notification.objects.filter(id=exhausted.id).update(attempts=2)
+
+        notif_module.mark_notifications_as_failed(
+            {retried.id: "timeout", exhausted.id: "timeout", no_recipient.id: "no_recipient"}
+        )
+
+        statuses = dict(Notification.objects.values_list("id", "status"))
+        assert statuses == {
+            retried.id: Notification.STATUS.failed,
+            exhausted.id: Notification.STATUS.dead,
+            no_recipient.id: Notification.STATUS.dead,
+        }
+        assert Notification.objects.get(id=exhausted.id).next_attempt_at is None
+
+
+class TestDigestHeldNotifications:
+    @pytest.mark.django_db
+    def test_merges_html_and_waits_for_the_oldest_to_reach_the_window(self, settings):
+        settings.NOTIFICATIONS_DIGEST_WINDOW_SECONDS = 60
+        now = timezone.now()
+        due, waiting = baker.make("users.User", first_name="Ada"), baker.make("users.User")
+        for subject, html_message in [("A", "<p>a</p>"), ("B", "")]:
+            baker.make(
+                "notifications.Notification",
+                user=due,
+                subject=subject,
+                message=f"{subject} & more",
+                html_message=html_message,
+                status=Notification.STATUS.held,
+            )
+        baker.make("notifications.Notification", user=waiting, status=Notification.STATUS.held)
+        Notification.objects.filter(user=due, subject="A").update(
+            created=now - timedelta(seconds=90)
+        )
+
+        (digest,) = notif_module.digest_held_notifications(now)
+
+        # The newer notification of a due user is merged in with the older one
+        assert digest.user_id == due.id
+        assert digest.subject == "You have 2 new notifications"
+        assert digest.message.startswith("Hi Ada")
+        assert "<p>a</p>" in digest.html_message
+        assert "<p>B &amp; more</p>" in digest.html_message
+        assert Notification.objects.get(user=waiting).status == Notification.STATUS.held
+        assert not notif_module.claim_notifications(
+            Notification.objects.filter(user=waiting).values_list("id", flat=True)
+        )
+
+
+class TestGetRetryDelay:
+    def test_doubles_with_jitter_up_to_the_cap(self, settings):
+        settings.NOTIFICATIONS_RETRY_BASE_SECONDS = 60
+        settings.NOTIFICATIONS_RETRY_MAX_DELAY_SECONDS = 600
+
+        for attempts, full_delay in [(1, 60), (2, 120), (3, 240), (4, 480), (10, 600)]:
+            delay = notif_module.get_retry_delay(attempts).total_seconds()
+            assert full_delay / 2 <= delay <= full_delay
+
+
+@pytest.mark.django_db
+class TestRetryNotifications:
+    def test_retry_claims_only_due_failures(self, enqueued_notifications):
+        due, later = baker.make(
+            "notifications.Notification", _quantity=2, status=Notification.STATUS.failed
+        )
+        now = timezone.now()
+        Notification.objects.filter(id=due.id).update(next_attempt_at=now - timedelta(seconds=1))
+        Notification.objects.filter(id=later.id).update(next_attempt_at=now + timedelta(1))
+
+        assert [n.id for n in notif_module.claim_notifications(retry=True)] == [due.id]
+        # The regular sweep never picks up failed notifications
+        assert {n.id for n in notif_module.claim_notifications()} == {
+            n.id for n in enqueued_notifications
+        }
+
+    def test_requeue_resets_failed_and_dead_only(self, sent_notifications):
+        failed = baker.make(
+            "notifications.Notification", status=Notification.STATUS.failed, attempts=2
+        )
+        dead = baker.make("notifications.Notification", status=Notification.STATUS.dead)
+        ids = [failed.id, dead.id, *(n.id for n in sent_notifications)]
+
+        assert set(notif_module.requeue_notifications(ids)) == {failed.id, dead.id}
+
+        failed.refresh_from_db()
+        assert failed.status == Notification.STATUS.enqueued
+        assert failed.attempts == 0
+        assert Notification.objects.filter(status=Notification.STATUS.sent).count() == 2
@@ -0,0 +1,63 @@
+"""Tests for notification template rendering."""
+
+import pytest
+from django.template import TemplateDoesNotExist
+from model_bakery import baker
+
+from apps.notifications import rendering
+from apps.notifications.rendering import get_notification_template, render_notifications
+
+
+@pytest.fixture(autouse=True)
+def empty_template_cache():
+    rendering._compile_database_template.cache_clear()
+
+
+@pytest.mark.django_db
+class TestRenderNotifications:
+    def test_renders_disk_template_escaping_html_only(self):
+        (rendered,) = render_notifications(
+            "email_verification",
+            [{"code": "<b>X</b>", "expiration_minutes": 10, "verification_uuid": "u-1"}],
+        )
+
+        assert rendered.subject == "Please confirm your subscription"
+        assert rendered.message.startswith("Your verification code is: <b>X</b> and expires")
+        assert "<strong>&lt;b&gt;X&lt;/b&gt;</strong>" in rendered.html_message
+
+    def test_database_template_overrides_disk_and_renders_a_batch(self):
+        baker.make(
+            "notifications.NotificationTemplate",
+            name="email_verification",
+            subject="Code\n for {{ name }}",
+            text_body="Hi {{ name }}",
+            html_body="",
+        )
+
+        rendered = render_notifications("email_verification", [{"name": "Ann"}, {"name": "Bo"}])
+
+        assert [(r.subject, r.message, r.html_message) for r in rendered] == [
+            ("Code for Ann", "Hi Ann", ""),
+            ("Code for Bo", "Hi Bo", ""),
+        ]
+
+    def test_compiles_once_until_the_template_changes(self, django_assert_num_queries):
+        template = baker.make(
+            "notifications.NotificationTemplate", name="promo", subject="v1", text_body="v1"
+        )
+        render_notifications("promo", [{}])
+
+        # Cached: only the version lookup, no reload or recompile
+        with django_assert_num_queries(1):
+            rendered = render_notifications("promo", [{}] * 50)
+        assert {r.subject for r in rendered} == {"v1"}
+        assert rendering._compile_database_template.cache_info().misses == 1
+
+        template.subject = "v2"
+        template.save()
+        (rendered,) = render_notifications("promo", [{}])
+        assert rendered.subject == "v2"
+
+    def test_unknown_template_raises(self):
+        with pytest.raises(TemplateDoesNotExist):
+            get_notification_template("does_not_exist")
@@ -1,9 +1,20 @@
 """Tests for the notifications services."""
 
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from model_bakery import baker
 
-from apps.notifications.services import create_notification, get_pending_notifications
+from apps.notifications.models import Notification
+from apps.notifications.services import (
+    create_notification,
+    create_notification_from_template,
+    create_notifications_from_template_stream,
+    requeue_notifications,
+    send_notification_digests,
+)
 
 User = get_user_model()
 
@@ -12,57 +23,188 @@ class TestCreateNotification:
     """Tests for the create_notification function."""
 
     @pytest.mark.django_db
-    def test_create_notification(self, mocker, notification):
-        """Test that the create_notification function works correctly."""
-        # Arrange
-        create_notification_mock = mocker.patch(
-            "apps.notifications.notifications.create_notification"
-        )
+    def test_create_notification_enqueues_only_created_ids(
+        self, mocker, notification, recipients, django_capture_on_commit_callbacks
+    ):
+        """Only the notifications just created are dispatched, after the commit."""
+        # Arrange: `notification` is an older enqueued row that must not be re-sent
         async_send_notifications_mock = mocker.patch(
             "apps.notifications.tasks.async_send_notifications.delay"
         )
 
         # Act
-        create_notification(notification.subject, notification.message, notification.user)
+        with django_capture_on_commit_callbacks(execute=True):
+            create_notification("Subject", "Message", recipients)
+            async_send_notifications_mock.assert_not_called()
 
         # Assert
-        create_notification_mock.assert_called_once_with(
-            notification.subject, notification.message, notification.user
-        )
+        created_ids = {
+            str(pk)
+            for pk in Notification.objects.filter(subject="Subject").values_list("id", flat=True)
+        }
         async_send_notifications_mock.assert_called_once()
+        sent_ids = async_send_notifications_mock.call_args.kwargs["notification_ids"]
+        assert set(sent_ids) == created_ids
+        assert str(notification.id) not in sent_ids
+
+    @pytest.mark.django_db
+    def test_fans_out_id_chunks_as_a_group(
+        self, mocker, settings, recipients, django_capture_on_commit_callbacks
+    ):
+        """Several chunks of ids go out as one Celery group, each task with ids only."""
+        settings.NOTIFICATIONS_TASK_CHUNK_SIZE = 2
+        group_mock = mocker.patch("apps.notifications.services.group")
+        delay_mock = mocker.patch("apps.notifications.tasks.async_send_notifications.delay")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            create_notification("Subject", "Message", recipients)
+
+        (signatures,) = group_mock.call_args.args
+        chunks = [signature.kwargs["notification_ids"] for signature in signatures]
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        assert {nid for chunk in chunks for nid in chunk} == {
+            str(pk) for pk in Notification.objects.values_list("id", flat=True)
+        }
+        group_mock.return_value.apply_async.assert_called_once_with()
+        delay_mock.assert_not_called()
+
+
+class TestCreateNotificationFromTemplate:
+    """Tests for the create_notification_from_template function."""
+
+    @pytest.mark.django_db
+    def test_renders_each_recipient_and_enqueues(
+        self, mocker, recipients, django_capture_on_commit_callbacks
+    ):
+        """Each recipient gets the shared context, itself as user and its own context."""
+        baker.make(
+            "notifications.NotificationTemplate",
+            name="greeting",
+            subject="{{ studio }}",
+            text_body="Hi {{ nickname }} ({{ user.email }})",
+            html_body="<p>Hi {{ nickname }}</p>",
+        )
+        delay_mock = mocker.patch("apps.notifications.tasks.async_send_notifications.delay")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            create_notification_from_template(
+                "greeting",
+                recipients,
+                context={"studio": "Adminstudio"},
+                recipient_contexts=[{"nickname": f"n{i}"} for i in range(len(recipients))],
+            )
+
+        for i, recipient in enumerate(recipients):
+            notification = recipient.notifications.get()
+            assert notification.subject == "Adminstudio"
+            assert notification.message == f"Hi n{i} ({recipient.email})"
+            assert notification.html_message == f"<p>Hi n{i}</p>"
+        assert len(delay_mock.call_args.kwargs["notification_ids"]) == len(recipients)
 
 
-class TestGetPendingNotifications:
-    """Tests for the get_pending_notifications function."""
+class TestCreateNotificationsFromTemplateStream:
+    """Tests for the create_notifications_from_template_stream function."""
 
     @pytest.mark.django_db
-    def test_get_pending_notifications_transforms_to_schema(self, mocker, mocked_pending):
-        """Test that the get_pending_notifications function transforms to schema."""
-        # Arrange
-        get_pending_mock = mocker.patch(
-            "apps.notifications.notifications.get_pending_notifications",
-            return_value=mocked_pending,
+    def test_skips_notified_and_repeated_keys(
+        self, mocker, recipients, django_capture_on_commit_callbacks, django_assert_num_queries
+    ):
+        """Keys notified by an earlier run or repeated in the stream are created once."""
+        baker.make(
+            "notifications.NotificationTemplate", name="ping", subject="Ping", text_body="{{ n }}"
         )
-        mocker.patch(
-            "apps.notifications.services.get_user_from_id",
-            return_value={
-                "first_name": "Test",
-                "last_name": "User",
-                "email": "test@example.com",
-                "phone_number": "",
-            },
+        baker.make("notifications.Notification", user=recipients[0], dedup_key="ping:0")
+        delay_mock = mocker.patch("apps.notifications.tasks.async_send_notifications.delay")
+        stream = (
+            (recipient.id, f"ping:{i % 3}", {"n": i}) for i, recipient in enumerate(recipients * 2)
         )
 
-        # Act
-        result = get_pending_notifications()
+        with django_capture_on_commit_callbacks(execute=True):
+            created = create_notifications_from_template_stream("ping", stream, batch_size=4)
 
-        # Assert
-        get_pending_mock.assert_called_once()
-        assert isinstance(result, list)
-        assert len(result) == len(mocked_pending)
-        for item, src in zip(result, mocked_pending):
-            # Each item should be a Notification schema with the same fields
-            assert item.id == src["id"]
-            assert item.subject == src["subject"]
-            assert item.message == src["message"]
-            assert item.user_id == src["user_id"]
+        assert created == 2
+        assert sorted(
+            Notification.objects.filter(subject="Ping").values_list("dedup_key", "message")
+        ) == [("ping:1", "1"), ("ping:2", "2")]
+        assert delay_mock.call_count == 1
+
+        # Re-running costs one INSERT (and an id read) per batch and enqueues nothing
+        stream = ((recipient.id, f"ping:{i}", {"n": i}) for i, recipient in enumerate(recipients))
+        with django_assert_num_queries(3), django_capture_on_commit_callbacks(execute=True):
+            assert create_notifications_from_template_stream("ping", stream) == 0
+        assert delay_mock.call_count == 1
+
+
+class TestRequeueNotifications:
+    """Tests for the requeue_notifications function."""
+
+    @pytest.mark.django_db
+    def test_requeues_and_dispatches_after_commit(
+        self, mocker, notification, django_capture_on_commit_callbacks
+    ):
+        """Dead notifications are requeued and sent again once the transaction commits."""
+        dead = baker.make("notifications.Notification", status=Notification.STATUS.dead)
+        delay_mock = mocker.patch("apps.notifications.tasks.async_send_notifications.delay")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert requeue_notifications([dead.id, notification.id]) == 1
+
+        delay_mock.assert_called_once_with(notification_ids=[str(dead.id)])
+
+
+class TestSendNotificationDigests:
+    """Tests for digest mode (NOTIFICATIONS_DIGEST_CATEGORIES)."""
+
+    @pytest.mark.django_db
+    def test_bursts_of_digestible_notifications_go_out_as_one_email(
+        self, mocker, settings, recipients, django_capture_on_commit_callbacks
+    ):
+        settings.NOTIFICATIONS_DIGEST_CATEGORIES = ["ping"]
+        baker.make(
+            "notifications.NotificationTemplate", name="ping", subject="Ping", text_body="{{ n }}"
+        )
+        delay_mock = mocker.patch("apps.notifications.tasks.async_send_notifications.delay")
+        busy, quiet = recipients[0], recipients[1]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for i in range(10):
+                create_notification_from_template("ping", [busy], {"n": i})
+            create_notification_from_template("ping", [quiet], {"n": "alone"})
+            # Nothing is released before the window elapses
+            assert send_notification_digests() == 0
+        assert not delay_mock.called
+        assert Notification.objects.filter(status=Notification.STATUS.held).count() == 11
+
+        Notification.objects.update(created=timezone.now() - timedelta(minutes=5))
+        with django_capture_on_commit_callbacks(execute=True):
+            assert send_notification_digests() == 2
+
+        digest = Notification.objects.get(user=busy, status=Notification.STATUS.enqueued)
+        assert digest.subject == "You have 10 new notifications"
+        assert all(f"Ping\n{i}" in digest.message for i in range(10))
+        assert set(digest.digested_notifications.values_list("status", flat=True)) == {
+            Notification.STATUS.digested
+        }
+        assert digest.digested_notifications.count() == 10
+        alone = Notification.objects.get(user=quiet)
+        assert (alone.status, alone.message) == (Notification.STATUS.enqueued, "alone")
+        assert set(delay_mock.call_args.kwargs["notification_ids"]) == {
+            str(digest.id),
+            str(alone.id),
+        }
+
+    @pytest.mark.django_db
+    def test_templates_not_listed_are_sent_right_away(
+        self, mocker, settings, recipients, django_capture_on_commit_callbacks
+    ):
+        settings.NOTIFICATIONS_DIGEST_CATEGORIES = ["other"]
+        baker.make(
+            "notifications.NotificationTemplate", name="ping", subject="Ping", text_body="{{ n }}"
+        )
+        delay_mock = mocker.patch("apps.notifications.tasks.async_send_notifications.delay")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            create_notification_from_template("ping", recipients, {"n": 1})
+
+        assert len(delay_mock.call_args.kwargs["notification_ids"]) == len(recipients)
+        assert not Notification.objects.filter(status=Notification.STATUS.held).exists()
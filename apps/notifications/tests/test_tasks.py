@@ -1,15 +1,32 @@
 """Tests for notifications Celery tasks."""
 
-from apps.notifications.tasks import async_send_notifications
+from apps.notifications.tasks import async_retry_notifications, async_send_notifications
 
 
 class TestAsyncSendNotifications:
-    def test_calls_send_pending_emails(self, mocker, mocked_pending):
+    def test_calls_send_notifications(self, mocker, mocked_pending):
         # Arrange
-        send_emails_mock = mocker.patch("apps.notifications.tasks.send_pending_emails")
+        send_mock = mocker.patch("apps.notifications.tasks.send_notifications")
+        notification_ids = [str(item["id"]) for item in mocked_pending]
 
         # Act: call the task synchronously via .run()
-        async_send_notifications.run(mocked_pending)
+        async_send_notifications.run(notification_ids)
 
         # Assert
-        send_emails_mock.assert_called_once_with(mocked_pending)
+        send_mock.assert_called_once_with(notification_ids)
+
+    def test_periodic_run_sweeps_backlog(self, mocker):
+        send_mock = mocker.patch("apps.notifications.tasks.send_notifications")
+
+        async_send_notifications.run()
+
+        send_mock.assert_called_once_with(None)
+
+
+class TestAsyncRetryNotifications:
+    def test_sweeps_due_retries(self, mocker):
+        send_mock = mocker.patch("apps.notifications.tasks.send_notifications")
+
+        async_retry_notifications.run()
+
+        send_mock.assert_called_once_with(retry=True)
@@ -0,0 +1,104 @@
+"""Tests for the mailing rate limiters."""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from apps.notifications.throttling import (
+    CacheTokenBucket,
+    LocalTokenBucket,
+    TokenBucket,
+    get_rate_limiter,
+    parse_retry_after,
+)
+
+
+@pytest.fixture
+def clock(mocker):
+    return mocker.patch("apps.notifications.throttling.time.time", return_value=1000.0)
+
+
+class TestTokenBucket:
+    def test_bucket_missing_a_primitive_cannot_be_created(self):
+        class NoPauseBucket(TokenBucket):
+            def try_acquire(self, tokens=1):
+                return 0.0
+
+            def get_wait(self, tokens=1):
+                return 0.0
+
+        with pytest.raises(TypeError, match="pause"):
+            NoPauseBucket(rate=1, capacity=1)
+
+
+class TestLocalTokenBucket:
+    def test_allows_a_burst_then_refills_at_rate(self, clock):
+        bucket = LocalTokenBucket(rate=2, capacity=3)
+
+        assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+        assert bucket.try_acquire() == pytest.approx(0.5)
+
+        clock.return_value += 1
+        assert [bucket.try_acquire() for _ in range(2)] == [0, 0]
+        assert bucket.try_acquire() > 0
+
+    def test_pause_blocks_until_retry_after_elapses(self, clock):
+        bucket = LocalTokenBucket(rate=10, capacity=10)
+
+        bucket.pause(30)
+
+        assert bucket.try_acquire() == pytest.approx(30)
+        clock.return_value += 30.5
+        assert bucket.try_acquire() == 0
+
+    def test_acquire_gives_up_when_wait_exceeds_timeout(self, clock, mocker):
+        sleep = mocker.patch("apps.notifications.throttling.time.sleep")
+        bucket = LocalTokenBucket(rate=1, capacity=1)
+        bucket.pause(60)
+
+        assert bucket.acquire(timeout=5) is False
+        sleep.assert_not_called()
+        # Peeking at the wait does not take a token
+        assert bucket.get_wait() == pytest.approx(60)
+        clock.return_value += 61
+        assert bucket.get_wait() == 0
+        assert bucket.try_acquire() == 0
+
+
+@pytest.mark.django_db
+class TestCacheTokenBucket:
+    def test_buckets_with_the_same_key_share_tokens(self, clock):
+        first = CacheTokenBucket("test-bucket", rate=1, capacity=2, cache_alias="mailing_throttle")
+        second = CacheTokenBucket("test-bucket", rate=1, capacity=2, cache_alias="mailing_throttle")
+
+        assert first.try_acquire() == 0
+        assert second.try_acquire() == 0
+        assert first.try_acquire() == pytest.approx(1)
+
+        second.pause(10)
+        clock.return_value += 5
+        assert first.try_acquire() == pytest.approx(5)
+        assert second.get_wait() == pytest.approx(5)
+
+
+class TestGetRateLimiter:
+    def test_builds_buckets_for_configured_providers_only(self, settings):
+        settings.MAILING_RATE_LIMITS = {"sendgrid": {"rate": 5}}
+
+        limiter = get_rate_limiter("sendgrid")
+
+        assert isinstance(limiter, LocalTokenBucket)
+        assert (limiter.rate, limiter.capacity) == (5, 5)
+        assert get_rate_limiter("sendgrid") is limiter
+        assert get_rate_limiter("resend") is None
+
+
+class TestParseRetryAfter:
+    def test_parses_seconds_and_http_dates(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=120)
+
+        assert parse_retry_after("30") == 30
+        assert 100 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 120
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
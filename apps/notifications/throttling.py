@@ -0,0 +1,186 @@
+import asyncio
+import functools
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+# How long a worker holds the shared bucket's lock, and waits before retrying it
+CACHE_LOCK_TIMEOUT_SECONDS = 5
+CACHE_LOCK_RETRY_SECONDS = 0.01
+
+
+class TokenBucket(ABC):
+    """
+    Token bucket allowing `rate` requests per second with bursts of up to `capacity`.
+
+    Subclasses only decide where the bucket state lives; see LocalTokenBucket and
+    CacheTokenBucket. The state is a (tokens, updated_at, paused_until) tuple of wall
+    clock times, so it can be shared between processes and hosts.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+
+    def acquire(self, tokens: float = 1, *, timeout: float | None = None) -> bool:
+        """
+        Take tokens from the bucket, sleeping until they are available.
+
+        Returns:
+            bool: False if the tokens would not be available within `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1, *, timeout: float | None = None) -> bool:
+        """Async variant of acquire that waits with asyncio.sleep instead of blocking."""
+        try_acquire = sync_to_async(self.try_acquire)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = await try_acquire(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    @abstractmethod
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Take tokens if available; returns 0, or how many seconds to wait before retrying."""
+
+    @abstractmethod
+    def get_wait(self, tokens: float = 1) -> float:
+        """Seconds until the tokens would be available, without taking them."""
+
+    async def get_wait_async(self, tokens: float = 1) -> float:
+        return await sync_to_async(self.get_wait)(tokens)
+
+    @abstractmethod
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds` (e.g. the provider's Retry-After)."""
+
+    async def pause_async(self, seconds: float) -> None:
+        await sync_to_async(self.pause)(seconds)
+
+    def _take(self, state: tuple | None, now: float, tokens: float) -> tuple[float, tuple]:
+        available, updated_at, paused_until = state or (self.capacity, now, 0.0)
+        if now < paused_until:
+            return paused_until - now, (available, updated_at, paused_until)
+        available = min(self.capacity, available + max(now - updated_at, 0) * self.rate)
+        if available >= tokens:
+            return 0.0, (available - tokens, now, paused_until)
+        return (tokens - available) / self.rate, (available, now, paused_until)
+
+    def _pause(self, state: tuple | None, now: float, seconds: float) -> tuple:
+        paused_until = max(state[2] if state else 0.0, now + seconds)
+        # Start refilling from empty once the pause ends, instead of releasing a burst
+        return 0.0, paused_until, paused_until
+
+
+class LocalTokenBucket(TokenBucket):
+    """In-memory token bucket shared by the threads of one process."""
+
+    def __init__(self, rate: float, capacity: float):
+        super().__init__(rate, capacity)
+        self._state = None
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        with self._lock:
+            wait, self._state = self._take(self._state, time.time(), tokens)
+        return wait
+
+    def get_wait(self, tokens: float = 1) -> float:
+        with self._lock:
+            wait, _ = self._take(self._state, time.time(), tokens)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._state = self._pause(self._state, time.time(), seconds)
+
+
+class CacheTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a Django cache, shared by every worker using it.
+
+    Updates are serialized with a short lock taken through cache.add, so the cache must
+    be shared between workers (database, Redis or Memcached; not LocMemCache).
+    """
+
+    def __init__(self, key: str, rate: float, capacity: float, cache_alias: str):
+        super().__init__(rate, capacity)
+        self.key = key
+        self.cache = caches[cache_alias]
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        wait = self._update(lambda state, now: self._take(state, now, tokens))
+        return CACHE_LOCK_RETRY_SECONDS if wait is None else wait
+
+    def get_wait(self, tokens: float = 1) -> float:
+        # A read without the lock: an estimate is enough to schedule a retry
+        wait, _ = self._take(self.cache.get(self.key), time.time(), tokens)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        while self._update(lambda state, now: (0.0, self._pause(state, now, seconds))) is None:
+            time.sleep(CACHE_LOCK_RETRY_SECONDS)
+
+    def _update(self, update) -> float | None:
+        lock_key = f"{self.key}:lock"
+        if not self.cache.add(lock_key, 1, timeout=CACHE_LOCK_TIMEOUT_SECONDS):
+            return None
+        try:
+            wait, state = update(self.cache.get(self.key), time.time())
+            self.cache.set(self.key, state, timeout=None)
+        finally:
+            self.cache.delete(lock_key)
+        return wait
+
+
+@functools.lru_cache(maxsize=None)
+def get_rate_limiter(provider: str) -> TokenBucket | None:
+    """
+    Returns the rate limiter of a mailing provider, or None if it is not throttled.
+
+    Limits come from MAILING_RATE_LIMITS. The buckets live in the
+    MAILING_RATE_LIMIT_CACHE_ALIAS cache so every worker shares the provider quota;
+    when that setting is None each process keeps its own in-memory bucket.
+    """
+    limits = settings.MAILING_RATE_LIMITS.get(provider)
+    if not limits:
+        return None
+    rate, capacity = limits["rate"], limits.get("burst", limits["rate"])
+    if settings.MAILING_RATE_LIMIT_CACHE_ALIAS is None:
+        return LocalTokenBucket(rate, capacity)
+    return CacheTokenBucket(
+        f"mailing-rate-limit:{provider}", rate, capacity, settings.MAILING_RATE_LIMIT_CACHE_ALIAS
+    )
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delay in seconds or an HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,39 @@
+# Generated by Django 6.0a1 on 2026-10-18 07:37
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_reserved_count(apps, schema_editor):
+    Schedule = apps.get_model("schedules", "Schedule")
+    Reservation = apps.get_model("members", "Reservation")
+    held = (
+        Reservation.objects.filter(schedule_id=OuterRef("pk"), is_removed=False)
+        .exclude(status="CANCELLED")
+        .order_by()
+        .values("schedule_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Schedule.objects.update(reserved_count=Coalesce(Subquery(held), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("members", "0002_reservation"),
+        ("schedules", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="schedule",
+            name="reserved_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Seats currently held by reservations; compared against the room capacity.",
+            ),
+        ),
+        migrations.RunPython(backfill_reserved_count, migrations.RunPython.noop),
+    ]
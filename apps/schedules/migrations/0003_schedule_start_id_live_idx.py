@@ -0,0 +1,21 @@
+# Generated by Django 6.0a1 on 2026-10-18 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schedules", "0002_schedule_reserved_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="schedule",
+            index=models.Index(
+                condition=models.Q(("is_removed", False)),
+                fields=["start_time", "id"],
+                name="schedules_start_id_live_idx",
+            ),
+        ),
+    ]
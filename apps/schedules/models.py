@@ -30,6 +30,24 @@ class Schedule(UUIDModel, SoftDeletableModel, TimeStampedModel):
         choices=STATUS,
         default=constants.SCHEDULE_STATUS_DRAFT,
     )
+    reserved_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Seats currently held by reservations; compared against the room capacity.",
+    )
 
     class Meta:
         ordering = ["start_time"]
+        indexes = [
+            # Listing and keyset pagination: start_time range, ordered by (start_time, id).
+            # Partial on live rows where supported; a plain composite index elsewhere.
+            models.Index(
+                fields=["start_time", "id"],
+                condition=models.Q(is_removed=False),
+                name="schedules_start_id_live_idx",
+            ),
+        ]
+
+    @property
+    def seats_left(self) -> int:
+        """Seats still available, read from the denormalized counter (no aggregate query)."""
+        return max(self.room.capacity - self.reserved_count, 0)
@@ -1,40 +1,232 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import json
 from datetime import datetime
+from typing import Iterable, Mapping
 from uuid import UUID
 
+from django.db.models import F, IntegerField, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Greatest
+
+from apps.common.search import prefix_filter
 from apps.instructors.services import get_instructor_by_id
 from apps.schedules import constants
 from apps.schedules.models import Schedule
+from apps.studios.models import Room
 from apps.studios.services import get_room as get_room_by_id
 
 
+# Columns read by ScheduleSchema; seats_left is added by as_schedule_rows
+SCHEDULE_ROW_FIELDS = (
+    "id",
+    "created",
+    "modified",
+    "instructor_id",
+    "start_time",
+    "duration_minutes",
+    "room_id",
+    "status",
+    "reserved_count",
+)
+
+
 def get_schedule_by_id(schedule_id: UUID | str) -> Schedule:
     """Return a Schedule by id or 404."""
     return Schedule.objects.get(id=schedule_id)
 
 
+def lock_schedules(schedule_ids: Iterable[UUID | str]) -> list[Schedule]:
+    """Return the given schedules (with their rooms) locked until the transaction ends.
+
+    Rows are locked in primary key order so callers locking several schedules at once
+    cannot deadlock each other. Only the schedule rows are locked, not their rooms.
+    Must be called inside transaction.atomic(); on SQLite, which has no row locks, the
+    IMMEDIATE transaction mode serializes writers instead.
+    """
+    return list(
+        Schedule.objects.select_for_update(of=("self",))
+        .select_related("room")
+        .filter(id__in=list(schedule_ids))
+        .order_by("id")
+    )
+
+
+def reserve_seat(schedule_id: UUID | str) -> bool:
+    """Take one seat on a schedule if its room still has capacity.
+
+    The check and the increment are a single conditional UPDATE against
+    Schedule.reserved_count, so the statement itself locks the schedule row (or, on
+    SQLite, the database) until the surrounding transaction ends. Concurrent bookings
+    queue on that lock and can never push the counter past the room capacity.
+
+    Returns True if a seat was taken, False if the schedule is full or does not exist.
+    """
+    capacity = Room.objects.filter(pk=OuterRef("room_id")).values("capacity")
+    updated = Schedule.objects.filter(id=schedule_id, reserved_count__lt=Subquery(capacity)).update(
+        reserved_count=F("reserved_count") + 1
+    )
+    return updated == 1
+
+
+def reserve_seats(schedule_ids: Iterable[UUID | str]) -> None:
+    """Take one seat on each schedule with a single UPDATE.
+
+    Unlike reserve_seat this does not check capacity: callers must hold the
+    schedules' row locks (see lock_schedules) and have checked the counters already.
+    """
+    Schedule.objects.filter(id__in=list(schedule_ids)).update(
+        reserved_count=F("reserved_count") + 1
+    )
+
+
+def release_seat(schedule_id: UUID | str) -> None:
+    """Give one seat back to a schedule (never going below zero)."""
+    Schedule.objects.filter(id=schedule_id, reserved_count__gt=0).update(
+        reserved_count=F("reserved_count") - 1
+    )
+
+
 def get_schedules_list(
     *,
     start_time: datetime | None = None,
+    instructor_id: UUID | str | None = None,
+    room_id: UUID | str | None = None,
     instructor_username: str | None = None,
     room_name: str | None = None,
 ):
     """Return queryset of schedules ordered by start_time.
 
-    Optionally filter by start_time (>= provided value), by instructor username, and/or by room name when provided.
+    Optionally filter by start_time (>= provided value), by instructor or room id, and/or by a
+    case-insensitive prefix of the instructor username or room name.
     This helper replaces direct usages of Schedule.objects.all().order_by("start_time").
+    Rooms are joined in so seats_left can be read without a query per schedule.
+
+    Name filters are range seeks on the indexed *_normalized columns rather than
+    LIKE '%x%' scans; the id filters are the fastest path when the caller knows them.
     """
-    qs = Schedule.objects.all()
+    qs = Schedule.objects.select_related("room")
     if start_time is not None:
         qs = qs.filter(start_time__gte=start_time)
+    if instructor_id:
+        qs = qs.filter(instructor_id=instructor_id)
+    if room_id:
+        qs = qs.filter(room_id=room_id)
     if instructor_username:
-        qs = qs.filter(instructor__user__username__icontains=instructor_username)
+        qs = qs.filter(prefix_filter("instructor__user__username_normalized", instructor_username))
     if room_name:
-        qs = qs.filter(room__name__icontains=room_name)
+        qs = qs.filter(prefix_filter("room__name_normalized", room_name))
     return qs.order_by("start_time")
 
 
+def as_schedule_rows(qs: QuerySet[Schedule]) -> QuerySet[dict]:
+    """Return a schedules queryset as dict rows shaped like ScheduleSchema.
+
+    Read-only listings use this to skip building Schedule instances; seats_left is
+    computed in SQL from the room capacity instead of through the model property.
+    """
+    seats_left = Greatest(
+        F("room__capacity") - F("reserved_count"), Value(0), output_field=IntegerField()
+    )
+    return qs.values(*SCHEDULE_ROW_FIELDS, seats_left=seats_left)
+
+
+def encode_cursor(schedule: Schedule | Mapping, *, reverse: bool = False) -> str:
+    """Return an opaque cursor pointing at a schedule's (start_time, id) position.
+
+    Accepts a Schedule or a row from as_schedule_rows. A reverse cursor pages backwards
+    (towards earlier schedules) from that position.
+    """
+    if isinstance(schedule, Mapping):
+        start_time, schedule_id = schedule["start_time"], schedule["id"]
+    else:
+        start_time, schedule_id = schedule.start_time, schedule.id
+    payload = {"t": start_time.isoformat(), "id": str(schedule_id), "r": reverse}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID, bool]:
+    """Decode a cursor built by encode_cursor.
+
+    Raises
+    - ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        return datetime.fromisoformat(payload["t"]), UUID(payload["id"]), bool(payload["r"])
+    except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, ValueError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+
+
+def get_schedules_page(
+    *,
+    page_size: int,
+    cursor: str | None = None,
+    start_time: datetime | None = None,
+    instructor_id: UUID | str | None = None,
+    room_id: UUID | str | None = None,
+    instructor_username: str | None = None,
+    room_name: str | None = None,
+    as_rows: bool = False,
+) -> tuple[list[Schedule] | list[dict], str | None, str | None]:
+    """Return one page of schedules using keyset pagination on (start_time, id).
+
+    Accepts the same filters as get_schedules_list. Each page is a range seek from the
+    cursor position rather than an OFFSET, so fetching a deep page costs the same as
+    fetching the first one. With as_rows the page holds dict rows from as_schedule_rows
+    instead of Schedule instances.
+
+    Returns (schedules, next_cursor, previous_cursor); a cursor is None when there is
+    no page in that direction.
+
+    Raises
+    - ValueError: If the cursor is malformed.
+    """
+    qs = get_schedules_list(
+        start_time=start_time,
+        instructor_id=instructor_id,
+        room_id=room_id,
+        instructor_username=instructor_username,
+        room_name=room_name,
+    )
+    reverse = False
+    if cursor:
+        cursor_time, cursor_id, reverse = decode_cursor(cursor)
+        # The redundant start_time bound lets the (start_time, id) index seek to the
+        # cursor instead of scanning from the first row
+        if reverse:
+            qs = qs.filter(
+                Q(start_time__lt=cursor_time) | Q(start_time=cursor_time, id__lt=cursor_id),
+                start_time__lte=cursor_time,
+            )
+        else:
+            qs = qs.filter(
+                Q(start_time__gt=cursor_time) | Q(start_time=cursor_time, id__gt=cursor_id),
+                start_time__gte=cursor_time,
+            )
+
+    ordering = ("-start_time", "-id") if reverse else ("start_time", "id")
+    qs = qs.order_by(*ordering)
+    if as_rows:
+        qs = as_schedule_rows(qs)
+    # Fetch one extra row to learn whether another page exists in this direction
+    rows = list(qs[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if reverse:
+        rows.reverse()
+        next_cursor = encode_cursor(rows[-1]) if rows else None
+        previous_cursor = encode_cursor(rows[0], reverse=True) if rows and has_more else None
+    else:
+        next_cursor = encode_cursor(rows[-1]) if rows and has_more else None
+        previous_cursor = encode_cursor(rows[0], reverse=True) if rows and cursor else None
+    return rows, next_cursor, previous_cursor
+
+
 def create_schedule(
     *,
     instructor_id: UUID,
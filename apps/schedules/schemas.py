@@ -13,5 +13,21 @@ class ScheduleSchema(BaseModel):
     duration_minutes: int
     room_id: uuid.UUID
     status: str
+    reserved_count: int
+    seats_left: int
 
     model_config = {"from_attributes": True}
+
+
+class SchedulePageSchema(BaseModel):
+    results: list[ScheduleSchema]
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+
+class ScheduleListSchema(BaseModel):
+    """Payload of the schedules list endpoint: a page plus links to its neighbours."""
+
+    next: str | None = None
+    previous: str | None = None
+    results: list[ScheduleSchema]
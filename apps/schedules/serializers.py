@@ -36,6 +36,8 @@ class ScheduleSerializer(ScheduleCreateSerializer):
     modified = serializers.DateTimeField(read_only=True)
     instructor = serializers.UUIDField(source="instructor_id", read_only=True)
     room = serializers.UUIDField(source="room_id", read_only=True)
+    reserved_count = serializers.IntegerField(read_only=True)
+    seats_left = serializers.IntegerField(read_only=True)
     status = serializers.ChoiceField(
         choices=[
             constants.SCHEDULE_STATUS_DRAFT,
@@ -9,10 +9,12 @@ from datetime import datetime
 from typing import Iterable, List
 from uuid import UUID
 
+from apps.common.schemas import get_type_adapter
 from apps.schedules.models import Schedule
+from apps.schedules.schedules import as_schedule_rows
 from apps.schedules.schedules import create_schedule as create_schedule_model
-from apps.schedules.schedules import get_schedules_list
-from apps.schedules.schemas import ScheduleSchema
+from apps.schedules.schedules import get_schedules_list, get_schedules_page
+from apps.schedules.schemas import SchedulePageSchema, ScheduleSchema
 
 
 def create_schedule(
@@ -42,6 +44,11 @@ def to_schedule_schema_list(items: Iterable) -> List[ScheduleSchema]:
     return [ScheduleSchema.model_validate(obj) for obj in items]
 
 
+def rows_to_schedule_schema_list(rows: Iterable[dict]) -> List[ScheduleSchema]:
+    """Validate as_schedule_rows dicts into ScheduleSchema in a single pass."""
+    return get_type_adapter(List[ScheduleSchema]).validate_python(list(rows))
+
+
 def get_schedule_schema_list(
     *,
     start_time: datetime | None = None,
@@ -52,13 +59,48 @@ def get_schedule_schema_list(
 
     If start_time is provided, filter schedules by start_time (>= provided). Optionally filter by instructor username and/or room name.
     """
-    return to_schedule_schema_list(
-        get_schedules_list(
-            start_time=start_time, instructor_username=instructor_username, room_name=room_name
+    return rows_to_schedule_schema_list(
+        as_schedule_rows(
+            get_schedules_list(
+                start_time=start_time, instructor_username=instructor_username, room_name=room_name
+            )
         )
     )
 
 
+def get_schedule_schema_page(
+    *,
+    page_size: int,
+    cursor: str | None = None,
+    start_time: datetime | None = None,
+    instructor_id: UUID | None = None,
+    room_id: UUID | None = None,
+    instructor_username: str | None = None,
+    room_name: str | None = None,
+) -> SchedulePageSchema:
+    """Fetch one keyset page of schedules and return it as a SchedulePageSchema.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    schedules, next_cursor, previous_cursor = get_schedules_page(
+        page_size=page_size,
+        cursor=cursor,
+        start_time=start_time,
+        instructor_id=instructor_id,
+        room_id=room_id,
+        instructor_username=instructor_username,
+        room_name=room_name,
+        as_rows=True,
+    )
+    return SchedulePageSchema(
+        results=rows_to_schedule_schema_list(schedules),
+        next_cursor=next_cursor,
+        previous_cursor=previous_cursor,
+    )
+
+
 def get_schedule_schema_by_id(schedule_id: UUID) -> ScheduleSchema:
     """Fetch schedule by id and return as ScheduleSchema."""
-    return ScheduleSchema.model_validate(Schedule.objects.get(pk=schedule_id))
+    return ScheduleSchema.model_validate(
+        Schedule.objects.select_related("room").get(pk=schedule_id)
+    )
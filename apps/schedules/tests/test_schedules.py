@@ -5,12 +5,20 @@ from apps.schedules.schedules import get_schedules_list
 import uuid
 
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
 from django.http import Http404
+from django.test.utils import CaptureQueriesContext
 from model_bakery import baker
 
 from apps.schedules import constants
 from apps.schedules.models import Schedule
-from apps.schedules.schedules import create_schedule, get_schedule_by_id
+from apps.schedules.schedules import (
+    create_schedule,
+    decode_cursor,
+    encode_cursor,
+    get_schedule_by_id,
+    get_schedules_page,
+)
 
 
 class TestGetSchedulesList:
@@ -41,6 +49,23 @@ class TestGetSchedulesList:
         ids = set(qs.values_list("id", flat=True))
         assert ids == {schedules_sample[0].id, schedules_sample[2].id}
 
+    @pytest.mark.django_db
+    def test_name_filters_are_case_insensitive_prefixes(self, schedules_sample):
+        ids = set(get_schedules_list(room_name="  MAIN ").values_list("id", flat=True))
+        assert ids == {schedules_sample[0].id, schedules_sample[2].id}
+        # Matching is anchored at the start of the name
+        assert not get_schedules_list(room_name="hall").exists()
+        assert not get_schedules_list(instructor_username="lice").exists()
+
+    @pytest.mark.django_db
+    def test_filters_by_instructor_and_room_id(self, schedules_sample):
+        qs = get_schedules_list(
+            instructor_id=schedules_sample[0].instructor_id, room_id=schedules_sample[1].room_id
+        )
+        assert list(qs.values_list("id", flat=True)) == [schedules_sample[1].id]
+        qs = get_schedules_list(instructor_id=schedules_sample[2].instructor_id)
+        assert list(qs.values_list("id", flat=True)) == [schedules_sample[2].id]
+
     @pytest.mark.django_db
     def test_combined_filters(self, schedules_sample):
         threshold = schedules_sample[0].start_time + timedelta(minutes=30)
@@ -49,6 +74,71 @@ class TestGetSchedulesList:
         assert ids == [schedules_sample[1].id]
 
 
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="Checks the SQLite query plan")
+class TestScheduleQueryPlans:
+    @pytest.mark.django_db
+    def test_list_from_start_time_uses_composite_index(self, schedules_sample):
+        plan = get_schedules_list(start_time=schedules_sample[0].start_time).explain()
+        assert "schedules_start_id_live_idx" in plan
+
+    @pytest.mark.django_db
+    def test_name_filters_seek_normalized_indexes(self, schedules_sample):
+        plan = get_schedules_list(room_name="main").explain()
+        assert "studios_room_name_normalized" in plan
+        plan = get_schedules_list(instructor_username="ali").explain()
+        assert "users_user_username_normalized" in plan
+
+    @pytest.mark.django_db
+    def test_page_seek_uses_composite_index(self, schedules_sample):
+        cursor = encode_cursor(schedules_sample[0])
+        with CaptureQueriesContext(connection) as ctx:
+            get_schedules_page(page_size=1, cursor=cursor)
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(f"EXPLAIN QUERY PLAN {ctx.captured_queries[0]['sql']}")
+            plan = " ".join(str(row) for row in db_cursor.fetchall())
+        assert "SEARCH schedules_schedule USING INDEX schedules_start_id_live_idx" in plan
+
+
+class TestGetSchedulesPage:
+    @pytest.mark.django_db
+    def test_walks_all_pages_in_order(self, schedules_sample):
+        seen, cursor = [], None
+        while True:
+            page, cursor, _previous = get_schedules_page(page_size=1, cursor=cursor)
+            seen.extend(obj.id for obj in page)
+            if cursor is None:
+                break
+        assert seen == [obj.id for obj in schedules_sample]
+
+    @pytest.mark.django_db
+    def test_ties_on_start_time_are_broken_by_id(self, schedules_sample):
+        Schedule.objects.update(start_time=schedules_sample[0].start_time)
+        expected = sorted(Schedule.objects.values_list("id", flat=True), key=lambda pk: pk.hex)
+
+        first, next_cursor, _ = get_schedules_page(page_size=2)
+        second, last_cursor, previous_cursor = get_schedules_page(page_size=2, cursor=next_cursor)
+
+        assert [obj.id for obj in first + second] == expected
+        assert last_cursor is None
+        back, _, _ = get_schedules_page(page_size=2, cursor=previous_cursor)
+        assert [obj.id for obj in back] == expected[:2]
+
+    @pytest.mark.django_db
+    def test_applies_filters(self, schedules_sample):
+        page, next_cursor, previous_cursor = get_schedules_page(page_size=10, room_name="main")
+        assert [obj.id for obj in page] == [schedules_sample[0].id, schedules_sample[2].id]
+        assert next_cursor is None and previous_cursor is None
+
+    @pytest.mark.django_db
+    def test_cursor_round_trip(self, schedules_sample):
+        obj = schedules_sample[0]
+        assert decode_cursor(encode_cursor(obj, reverse=True)) == (obj.start_time, obj.id, True)
+
+    def test_malformed_cursor_raises_value_error(self):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor("bm90LWpzb24")
+
+
 class TestCreateSchedule:
     @pytest.mark.django_db
     def test_create_schedule_success(self, instructor_alice, room_main):
@@ -4,6 +4,7 @@ from model_bakery import baker
 
 from apps.schedules.services import (
     get_schedule_schema_list,
+    get_schedule_schema_page,
     create_schedule,
     to_schedule_schema_list,
 )
@@ -22,6 +23,22 @@ class TestServicesGetScheduleSchemaList:
         # Ensure items are pydantic models exposing id
         assert {s.id for s in schemas} == {s.id for s in schedules_sample}
 
+    @pytest.mark.django_db
+    def test_rows_match_model_based_schemas(self, schedules_sample):
+        Schedule.objects.filter(id=schedules_sample[0].id).update(reserved_count=2)
+        expected = to_schedule_schema_list(
+            Schedule.objects.select_related("room").order_by("start_time")
+        )
+        assert get_schedule_schema_list() == expected
+        assert get_schedule_schema_page(page_size=10).results == expected
+
+    @pytest.mark.django_db
+    def test_seats_left_never_negative(self, schedules_sample):
+        room = schedules_sample[0].room
+        Schedule.objects.filter(id=schedules_sample[0].id).update(reserved_count=room.capacity + 5)
+        schema = next(s for s in get_schedule_schema_list() if s.id == schedules_sample[0].id)
+        assert schema.seats_left == 0
+
     @pytest.mark.django_db
     def test_filters_by_start_time(self, schedules_sample):
         threshold = schedules_sample[0].start_time + timedelta(minutes=30)
@@ -7,6 +7,7 @@ from rest_framework.test import APIClient
 
 from apps.schedules import constants
 from apps.schedules.models import Schedule
+from apps.studios.models import Room
 
 
 class TestScheduleViewSetList:
@@ -16,8 +17,24 @@ class TestScheduleViewSetList:
         resp = client.get(reverse("schedule-list"))
         assert resp.status_code == status.HTTP_200_OK
         data = resp.json()
-        assert isinstance(data, list)
-        assert len(data) == 3
+        assert isinstance(data["results"], list)
+        assert len(data["results"]) == 3
+        assert data["next"] is None and data["previous"] is None
+
+    @pytest.mark.django_db
+    def test_list_exposes_seats_left_from_counter(
+        self, django_assert_max_num_queries, schedules_sample
+    ):
+        schedule = schedules_sample[0]
+        Room.objects.filter(id=schedule.room_id).update(capacity=10)
+        Schedule.objects.filter(id=schedule.id).update(reserved_count=2)
+        client = APIClient()
+        # A single joined query regardless of the number of schedules
+        with django_assert_max_num_queries(1):
+            resp = client.get(reverse("schedule-list"))
+        by_id = {item["id"]: item for item in resp.json()["results"]}
+        assert by_id[str(schedule.id)]["reserved_count"] == 2
+        assert by_id[str(schedule.id)]["seats_left"] == 8
 
     @pytest.mark.django_db
     def test_list_filter_by_start_time_valid(self, schedules_sample):
@@ -29,7 +46,7 @@ class TestScheduleViewSetList:
         )
         resp = client.get(reverse("schedule-list"), {"start_time": threshold})
         assert resp.status_code == status.HTTP_200_OK
-        ids = {item["id"] for item in resp.json()}
+        ids = {item["id"] for item in resp.json()["results"]}
         assert ids == {str(schedules_sample[1].id), str(schedules_sample[2].id)}
 
     @pytest.mark.django_db
@@ -45,7 +62,7 @@ class TestScheduleViewSetList:
         client = APIClient()
         resp = client.get(reverse("schedule-list"), {"instructor": "ali"})
         assert resp.status_code == status.HTTP_200_OK
-        ids = {item["id"] for item in resp.json()}
+        ids = {item["id"] for item in resp.json()["results"]}
         assert ids == {str(schedules_sample[0].id), str(schedules_sample[1].id)}
 
     @pytest.mark.django_db
@@ -53,9 +70,28 @@ class TestScheduleViewSetList:
         client = APIClient()
         resp = client.get(reverse("schedule-list"), {"room_name": "main"})
         assert resp.status_code == status.HTTP_200_OK
-        ids = {item["id"] for item in resp.json()}
+        ids = {item["id"] for item in resp.json()["results"]}
         assert ids == {str(schedules_sample[0].id), str(schedules_sample[2].id)}
 
+    @pytest.mark.django_db
+    def test_list_filter_by_instructor_and_room_id(self, schedules_sample):
+        client = APIClient()
+        params = {
+            "instructor_id": str(schedules_sample[0].instructor_id),
+            "room_id": str(schedules_sample[0].room_id),
+        }
+        resp = client.get(reverse("schedule-list"), params)
+        assert resp.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in resp.json()["results"]] == [str(schedules_sample[0].id)]
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("param", ["instructor_id", "room_id"])
+    def test_list_invalid_id_filter_returns_400(self, param, schedules_sample):
+        client = APIClient()
+        resp = client.get(reverse("schedule-list"), {param: "not-a-uuid"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert resp.json()["detail"] == f"Invalid {param}. Use a UUID."
+
     @pytest.mark.django_db
     def test_list_combined_filters(self, schedules_sample):
         client = APIClient()
@@ -68,7 +104,50 @@ class TestScheduleViewSetList:
         resp = client.get(reverse("schedule-list"), params)
         assert resp.status_code == status.HTTP_200_OK
         data = resp.json()
-        assert [item["id"] for item in data] == [str(schedules_sample[1].id)]
+        assert [item["id"] for item in data["results"]] == [str(schedules_sample[1].id)]
+
+    @pytest.mark.django_db
+    def test_list_pages_forward_and_back_with_cursors(self, schedules_sample):
+        client = APIClient()
+        expected = [str(obj.id) for obj in schedules_sample]
+
+        first = client.get(reverse("schedule-list"), {"page_size": 2}).json()
+        assert [item["id"] for item in first["results"]] == expected[:2]
+        assert first["previous"] is None
+
+        second = client.get(first["next"]).json()
+        assert [item["id"] for item in second["results"]] == expected[2:]
+        assert second["next"] is None
+        assert "page_size=2" in second["previous"]
+
+        back = client.get(second["previous"]).json()
+        assert [item["id"] for item in back["results"]] == expected[:2]
+        assert back["previous"] is None
+        assert back["next"] is not None
+
+    @pytest.mark.django_db
+    def test_list_invalid_cursor_returns_400(self, schedules_sample):
+        client = APIClient()
+        resp = client.get(reverse("schedule-list"), {"cursor": "not-a-cursor"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert resp.json()["detail"] == "Invalid cursor."
+
+    @pytest.mark.django_db
+    def test_list_serialization_errors_are_not_reported_as_bad_cursors(self, mocker):
+        # pydantic's ValidationError is a ValueError; it must surface as a server error
+        mocker.patch(
+            "apps.schedules.views.get_schedule_schema_page", side_effect=ValueError("boom")
+        )
+        client = APIClient()
+        with pytest.raises(ValueError, match="boom"):
+            client.get(reverse("schedule-list"))
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("page_size", ["0", "-1", "abc", "²"])
+    def test_list_invalid_page_size_returns_400(self, page_size, schedules_sample):
+        client = APIClient()
+        resp = client.get(reverse("schedule-list"), {"page_size": page_size})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
 
 
 class TestScheduleViewSetRetrieve:
@@ -1,9 +1,16 @@
+from uuid import UUID
+
+from django.conf import settings
 from rest_framework import status, viewsets
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
+from apps.common.responses import SchemaJSONResponse
 from apps.schedules.models import Schedule
+from apps.schedules.schedules import decode_cursor
+from apps.schedules.schemas import ScheduleListSchema
 from apps.schedules.serializers import ScheduleCreateSerializer, ScheduleSerializer
-from apps.schedules.services import create_schedule, get_schedule_schema_list
+from apps.schedules.services import create_schedule, get_schedule_schema_page
 
 from django.utils.dateparse import parse_datetime
 
@@ -23,21 +30,80 @@ class ScheduleViewSet(viewsets.ViewSet):
                 )
         return start_time
 
+    def _get_page_size_param(self, page_size: str | None = None):
+        if not page_size:
+            return settings.SCHEDULES_PAGE_SIZE
+        if not page_size.isdecimal() or int(page_size) < 1:
+            return Response(
+                {"detail": "Invalid page_size. Use a positive integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return min(int(page_size), settings.SCHEDULES_MAX_PAGE_SIZE)
+
+    def _get_uuid_param(self, name: str, value: str | None = None):
+        if not value:
+            return None
+        try:
+            return UUID(value)
+        except ValueError:
+            return Response(
+                {"detail": f"Invalid {name}. Use a UUID."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    def _get_cursor_param(self, cursor: str | None = None):
+        if not cursor:
+            return None
+        try:
+            decode_cursor(cursor)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return cursor
+
+    def _get_cursor_url(self, request, cursor: str | None):
+        if cursor is None:
+            return None
+        return replace_query_param(request.build_absolute_uri(), "cursor", cursor)
+
     def list(self, request):
         start_time_str = request.query_params.get("start_time")
         start_time = self._get_start_time_params(start_time_str)
         if isinstance(start_time, Response):
             return start_time
+        page_size = self._get_page_size_param(request.query_params.get("page_size"))
+        if isinstance(page_size, Response):
+            return page_size
+        instructor_id = self._get_uuid_param(
+            "instructor_id", request.query_params.get("instructor_id")
+        )
+        if isinstance(instructor_id, Response):
+            return instructor_id
+        room_id = self._get_uuid_param("room_id", request.query_params.get("room_id"))
+        if isinstance(room_id, Response):
+            return room_id
+        cursor = self._get_cursor_param(request.query_params.get("cursor"))
+        if isinstance(cursor, Response):
+            return cursor
         instructor_username = request.query_params.get("instructor")
         room_name = request.query_params.get("room_name")
-        schemas = get_schedule_schema_list(
-            start_time=start_time, instructor_username=instructor_username, room_name=room_name
+        page = get_schedule_schema_page(
+            page_size=page_size,
+            cursor=cursor,
+            start_time=start_time,
+            instructor_id=instructor_id,
+            room_id=room_id,
+            instructor_username=instructor_username,
+            room_name=room_name,
         )
-        data = [s.model_dump() for s in schemas]
-        return Response(data)
+        data = ScheduleListSchema(
+            next=self._get_cursor_url(request, page.next_cursor),
+            previous=self._get_cursor_url(request, page.previous_cursor),
+            results=page.results,
+        )
+        return SchemaJSONResponse(data)
 
     def retrieve(self, request, pk=None):
-        schedule = Schedule.objects.get(pk=pk)
+        schedule = Schedule.objects.select_related("room").get(pk=pk)
         data = ScheduleSerializer(schedule).data
         return Response(data)
 
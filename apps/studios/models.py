@@ -1,6 +1,8 @@
 from django.db import models
 from model_utils.models import SoftDeletableModel, TimeStampedModel, UUIDModel
 
+from apps.common.search import normalized_search_expression
+
 
 class Studio(SoftDeletableModel, UUIDModel, TimeStampedModel):
     name = models.CharField(max_length=100)
@@ -23,6 +25,13 @@ class Room(SoftDeletableModel, UUIDModel, TimeStampedModel):
         related_name="rooms",
     )
     name = models.CharField(max_length=100)
+    name_normalized = models.GeneratedField(
+        expression=normalized_search_expression("name"),
+        output_field=models.CharField(max_length=100),
+        db_persist=True,
+        db_index=True,
+        help_text="Lowercased name for indexed prefix search, computed by the database.",
+    )
     capacity = models.PositiveIntegerField()
     is_active = models.BooleanField(default=False)
 
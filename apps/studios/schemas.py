@@ -11,7 +11,7 @@ class RoomSchema(BaseModel):
     name: str
     capacity: int
     is_active: bool
-    studio_id: uuid.UUID | None = None
+    studio_id: uuid.UUID | None = Field(default=None, serialization_alias="studio")
 
     model_config = {"from_attributes": True}
 
@@ -23,6 +23,6 @@ class StudioSchema(BaseModel):
     name: str
     address: str
     is_active: bool
-    rooms: list[RoomSchema] | None = Field(default=None, alias="rooms_list")
+    rooms: list[RoomSchema] | None = Field(default=None, validation_alias="rooms_list")
 
     model_config = {"from_attributes": True}
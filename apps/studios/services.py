@@ -4,11 +4,13 @@ Encapsulate creation and update logic for Studio and StudioRoom models.
 Also provide retrieval helpers to avoid model calls in views.
 """
 
+from apps.common.schemas import get_type_adapter
 from apps.studios.schemas import RoomSchema, StudioSchema
 from apps.studios.studios import (
     get_room_from_id,
     get_studio_from_id,
-    rooms_queryset,
+    room_rows,
+    studio_rows,
     studios_queryset,
 )
 
@@ -23,11 +25,17 @@ def get_room(pk) -> RoomSchema:
     return RoomSchema.model_validate(get_room_from_id(pk))
 
 
-def get_list_studios() -> list[StudioSchema]:
-    """Return a list of StudioSchema for all studios."""
+def get_list_studios(*, include_rooms: bool = True) -> list[StudioSchema]:
+    """Return a list of StudioSchema for all studios.
+
+    Without include_rooms, studios are read as plain rows (no model instances, no rooms
+    query) and StudioSchema.rooms is left as None.
+    """
+    if not include_rooms:
+        return get_type_adapter(list[StudioSchema]).validate_python(list(studio_rows()))
     return [StudioSchema.model_validate(obj) for obj in studios_queryset()]
 
 
 def get_list_rooms() -> list[RoomSchema]:
-    """Return a list of RoomSchema for all rooms."""
-    return [RoomSchema.model_validate(obj) for obj in rooms_queryset()]
+    """Return a list of RoomSchema for all rooms, read as plain rows."""
+    return get_type_adapter(list[RoomSchema]).validate_python(list(room_rows()))
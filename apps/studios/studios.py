@@ -1,11 +1,16 @@
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 
 from apps.studios.models import Room, Studio
 
+# Columns read by StudioSchema (without rooms) and RoomSchema
+STUDIO_ROW_FIELDS = ("id", "created", "modified", "name", "address", "is_active")
+ROOM_ROW_FIELDS = ("id", "created", "modified", "name", "capacity", "is_active", "studio_id")
+
 
 def get_studio_from_id(id) -> Studio:
-    """Return a Studio by id or 404."""
-    return get_object_or_404(Studio, pk=id)
+    """Return a Studio (with its active rooms prefetched) by id or 404."""
+    return get_object_or_404(studios_queryset(), pk=id)
 
 
 def get_room_from_id(id) -> Room:
@@ -13,11 +18,31 @@ def get_room_from_id(id) -> Room:
     return get_object_or_404(Room, pk=id)
 
 
+def active_rooms_prefetch() -> Prefetch:
+    """Prefetch only a studio's active rooms into studio.rooms.
+
+    Soft-deleted rooms are excluded by Room.objects and inactive ones by the filter, both
+    in the prefetch query itself. On studios loaded this way studio.rooms.all() and
+    Studio.rooms_list return the prefetched active rooms without another query.
+    """
+    return Prefetch("rooms", queryset=Room.objects.filter(is_active=True).order_by("name"))
+
+
 def studios_queryset():
-    """Return a queryset of all studios with prefetched rooms."""
-    return Studio.objects.all().prefetch_related("rooms")
+    """Return a queryset of all studios with their active rooms prefetched."""
+    return Studio.objects.prefetch_related(active_rooms_prefetch())
 
 
 def rooms_queryset():
     """Return a queryset of all rooms."""
     return Room.objects.all()
+
+
+def studio_rows():
+    """Return all studios as dict rows shaped like StudioSchema, without their rooms."""
+    return Studio.objects.values(*STUDIO_ROW_FIELDS)
+
+
+def room_rows():
+    """Return all rooms as dict rows shaped like RoomSchema."""
+    return rooms_queryset().values(*ROOM_ROW_FIELDS)
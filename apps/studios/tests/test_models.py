@@ -35,3 +35,21 @@ class TestStudioRoomsList:
     def test_rooms_list_empty_for_studio_without_rooms(self, empty_studio):
         assert empty_studio.rooms.count() == 0
         assert empty_studio.rooms_list == []
+
+
+class TestRoomNameNormalized:
+    @pytest.mark.django_db
+    def test_save_keeps_normalized_name_in_sync(self, room):
+        room.name = "  Yoga LOFT "
+        room.save(update_fields=["name"])
+        room.refresh_from_db()
+        assert room.name_normalized == "yoga loft"
+
+    @pytest.mark.django_db
+    def test_bulk_writes_keep_normalized_name_in_sync(self, studio, room):
+        # The column is computed by the database, so writes bypassing save() keep it too
+        (created,) = Room.objects.bulk_create([Room(studio=studio, name=" Spin ROOM", capacity=5)])
+        Room.objects.filter(id=room.id).update(name="Barre Studio")
+
+        names = dict(Room.objects.values_list("id", "name_normalized"))
+        assert names == {created.id: "spin room", room.id: "barre studio"}
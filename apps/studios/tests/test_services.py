@@ -26,6 +26,17 @@ class TestGetStudio:
         assert isinstance(result.rooms[0], RoomSchema)
         assert result.rooms[0].id == room.id
 
+    @pytest.mark.django_db
+    def test_get_studio_reads_active_rooms_in_two_queries(
+        self, django_assert_num_queries, studio, room, extra_room
+    ):
+        removed = Room.objects.create(studio=studio, name="Old", capacity=5, is_active=True)
+        removed.delete()
+        with django_assert_num_queries(2):
+            result = get_studio(studio.id)
+        # Inactive (extra_room) and soft-deleted rooms are filtered by the prefetch query
+        assert [r.id for r in result.rooms] == [room.id]
+
     @pytest.mark.django_db
     def test_get_studio_raises_404(self):
         with pytest.raises(Http404):
@@ -73,6 +84,28 @@ class TestListFunctions:
         empty = next(x for x in result if x.id != studio.id)
         assert empty.rooms == []
 
+    @pytest.mark.django_db
+    @pytest.mark.parametrize("studios", [1, 10])
+    def test_get_list_studios_query_count_is_constant(self, studios, django_assert_num_queries):
+        for i in range(studios):
+            studio = Studio.objects.create(name=f"Studio {i}", address="Somewhere")
+            for j in range(3):
+                Room.objects.create(studio=studio, name=f"Room {j}", capacity=5, is_active=True)
+        with django_assert_num_queries(2):
+            result = get_list_studios()
+        assert len(result) == studios
+        assert all(len(item.rooms) == 3 for item in result)
+
+    @pytest.mark.django_db
+    def test_get_list_studios_without_rooms_reads_one_query(
+        self, django_assert_num_queries, studio, room
+    ):
+        with django_assert_num_queries(1):
+            result = get_list_studios(include_rooms=False)
+        assert [item.id for item in result] == [studio.id]
+        assert result[0].rooms is None
+        assert result[0].name == studio.name
+
     @pytest.mark.django_db
     def test_get_list_rooms_returns_all_room_schemas(self, room, extra_room):
         # Act
@@ -3,14 +3,20 @@
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 
+from apps.common.responses import SchemaJSONResponse
+from apps.studios.schemas import RoomSchema, StudioSchema
 from apps.studios.serializers import RoomSerializer, StudioSerializer
 from apps.studios.services import get_list_rooms, get_list_studios, get_room, get_studio
 
 
 class StudioViewSet(viewsets.ViewSet):
     def list(self, request):
-        data = StudioSerializer(get_list_studios(), many=True).data
-        return Response(data, status=status.HTTP_200_OK)
+        # Rooms are not part of the list payload (see StudioSerializer)
+        return SchemaJSONResponse(
+            get_list_studios(include_rooms=False),
+            list[StudioSchema],
+            exclude={"__all__": {"rooms"}},
+        )
 
     def retrieve(self, request, pk=None):
         studio = get_studio(pk)
@@ -20,8 +26,7 @@ class StudioViewSet(viewsets.ViewSet):
 
 class RoomViewSet(viewsets.ViewSet):
     def list(self, request):
-        data = RoomSerializer(get_list_rooms(), many=True).data
-        return Response(data, status=status.HTTP_200_OK)
+        return SchemaJSONResponse(get_list_rooms(), list[RoomSchema], by_alias=True)
 
     def retrieve(self, request, pk=None):
         room = get_room(pk)
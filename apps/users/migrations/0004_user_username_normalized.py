@@ -0,0 +1,27 @@
+# Generated by Django 6.0a1 on 2026-10-18 07:48
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_user_address_user_birthdate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="username_normalized",
+            field=models.GeneratedField(
+                db_index=True,
+                db_persist=True,
+                expression=django.db.models.functions.text.Lower(
+                    django.db.models.functions.text.Trim("username")
+                ),
+                help_text="Lowercased username for indexed prefix search, computed by the database.",
+                output_field=models.CharField(max_length=150),
+            ),
+        ),
+    ]
@@ -3,6 +3,8 @@ from django.db import models
 from model_utils import Choices
 from model_utils.models import SoftDeletableModel, TimeStampedModel, UUIDModel
 
+from apps.common.search import normalized_search_expression
+
 
 class User(AbstractUser, SoftDeletableModel, UUIDModel, TimeStampedModel):
     GENDER = Choices(
@@ -15,3 +17,10 @@ class User(AbstractUser, SoftDeletableModel, UUIDModel, TimeStampedModel):
     gender = models.CharField(max_length=10, choices=GENDER, default=GENDER.other, blank=True)
     birthdate = models.DateField(null=True, blank=True)
     address = models.TextField(blank=True)
+    username_normalized = models.GeneratedField(
+        expression=normalized_search_expression("username"),
+        output_field=models.CharField(max_length=150),
+        db_persist=True,
+        db_index=True,
+        help_text="Lowercased username for indexed prefix search, computed by the database.",
+    )
@@ -5,7 +5,7 @@ from uuid import UUID
 
 from django.conf import settings
 
-from apps.notifications.services import create_notification
+from apps.notifications.services import create_notification_from_template
 from apps.verifications import constants
 from apps.verifications.models import VerificationCode
 
@@ -21,16 +21,14 @@ def validate_code(validation_code: VerificationCode) -> VerificationCode:
 def send_email_verification(
     user: "users.User", verification_uuid: str | UUID, verification_code: str
 ):
-    subject_email_verification = "Please confirm your subscription"
-    message_email_verification = (
-        f"Your verification code is: {verification_code} and expires in "
-        f"{settings.VERIFICATION_CODE_EXPIRATION_MINUTES} minutes. "
-        f"UUID: {verification_uuid}"
-    )
-    create_notification(
-        subject=subject_email_verification,
-        message=message_email_verification,
+    create_notification_from_template(
+        "email_verification",
         recipient_list=[user],
+        context={
+            "code": verification_code,
+            "expiration_minutes": settings.VERIFICATION_CODE_EXPIRATION_MINUTES,
+            "verification_uuid": verification_uuid,
+        },
     )
 
 
@@ -40,23 +40,40 @@ class TestSendEmailVerification:
         user = baker.make("users.User", email="user@example.com")
         code = "ABC123"
         verification_uuid = uuid.uuid4()
-        create_notification_mock = mocker.patch("apps.verifications.services.create_notification")
+        create_notification_mock = mocker.patch(
+            "apps.verifications.services.create_notification_from_template"
+        )
 
         # Act
         send_email_verification(user, verification_uuid, code)
 
         # Assert
-        expected_subject = "Please confirm your subscription"
-        expected_message = (
-            f"Your verification code is: {code} and expires in "
-            f"{settings.VERIFICATION_CODE_EXPIRATION_MINUTES} minutes. "
-            f"UUID: {verification_uuid}"
-        )
         create_notification_mock.assert_called_once_with(
-            subject=expected_subject,
-            message=expected_message,
+            "email_verification",
             recipient_list=[user],
+            context={
+                "code": code,
+                "expiration_minutes": settings.VERIFICATION_CODE_EXPIRATION_MINUTES,
+                "verification_uuid": verification_uuid,
+            },
+        )
+
+    @pytest.mark.django_db
+    def test_renders_text_and_html_message(self, mocker):
+        mocker.patch("apps.notifications.tasks.async_send_notifications.delay")
+        user = baker.make("users.User", email="user@example.com")
+        verification_uuid = uuid.uuid4()
+
+        send_email_verification(user, verification_uuid, "ABC123")
+
+        notification = user.notifications.get()
+        assert notification.subject == "Please confirm your subscription"
+        assert notification.message == (
+            f"Your verification code is: ABC123 and expires in "
+            f"{settings.VERIFICATION_CODE_EXPIRATION_MINUTES} minutes. "
+            f"UUID: {verification_uuid}"
         )
+        assert "<strong>ABC123</strong>" in notification.html_message
 
 
 class TestCreateVerificationCode:
@@ -0,0 +1,111 @@
+"""Memory benchmark for apps.members.members.send_class_reminders.
+
+Books --reservations members onto classes starting within the reminder window, then
+runs send_class_reminders and reports its duration, query count and peak Python
+memory (tracemalloc). The peak should follow the chunk and batch sizes, not the number
+of reservations. Broker messages are counted instead of sent.
+
+The benchmark runs against a throwaway test database.
+
+Usage:
+    python -m benchmarks.class_reminders --reservations 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from unittest import mock
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "adminstudio_django.settings")
+
+from benchmarks.reservation_concurrency import _setup_database, _teardown_database  # noqa: E402
+
+# Members per class, as in a large studio's busiest slot
+SEATS_PER_CLASS = 50
+
+
+def _build_fixture(reservations: int):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from apps.instructors.models import Instructor
+    from apps.members.models import Member, Reservation
+    from apps.schedules.models import Schedule
+    from apps.studios.models import Room, Studio
+
+    User = get_user_model()
+    users = User.objects.bulk_create(
+        User(username=f"bench_{i}", email=f"bench_{i}@example.com", first_name=f"Member {i}")
+        for i in range(reservations)
+    )
+    members = Member.objects.bulk_create(Member(user=user) for user in users)
+    instructor = Instructor.objects.create(
+        user=User.objects.create(username="bench_instructor", email="instructor@example.com")
+    )
+    studio = Studio.objects.create(name="Bench Studio", address="Nowhere", is_active=True)
+    room = Room.objects.create(studio=studio, name="Bench Room", capacity=SEATS_PER_CLASS)
+    classes = -(-reservations // SEATS_PER_CLASS)
+    schedules = Schedule.objects.bulk_create(
+        Schedule(
+            instructor=instructor,
+            room=room,
+            start_time=timezone.now() + timedelta(minutes=30 + i % 60),
+        )
+        for i in range(classes)
+    )
+    Reservation.objects.bulk_create(
+        (
+            Reservation(member=member, schedule=schedules[i // SEATS_PER_CLASS])
+            for i, member in enumerate(members)
+        ),
+        batch_size=1000,
+    )
+
+
+def run(reservations: int) -> int:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from apps.members.members import send_class_reminders
+    from apps.notifications.models import Notification
+
+    _build_fixture(reservations)
+
+    with mock.patch("apps.notifications.services.async_send_notifications.delay") as delay:
+        tracemalloc.start()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            created = send_class_reminders()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    stored = Notification.objects.exclude(dedup_key="").count()
+    print(f"reservations={reservations} created={created} stored={stored}")
+    print(
+        f"elapsed={elapsed:.2f}s queries={len(queries)} broker_messages={delay.call_count} "
+        f"peak_memory={peak / 2**20:.1f}MiB"
+    )
+    return 0 if created == stored == reservations else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reservations", type=int, default=10_000)
+    args = parser.parse_args()
+
+    django.setup()
+    _setup_database()
+    try:
+        return run(args.reservations)
+    finally:
+        _teardown_database()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Throughput benchmark for list endpoint serialization.
+
+Compares the previous list path (ScheduleSchema.model_validate -> model_dump -> DRF
+JSONRenderer) with SchemaJSONResponse, which renders the validated schemas straight to
+JSON bytes with TypeAdapter.dump_json. Schedules are unsaved in-memory instances, so
+only serialization is measured, not the database.
+
+Usage:
+    python -m benchmarks.list_serialization --rows 500 --repeat 50
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "adminstudio_django.settings")
+
+
+def _build_schedules(rows: int):
+    from django.utils import timezone
+
+    from apps.schedules.models import Schedule
+    from apps.studios.models import Room
+
+    now = timezone.now()
+    room = Room(id=uuid.uuid4(), name="Bench Room", capacity=20, studio_id=uuid.uuid4())
+    schedules = []
+    for i in range(rows):
+        schedule = Schedule(
+            id=uuid.uuid4(),
+            created=now,
+            modified=now,
+            instructor_id=uuid.uuid4(),
+            start_time=now + timedelta(hours=i),
+            duration_minutes=50,
+            room=room,
+            reserved_count=i % 20,
+        )
+        schedules.append(schedule)
+    return schedules
+
+
+def _time(label: str, func, repeat: int) -> float:
+    func()  # warm up (builds cached serializers)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<26} {elapsed / repeat * 1000:8.2f} ms/response  {len(body)} bytes")
+    return elapsed
+
+
+def run(rows: int, repeat: int) -> int:
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.common.responses import SchemaJSONResponse
+    from apps.schedules.schemas import ScheduleSchema
+    from apps.schedules.services import to_schedule_schema_list
+
+    schedules = _build_schedules(rows)
+    renderer = JSONRenderer()
+
+    def drf_renderer():
+        data = [ScheduleSchema.model_validate(obj).model_dump() for obj in schedules]
+        return renderer.render(data)
+
+    def schema_response():
+        return SchemaJSONResponse(to_schedule_schema_list(schedules), list[ScheduleSchema]).content
+
+    print(f"rows={rows} repeat={repeat}")
+    baseline = _time("model_dump + JSONRenderer", drf_renderer, repeat)
+    fast = _time("SchemaJSONResponse", schema_response, repeat)
+    print(f"speedup={baseline / fast:.2f}x")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    django.setup()
+    return run(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
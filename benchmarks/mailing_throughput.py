@@ -0,0 +1,143 @@
+"""Throughput benchmark for the mailing service client.
+
+Starts a local stub of the mailing service (plain HTTP/1.1 with keep-alive, answering
+every POST after --latency-ms) and sends --emails emails three times:
+
+- before: one requests.post per email, one after another (a new connection each time)
+- after:  dispatch_emails, i.e. the pooled session with MAILING_MAX_CONCURRENCY workers
+- async:  dispatch_emails_async, one event loop with --async-concurrency sends in flight
+
+No database is needed; only the HTTP client path is measured.
+
+Usage:
+    python -m benchmarks.mailing_throughput --emails 200 --latency-ms 20 --concurrency 8 \
+        --async-concurrency 200
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "adminstudio_django.settings")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without TCP_NODELAY keep-alive
+    # connections stall on delayed ACKs
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        body = b'{"status": "queued"}'
+        self.send_response(202)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The async run opens hundreds of connections at once; the default listen
+    # backlog of 5 would reset most of them
+    request_queue_size = 1024
+
+
+def _serve_stub(latency: float, ports: multiprocessing.Queue) -> None:
+    _StubHandler.latency = latency
+    server = _StubServer(("127.0.0.1", 0), _StubHandler)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def _start_stub_server(latency: float) -> tuple[multiprocessing.Process, int]:
+    # A separate process, so the stub's threads do not compete with the client for the GIL
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_stub, args=(latency, ports), daemon=True)
+    process.start()
+    return process, ports.get(timeout=10)
+
+
+def _report(label: str, count: int, elapsed: float) -> float:
+    rate = count / elapsed
+    print(f"{label:<8} {elapsed:7.3f}s  {rate:8.1f} emails/s")
+    return rate
+
+
+def run(emails: int, latency_ms: float, concurrency: int, async_concurrency: int) -> int:
+    import asyncio
+
+    import requests
+    from django.conf import settings
+
+    from apps.notifications import constants
+    from apps.notifications.mailing import Email, dispatch_emails, dispatch_emails_async
+
+    server, port = _start_stub_server(latency_ms / 1000)
+    constants.PYTHON_MAILING_URL = f"http://127.0.0.1:{port}/emails"
+    settings.MAILING_MAX_CONCURRENCY = concurrency
+    settings.MAILING_ASYNC_MAX_CONCURRENCY = async_concurrency
+    # Measure the transport, not the provider quotas enforced by the rate limiter
+    settings.MAILING_RATE_LIMITS = {}
+    batch = [
+        Email(
+            notification_id=str(i),
+            subject="Class cancelled",
+            message="Your class was cancelled.",
+            recipient_list=[f"member{i}@example.com"],
+            from_email="studio@example.com",
+        )
+        for i in range(emails)
+    ]
+
+    print(
+        f"emails={emails} latency={latency_ms}ms concurrency={concurrency} "
+        f"async_concurrency={async_concurrency}"
+    )
+    started = time.perf_counter()
+    for email in batch:
+        requests.post(
+            constants.PYTHON_MAILING_URL,
+            json={"subject": email.subject, "recipient_list": email.recipient_list},
+            timeout=settings.MAILING_REQUEST_TIMEOUT_SECONDS,
+        ).raise_for_status()
+    before = _report("before", emails, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    results = dispatch_emails(batch)
+    after = _report("after", emails, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    async_results = asyncio.run(dispatch_emails_async(batch))
+    async_rate = _report("async", emails, time.perf_counter() - started)
+
+    server.terminate()
+    print(f"speedup={after / before:.2f}x async_speedup={async_rate / before:.2f}x")
+    return 0 if all(results) and all(async_results) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--async-concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    django.setup()
+    return run(args.emails, args.latency_ms, args.concurrency, args.async_concurrency)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
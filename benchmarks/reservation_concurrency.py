@@ -0,0 +1,134 @@
+"""Concurrency benchmark for apps.members.members.create_reservation.
+
+Fires N parallel bookings at a single schedule whose room holds fewer seats than
+there are requests, then checks that the class was not overbooked and that
+Schedule.reserved_count matches the stored reservations.
+
+The benchmark runs against a throwaway test database (a temporary file when the
+default database is SQLite, so every thread shares it).
+
+Usage:
+    python -m benchmarks.reservation_concurrency --requests 200 --capacity 20
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "adminstudio_django.settings")
+
+
+def _setup_database():
+    from django.conf import settings
+    from django.db import connection
+
+    default = settings.DATABASES["default"]
+    if default["ENGINE"] == "django.db.backends.sqlite3":
+        handle, path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        default.setdefault("TEST", {})["NAME"] = path
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+
+def _teardown_database():
+    from django.conf import settings
+    from django.db import connection
+
+    connection.creation.destroy_test_db(settings.DATABASES["default"]["NAME"], verbosity=0)
+
+
+def _build_fixture(requests: int, capacity: int):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from apps.instructors.models import Instructor
+    from apps.members.models import Member
+    from apps.schedules.models import Schedule
+    from apps.studios.models import Room, Studio
+
+    User = get_user_model()
+    users = User.objects.bulk_create(
+        User(username=f"bench_{i}", email=f"bench_{i}@example.com") for i in range(requests)
+    )
+    # Members exist up front so bookings do not trigger verification emails
+    Member.objects.bulk_create(Member(user=user) for user in users)
+    instructor = Instructor.objects.create(
+        user=User.objects.create(username="bench_instructor", email="instructor@example.com")
+    )
+    studio = Studio.objects.create(name="Bench Studio", address="Nowhere", is_active=True)
+    room = Room.objects.create(studio=studio, name="Bench Room", capacity=capacity, is_active=True)
+    schedule = Schedule.objects.create(
+        instructor=instructor,
+        room=room,
+        start_time=timezone.now() + timedelta(days=1),
+    )
+    return [user.id for user in users], schedule
+
+
+def run(requests: int, capacity: int) -> int:
+    from django.db import connection
+
+    from apps.members.exceptions import RoomFullException
+    from apps.members.members import create_reservation
+    from apps.members.models import Reservation
+
+    user_ids, schedule = _build_fixture(requests, capacity)
+    barrier = threading.Barrier(requests)
+    outcomes = {"booked": 0, "full": 0, "error": 0}
+    lock = threading.Lock()
+
+    def book(user_id):
+        barrier.wait()
+        try:
+            create_reservation({"user_id": user_id, "schedule_id": schedule.id})
+            outcome = "booked"
+        except RoomFullException:
+            outcome = "full"
+        except Exception as exc:  # pragma: no cover - reported below
+            print(f"error: {exc!r}", file=sys.stderr)
+            outcome = "error"
+        finally:
+            connection.close()
+        with lock:
+            outcomes[outcome] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=requests) as pool:
+        list(pool.map(book, user_ids))
+    elapsed = time.perf_counter() - started
+
+    schedule.refresh_from_db()
+    stored = Reservation.objects.filter(schedule=schedule).count()
+    overbooked = max(stored - capacity, 0)
+    print(f"requests={requests} capacity={capacity} elapsed={elapsed:.3f}s")
+    print(
+        f"booked={outcomes['booked']} full={outcomes['full']} errors={outcomes['error']} "
+        f"stored={stored} reserved_count={schedule.reserved_count} overbooked={overbooked}"
+    )
+    consistent = stored == schedule.reserved_count == outcomes["booked"]
+    return 0 if overbooked == 0 and consistent and not outcomes["error"] else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=20)
+    args = parser.parse_args()
+
+    django.setup()
+    _setup_database()
+    try:
+        return run(args.requests, args.capacity)
+    finally:
+        _teardown_database()
+
+
+if __name__ == "__main__":
+    sys.exit(main())